@@ -0,0 +1,19 @@
+import os
+from pathlib import Path
+
+# Environment variable that moves the cache, e.g. to a faster disk or one per checkout.
+CACHE_DIR_VARIABLE = "PCM_CACHE_DIR"
+
+
+def default_cache_dir() -> Path:
+    """
+    $PCM_CACHE_DIR if set, otherwise pcm/ in the user's cache directory
+    ($XDG_CACHE_HOME, ~/.cache). Never inside the source tree.
+    """
+    if os.environ.get(CACHE_DIR_VARIABLE):
+        return Path(os.environ[CACHE_DIR_VARIABLE]).expanduser()
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pcm"
+
+
+# Parsed exports, stored fits, lookup tables and other results that are expensive to recompute, one subdirectory each.
+CACHE_DIR = default_cache_dir()
@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from common.cache_dir import CACHE_DIR
+from common.table_io import read_sheet_to_dict
+
+# Bump when the on-disk layout changes, old entries are then rebuilt.
+CACHE_FORMAT_VERSION = 1
+
+# Default location of the parsed columns, one entry per source, reader and column selection.
+COLUMN_CACHE_DIR = CACHE_DIR / "columns"
+
+Reader = Callable[..., Dict[str, np.ndarray]]
+
+
+def file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Return the sha256 hex digest of the contents of `path`.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_dir(path: Path, reader: Reader, columns: Optional[Sequence[str]], cache_dir: Path) -> Path:
+    key = json.dumps({
+        "source": str(Path(path).resolve()),
+        "reader": f"{reader.__module__}.{reader.__qualname__}",
+        "columns": list(columns) if columns is not None else None,
+    }, sort_keys=True)
+    return cache_dir / f"{Path(path).stem}-{hashlib.sha1(key.encode()).hexdigest()[:16]}"
+
+
+def _read_meta(entry: Path) -> Optional[dict]:
+    try:
+        with open(entry / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_FORMAT_VERSION:
+        return None
+    return meta
+
+
+def _load_entry(entry: Path, meta: dict, mmap: bool) -> Dict[str, np.ndarray]:
+    mmap_mode = "r" if mmap else None
+    return {name: np.load(entry / f"{i}.npy", mmap_mode=mmap_mode)
+            for i, name in enumerate(meta["columns"])}
+
+
+def _write_meta(entry: Path, meta: dict) -> None:
+    """Replace meta.json of `entry` in one step, a concurrent reader sees the old or the new one."""
+    fd, tmp = tempfile.mkstemp(prefix="meta.", suffix=".tmp", dir=entry)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, entry / "meta.json")
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _write_entry(entry: Path, columns: Dict[str, np.ndarray], meta: dict) -> None:
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(prefix=entry.name + ".", dir=entry.parent))
+    try:
+        for i, values in enumerate(columns.values()):
+            np.save(tmp / f"{i}.npy", np.ascontiguousarray(values))
+        # meta is written last, an entry without it is never trusted
+        _write_meta(tmp, meta)
+        try:
+            os.replace(tmp, entry)
+            return
+        except OSError:
+            if not entry.exists():
+                raise
+        # another process got there first: a valid entry may already be loaded by someone, keep it
+        existing = _read_meta(entry)
+        if existing is not None and existing["sha256"] == meta["sha256"] and existing["columns"] == meta["columns"]:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        # a stale entry is moved aside first, so the new one appears in one step
+        stale = Path(tempfile.mkdtemp(prefix=entry.name + ".stale.", dir=entry.parent))
+        os.replace(entry, stale / "entry")
+        shutil.rmtree(stale, ignore_errors=True)
+        os.replace(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def load_columns(path: Path, columns: Optional[Sequence[str]] = None, reader: Reader = read_sheet_to_dict,
+                 cache_dir: Optional[Path] = None, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Return the parsed columns of the export at `path`, reading them from a
+    binary cache when possible.
+
+    Every column is stored as its own `.npy` file, so it can be memory mapped
+    (read-only) on reload. An entry is reused as long as the size and mtime
+    of the source match; when only the mtime changed the content hash decides,
+    and the export is parsed again with `reader` only if the content changed.
+    """
+    path = Path(path)
+    cache_dir = Path(cache_dir) if cache_dir is not None else COLUMN_CACHE_DIR
+    entry = _entry_dir(path, reader, columns, cache_dir)
+
+    stat = path.stat()
+    meta = _read_meta(entry)
+    if meta is not None and meta["size"] == stat.st_size:
+        if meta["mtime_ns"] == stat.st_mtime_ns:
+            return _load_entry(entry, meta, mmap)
+        content_hash = file_hash(path)
+        if meta["sha256"] == content_hash:
+            # touched but unchanged, only refresh the stored mtime
+            meta["mtime_ns"] = stat.st_mtime_ns
+            try:
+                _write_meta(entry, meta)
+            except OSError:
+                pass  # read-only cache, the hash is compared again next time
+            return _load_entry(entry, meta, mmap)
+    else:
+        content_hash = file_hash(path)
+
+    data = reader(path, columns=columns) if columns is not None else reader(path)
+    meta = {
+        "version": CACHE_FORMAT_VERSION,
+        "source": str(path.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": content_hash,
+        "columns": list(data.keys()),
+    }
+    try:
+        _write_entry(entry, data, meta)
+        return _load_entry(entry, meta, mmap)
+    except OSError:
+        # a read-only checkout (or an entry replaced by a concurrent writer) still works, just without the cache
+        return data
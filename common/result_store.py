@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+
+def _update(digest, obj) -> None:
+    """
+    Feed a canonical representation of `obj` into `digest`. Arrays are hashed
+    by dtype, shape and raw bytes, containers recursively.
+    """
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        digest.update(f"ndarray:{arr.dtype.str}:{arr.shape}:".encode())
+        digest.update(arr.tobytes())
+    elif isinstance(obj, dict):
+        digest.update(b"dict:")
+        for key in sorted(obj, key=repr):
+            _update(digest, key)
+            _update(digest, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        digest.update(f"{type(obj).__name__}:{len(obj)}:".encode())
+        for item in obj:
+            _update(digest, item)
+    elif isinstance(obj, (float, np.floating)):
+        digest.update(f"float:{float(obj)!r};".encode())
+    elif isinstance(obj, (bool, int, np.integer, str, Path)) or obj is None:
+        digest.update(f"{type(obj).__name__}:{obj};".encode())
+    else:
+        raise TypeError(f"Cannot fingerprint object of type {type(obj).__name__}.")
+
+
+def fingerprint(*parts) -> str:
+    """
+    Stable hex digest of numbers, strings, arrays and (nested) containers of them.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+class ResultStore:
+    """
+    Small persistent key -> JSON record store, one file per key.
+
+    Records are also kept in memory, so repeated lookups within a process
+    never touch the disk after the first one.
+    """
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._memory: Dict[str, dict] = {}
+
+    def _file(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        if key in self._memory:
+            return self._memory[key]
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._memory[key] = record
+        return record
+
+    def put(self, key: str, record: dict) -> None:
+        self._memory[key] = record
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=key, suffix=".tmp", dir=self.directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f, indent=2)
+            os.replace(tmp, self._file(key))
+        except OSError:
+            # not persisted, the in-memory record is still used
+            pass
+
+    def get_or_compute(self, key: str, compute: Callable[[], dict]) -> dict:
+        record = self.get(key)
+        if record is None:
+            record = compute()
+            self.put(key, record)
+        return record
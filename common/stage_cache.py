@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+
+# Stage outputs kept per process, the least recently used are dropped first.
+MAX_STAGE_ENTRIES = 128
+
+
+def _freeze(value: Any) -> Any:
+    """Make cached arrays (also inside dicts) read-only, a shared stage output must not be changed in place."""
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, dict):
+        for item in value.values():
+            _freeze(item)
+    return value
+
+
+class StageCache:
+    """
+    In-memory LRU of pipeline stage outputs keyed by a digest of everything
+    the stage depends on: the key of the stage before it plus its own
+    parameters. Objects built with the same inputs then share every stage,
+    and changing one parameter only recomputes the stages after it.
+    """
+    def __init__(self, max_entries: int = MAX_STAGE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        value = _freeze(compute())
+        self._entries[key] = value
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
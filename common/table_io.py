@@ -0,0 +1,58 @@
+import io
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def read_header(header_line: str) -> List[str]:
+    """
+    Split the header line of an instrument export into column names.
+
+    Exports are tab-separated, so column names may contain spaces
+    (e.g. "Heat Flow"); only fall back to splitting on any whitespace
+    when the header has no tabs at all.
+    """
+    header_line = header_line.strip()
+    if "\t" in header_line:
+        return [h.strip() for h in header_line.split("\t")]
+    return re.split(r'\s+', header_line)
+
+
+def parse_rows(body: bytes, n_columns: int, usecols: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Parse the data rows of an export into a 2-D float array in one pass.
+    Decimal commas are converted to dots on the raw bytes before parsing.
+    """
+    body = body.replace(b",", b".")
+    if not body.strip():
+        return np.empty((0, len(usecols) if usecols is not None else n_columns))
+    return np.loadtxt(io.BytesIO(body), dtype=float, usecols=usecols, ndmin=2)
+
+
+def read_sheet_to_dict(path: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Read a whitespace/tab-separated table from `path` and return a dict
+    mapping header -> column array. Decimal commas (`,`) are accepted and
+    converted to dots for numeric parsing.
+
+    Only the headers listed in `columns` are parsed when it is given, so
+    unused columns (e.g. `Program`, `Sample`, `Approx.`) cost nothing.
+    """
+    raw = Path(path).read_bytes()
+    header_line, _, body = raw.partition(b"\n")
+    header = read_header(header_line.decode("utf-8", errors="replace"))
+    if not header or header == ['']:
+        return {}
+
+    if columns is None:
+        columns = header
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise KeyError(f"Columns {missing} not found in {path}.")
+    usecols = [header.index(c) for c in columns]
+
+    table = parse_rows(body, len(header), usecols)
+    # contiguous copies, so downstream slicing/arithmetic is cache friendly
+    return {c: np.ascontiguousarray(table[:, i]) for i, c in enumerate(columns)}
@@ -0,0 +1,14 @@
+import os
+import shutil
+import tempfile
+
+# pytest puts the directory of this conftest.py, the repository root, on sys.path, so the tests import
+# common, cure_kinetics and rheokinetics from the checkout without installing anything.
+
+# The tests cache into a directory of their own, set before any package reads it.
+TEST_CACHE_DIR = tempfile.mkdtemp(prefix="pcm-tests-")
+os.environ["PCM_CACHE_DIR"] = TEST_CACHE_DIR
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(TEST_CACHE_DIR, ignore_errors=True)
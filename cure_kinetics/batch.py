@@ -0,0 +1,134 @@
+"""
+Process many isothermal DSC runs listed in a manifest in parallel.
+
+The manifest is a CSV file with the columns
+    file, temperature, sample_weight, start_time, end_time
+where `file` is a txt export or a raw .xlsx workbook (relative to the
+manifest), temperature in °C, sample weight in mg and the window in
+minutes. Empty sample weights are read from the workbook (txt exports
+need one in the manifest), empty window times mean no limit.
+
+    python -m cure_kinetics.batch cure_kinetics/resources/manifest.csv -o results.csv
+"""
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from cure_kinetics.dataset import CureDataset
+from cure_kinetics.dsc_workbook import read_sample_weight
+from cure_kinetics.resources.constants import TIME_UNIT_CONVERSION_FACTOR
+
+RESULT_COLUMNS = (
+    "file", "temperature", "sample_weight", "n_samples", "duration",
+    "total_heat", "peak_heat_flow", "time_at_peak", "time_to_half_heat",
+    "degree_of_cure", "initial_cure_rate",
+)
+
+
+def _optional_float(value: Optional[str]) -> Optional[float]:
+    value = (value or "").strip()
+    return float(value) if value else None
+
+
+def read_manifest(path: Path) -> List[CureDataset]:
+    """
+    Read a run manifest into (not yet loaded) CureDatasets.
+    """
+    path = Path(path)
+    datasets = []
+    with open(path, newline="", encoding="utf-8") as f:
+        # line 1 is the header
+        for line, row in enumerate(csv.DictReader(f), start=2):
+            run_path = path.parent / row["file"].strip()
+            sample_weight = _optional_float(row.get("sample_weight"))
+            if sample_weight is None:
+                if run_path.suffix.lower() not in (".xlsx", ".xlsm"):
+                    raise ValueError(f"{path}, line {line}: {run_path.name} records no sample weight, "
+                                     f"give it in the sample_weight column.")
+                sample_weight = read_sample_weight(run_path)
+            datasets.append(CureDataset(
+                run_path,
+                temperature=float(row["temperature"]),
+                sample_weight=sample_weight,
+                start_time=_optional_float(row.get("start_time")),
+                end_time=_optional_float(row.get("end_time")),
+            ))
+    return datasets
+
+
+def process_run(dataset: CureDataset) -> Dict[str, float]:
+    """
+    Run the load -> window -> filter -> integrate pipeline of one run and
+    summarize it. Runs in a worker process, only the summary is sent back.
+    """
+    heat_flow = dataset.filtered_heat_flow
+    heat_released = dataset.heat_released
+    time = dataset.time
+    total_heat = float(heat_released[-1])
+    peak = int(np.argmax(heat_flow))
+    return {
+        "file": dataset.path.name,
+        "temperature": dataset.temperature,
+        "sample_weight": dataset.sample_weight,
+        "n_samples": len(time),
+        "duration": float(time[-1] - time[0]),
+        "total_heat": total_heat,
+        "peak_heat_flow": float(heat_flow[peak]),
+        "time_at_peak": float(time[peak]),
+        "time_to_half_heat": float(time[np.argmax(heat_released >= 0.5 * total_heat)]),
+        # initial heat release rate (W/g), turned into da/dt once delta_H_max is known
+        "initial_heat_flow": float((heat_released[1] - heat_released[0]) /
+                                   ((time[1] - time[0]) * TIME_UNIT_CONVERSION_FACTOR)),
+    }
+
+
+def run_batch(datasets: Sequence[CureDataset], max_workers: Optional[int] = None) -> List[Dict[str, float]]:
+    """
+    Process all runs across `max_workers` processes (default: all cores) and
+    return one result row per run, in manifest order.
+
+    The degree of cure and initial cure rate are normalized by the largest
+    total heat of the batch, like `CureStudy.delta_H_max`. An empty batch
+    gives no rows.
+    """
+    if not datasets:
+        return []
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(datasets) == 1:
+        rows = [process_run(d) for d in datasets]
+    else:
+        chunksize = max(1, len(datasets) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            rows = list(pool.map(process_run, datasets, chunksize=chunksize))
+
+    delta_H_max = max(row["total_heat"] for row in rows)
+    for row in rows:
+        row["degree_of_cure"] = row["total_heat"] / delta_H_max
+        row["initial_cure_rate"] = row.pop("initial_heat_flow") / delta_H_max
+    return rows
+
+
+def write_results(rows: Sequence[Dict[str, float]], path: Path) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process a manifest of isothermal DSC runs in parallel.")
+    parser.add_argument("manifest", type=Path)
+    parser.add_argument("-o", "--output", type=Path, default=Path("batch_results.csv"))
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    results = run_batch(read_manifest(args.manifest), max_workers=args.workers)
+    write_results(results, args.output)
+    for row in results:
+        print(f"{row['file']:>24} {row['temperature']:>6.1f} °C  dH = {row['total_heat']:8.2f} J/g  "
+              f"alpha = {row['degree_of_cure']:.3f}")
@@ -0,0 +1,63 @@
+"""
+Benchmark of the autocatalytic fit with stacked residuals and an analytic
+Jacobian against the previous list based residuals with finite difference
+Jacobian, which are kept below for the comparison.
+
+`nfev` of least_squares does not count the residual calls made for finite
+differences, so the model evaluations are counted separately.
+
+Run from the repository root: python -m cure_kinetics.bench_fit
+"""
+import timeit
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from cure_kinetics.dataset import default_study
+from cure_kinetics.fitting import LOWER_BOUNDS, SOLVER_SETTINGS, UPPER_BOUNDS, X0, fit_autocatalytic
+from cure_kinetics.kinetics import da_dt
+
+#---------------------------------------------------------------------------------------
+# Previous implementation:
+#---------------------------------------------------------------------------------------
+
+def legacy_fit_autocatalytic(A1, E1, data, alpha_vals, counter):
+    def residuals(params):
+        counter[0] += 1
+        log_A2, E2, m, n = params
+        A2 = 10 ** log_A2
+
+        res = []
+
+        for T, measured_rates in data.items():
+            predicted = da_dt(A1, E1, A2, E2, m, n, alpha_vals, T)
+            res.extend(predicted - measured_rates)
+
+        return np.array(res)
+
+    return least_squares(residuals, X0, bounds=(LOWER_BOUNDS, UPPER_BOUNDS), **SOLVER_SETTINGS)
+
+
+def counted(fit):
+    counter = [0]
+    result = fit(counter)
+    return result, counter[0]
+
+
+if __name__ == "__main__":
+    study = default_study()
+    A1, E1 = study.k1_parameters
+    data = {T + 273.15: study.rate_at_alpha(T) for T in study.fit_temperatures}
+
+    legacy, legacy_evals = counted(lambda c: legacy_fit_autocatalytic(A1, E1, data, study.alpha_vals, c))
+    new = fit_autocatalytic(A1, E1, data, study.alpha_vals)
+
+    t_legacy = min(timeit.repeat(lambda: legacy_fit_autocatalytic(A1, E1, data, study.alpha_vals, [0]),
+                                 number=5, repeat=5)) / 5
+    t_new = min(timeit.repeat(lambda: fit_autocatalytic(A1, E1, data, study.alpha_vals), number=5, repeat=5)) / 5
+
+    print(f"{'':>8} {'nfev':>5} {'njev':>5} {'model evals':>12} {'time (ms)':>10} {'cost':>12}")
+    print(f"{'legacy':>8} {legacy.nfev:>5} {legacy.njev:>5} {legacy_evals:>12} {t_legacy * 1e3:>10.2f} {legacy.cost:>12.6g}")
+    print(f"{'new':>8} {new.nfev:>5} {new.njev:>5} {new.nfev:>12} {t_new * 1e3:>10.2f} {new.cost:>12.6g}")
+    print(f"speedup {t_legacy / t_new:.1f}x, max relative parameter difference "
+          f"{np.max(np.abs(new.x - legacy.x) / np.abs(legacy.x)):.1e}")
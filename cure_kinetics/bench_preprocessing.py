@@ -0,0 +1,95 @@
+"""
+Benchmark of the array-native preprocessing stage (window -> normalize ->
+filter) against the previous list based implementation, which is kept
+below verbatim for the comparison.
+
+Run from the repository root: python -m cure_kinetics.bench_preprocessing
+"""
+import timeit
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.signal import butter, filtfilt
+
+from cure_kinetics.dataset import default_study
+from cure_kinetics.preprocessing import prepare_for_plotting
+from cure_kinetics.resources.constants import RAW_DATA_CUTOFF_FREQ, \
+    FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE, TIME_UNIT_CONVERSION_FACTOR
+
+#---------------------------------------------------------------------------------------
+# Previous implementation:
+#---------------------------------------------------------------------------------------
+
+def legacy_apply_lowpass_filter(data: list[float], time: list[float], cutoff_freq: float) -> np.ndarray:
+    t = np.array(time)
+    x = np.array(data)
+    dt = np.mean(np.diff(t))
+    fs = 1.0 / dt
+    order = 2
+    b, a = butter(order, cutoff_freq / (0.5 * fs), btype="low")
+    x_lp = filtfilt(b, a, x)
+    return x_lp.tolist()
+
+def legacy_window_data(data: Dict[str, list[float]], start_time: Optional[float] = None, end_time: Optional[float]=None) -> Dict[str, list[float]]:
+    time = np.array(data['Time'])
+    if start_time:
+        index_at_start_time = next(
+            i for i, t in enumerate(time) if t >= start_time)
+    else:
+        index_at_start_time = 0
+    if end_time:
+        index_at_end_time = next(
+            i for i, t in enumerate(time) if t >= end_time)
+    else:
+        index_at_end_time = len(time)
+    unsubtracted_heat_flow = np.array(data['Unsubtracted'])
+    baseline_heat_flow = np.array(data['Baseline'])
+    net_heat_flow = unsubtracted_heat_flow - baseline_heat_flow
+    index_first_exotherm = next(
+        i for i, v in enumerate(net_heat_flow) if v > 0)
+    start_index = max(index_first_exotherm, index_at_start_time)
+    data_out = {}
+    for key, item in data.items():
+        data_out[key] = item[start_index:index_at_end_time]
+    return data_out
+
+def legacy_prepare_for_plotting(data: Dict[str, list[float]], sample_weight: float, start_time: Optional[float]=None, end_time: Optional[float]= None) ->Dict[str, list[float]]:
+    windowed_data = legacy_window_data(data, start_time, end_time)
+    unsubtracted_heat_flow = np.array(windowed_data['Unsubtracted'])
+    baseline_heat_flow = np.array(windowed_data['Baseline'])
+    net_heat_flow = unsubtracted_heat_flow - baseline_heat_flow
+    net_heat_flow = net_heat_flow / sample_weight
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i, flow in enumerate(unsubtracted_heat_flow[:-2]):
+            if flow / unsubtracted_heat_flow[i+1] >5:
+                unsubtracted_heat_flow[i+1] = (flow + unsubtracted_heat_flow[i+2]) / 2
+    nr_indices = FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE * len(net_heat_flow)
+    final_heat_flow_at_end = net_heat_flow[-int(nr_indices):].mean()
+    net_heat_flow -= final_heat_flow_at_end
+    data_out = {}
+    for key, item in windowed_data.items():
+        data_out[key] = item
+    data_out['Net Heat Flow'] = net_heat_flow.tolist()
+    data_out['Filtered Heat Flow'] = legacy_apply_lowpass_filter(
+        data_out['Net Heat Flow'], data_out['Time'], cutoff_freq=RAW_DATA_CUTOFF_FREQ)
+    data_out['Time Seconds'] = [t * TIME_UNIT_CONVERSION_FACTOR for t in data_out['Time']]
+    return data_out
+
+
+if __name__ == "__main__":
+    study = default_study()
+    print(f"{'run':>6} {'samples':>8} {'legacy (ms)':>12} {'array (ms)':>11} {'speedup':>8} {'max abs diff':>13}")
+    for temperature, dataset in study.datasets.items():
+        raw = dataset.raw
+        kwargs = dict(sample_weight=dataset.sample_weight, start_time=dataset.start_time, end_time=dataset.end_time)
+
+        legacy = legacy_prepare_for_plotting(raw, **kwargs)
+        new = prepare_for_plotting(raw, **kwargs)
+        diff = max(np.max(np.abs(np.asarray(legacy[key]) - np.asarray(new[key])))
+                   for key in ('Time', 'Net Heat Flow', 'Filtered Heat Flow', 'Time Seconds'))
+
+        n_repeat = 5
+        t_legacy = min(timeit.repeat(lambda: legacy_prepare_for_plotting(raw, **kwargs), number=1, repeat=n_repeat))
+        t_new = min(timeit.repeat(lambda: prepare_for_plotting(raw, **kwargs), number=1, repeat=n_repeat))
+        print(f"{temperature:>6} {len(new['Time']):>8} {t_legacy * 1e3:>12.1f} {t_new * 1e3:>11.1f} "
+              f"{t_legacy / t_new:>8.1f} {diff:>13.3g}")
@@ -0,0 +1,76 @@
+"""
+Speed and accuracy of the isothermal cure simulator against the previous
+forward Euler loop (kept below) and a high resolution Radau reference,
+of the ensemble simulator against calling simulate_cure in a loop, and of
+the temperature program integrator against Radau.
+
+Run from the repository root: python -m cure_kinetics.bench_simulation
+"""
+import timeit
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from cure_kinetics.dataset import default_study
+from cure_kinetics.kinetics import da_dt
+from cure_kinetics.simulation import TemperatureProgram, reference_solution, simulate_cure, \
+    simulate_cure_ensemble, simulate_cure_programs
+
+
+def legacy_simulate_cure(A1, E1, A2, E2, m, n, T_C, t_lst):
+    T = T_C + 273.15
+    alpha = 0.0
+    alpha_vals = []
+    da_dt_vals = []
+    for i in range(1, len(t_lst)):
+        dt = t_lst[i] - t_lst[i-1]
+        dadt = da_dt(A1, E1, A2, E2, m, n, alpha, T)
+        alpha += dadt * dt
+
+        da_dt_vals.append(dadt)
+        alpha_vals.append(alpha)
+    return np.array(alpha_vals), np.array(da_dt_vals)
+
+
+if __name__ == "__main__":
+    params = default_study().kinetic_parameters
+    t_lst = np.linspace(0, 30000, 10000)
+
+    print(f"{'T (°C)':>7} {'euler (ms)':>11} {'new (ms)':>9} {'speedup':>8} {'euler err':>10} {'new err':>9}")
+    for T_C in (120, 150, 180):
+        reference = reference_solution(params, T_C, t_lst)
+
+        euler_alpha = np.concatenate([[0.0], legacy_simulate_cure(*params, T_C, t_lst)[0]])
+        new_alpha = simulate_cure(*params, T_C, t_lst)[0]
+
+        t_euler = min(timeit.repeat(lambda: legacy_simulate_cure(*params, T_C, t_lst), number=1, repeat=3))
+        t_new = min(timeit.repeat(lambda: simulate_cure(*params, T_C, t_lst), number=20, repeat=5)) / 20
+        print(f"{T_C:>7} {t_euler * 1e3:>11.2f} {t_new * 1e3:>9.3f} {t_euler / t_new:>8.0f} "
+              f"{np.max(np.abs(euler_alpha - reference)):>10.2e} {np.max(np.abs(new_alpha - reference)):>9.2e}")
+
+    # ensemble of perturbed parameter sets at random temperatures
+    n_runs = 1000
+    rng = np.random.default_rng(0)
+    ensemble_params = np.array(params) * rng.uniform(0.95, 1.05, (n_runs, 6))
+    ensemble_T = rng.uniform(100, 200, n_runs)
+    t_coarse = np.linspace(0, 30000, 200)
+
+    t_ensemble = min(timeit.repeat(lambda: simulate_cure_ensemble(ensemble_params, ensemble_T, t_coarse), number=1, repeat=3))
+    t_loop = min(timeit.repeat(lambda: [simulate_cure(*ensemble_params[i], ensemble_T[i], t_coarse)
+                                        for i in range(n_runs)], number=1, repeat=3))
+    n_euler = 20
+    t_euler = min(timeit.repeat(lambda: [legacy_simulate_cure(*ensemble_params[i], ensemble_T[i], t_lst)
+                                         for i in range(n_euler)], number=1, repeat=3)) * n_runs / n_euler
+    print(f"\n{n_runs} runs x {len(t_coarse)} times: ensemble {t_ensemble * 1e3:.0f} ms, "
+          f"simulate_cure loop {t_loop * 1e3:.0f} ms, euler loop ~{t_euler * 1e3:.0f} ms")
+
+    # cure cycles: heat-up, dwell at 120 °C, cure at T, cool down
+    cycles = [TemperatureProgram(20).ramp(120, 2).hold(60).ramp(T, 2).hold(120).ramp(20, 5)
+              for T in np.linspace(140, 200, n_runs)]
+    for cycle in (cycles[0], cycles[-1]):
+        reference = solve_ivp(lambda t, y: da_dt(*params, np.clip(y, 0, 1), cycle.temperature(t) + 273.15),
+                              (0, t_lst[-1]), [0.0], method="Radau", t_eval=t_lst, rtol=1e-12, atol=1e-14).y[0]
+        error = np.max(np.abs(simulate_cure_programs(params, cycle, t_lst)[0] - reference))
+        print(f"cycle to {cycle.max_temperature:.0f} °C: max abs error {error:.2e}")
+    t_cycles = min(timeit.repeat(lambda: simulate_cure_programs(params, cycles, t_coarse), number=1, repeat=3))
+    print(f"{n_runs} cycles x {len(t_coarse)} times: {t_cycles * 1e3:.0f} ms ({t_cycles / n_runs * 1e3:.3f} ms per cycle)")
@@ -0,0 +1,57 @@
+"""
+Benchmark of a cutoff frequency sweep with and without the shared stage
+cache: every setting builds new datasets, which either start from scratch
+(load from the column cache, window, normalize, filter, integrate) or reuse
+the stages before filtering.
+
+Run from the repository root: python -m cure_kinetics.bench_stages
+"""
+import time
+
+import numpy as np
+
+from common.stage_cache import StageCache
+from cure_kinetics.dataset import CureDataset, default_study
+from cure_kinetics.preprocessing import apply_lowpass_filter
+
+CUTOFF_FREQS = np.geomspace(0.05, 2.0, 36)  # 1/min
+
+
+def sweep(datasets, stage_cache_factory):
+    """Total heat of every run at every cutoff frequency."""
+    totals = np.empty((len(CUTOFF_FREQS), len(datasets)))
+    for i, cutoff_freq in enumerate(CUTOFF_FREQS):
+        for j, d in enumerate(datasets):
+            dataset = CureDataset(d.path, d.temperature, d.sample_weight, d.start_time, d.end_time,
+                                  cutoff_freq=cutoff_freq, baseline_fraction=d.baseline_fraction,
+                                  stage_cache=stage_cache_factory())
+            totals[i, j] = dataset.total_heat
+    return totals
+
+
+if __name__ == "__main__":
+    datasets = list(default_study().datasets.values())
+    for d in datasets:
+        d.heat_released  # the column cache and file hashes are warm for both sweeps
+
+    start = time.perf_counter()
+    cold = sweep(datasets, StageCache)
+    t_cold = time.perf_counter() - start
+
+    shared = StageCache()
+    start = time.perf_counter()
+    warm = sweep(datasets, lambda: shared)
+    t_warm = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for cutoff_freq in CUTOFF_FREQS:
+        for d in datasets:
+            apply_lowpass_filter(d.net_heat_flow, d.time, cutoff_freq)
+    t_filter = time.perf_counter() - start
+
+    n = len(CUTOFF_FREQS) * len(datasets)
+    print(f"{len(CUTOFF_FREQS)} cutoff frequencies x {len(datasets)} runs")
+    print(f"every stage per setting: {t_cold / n * 1e3:6.2f} ms per run")
+    print(f"shared stage cache:      {t_warm / n * 1e3:6.2f} ms per run ({shared.hits} hits, {shared.misses} misses)")
+    print(f"filter pass alone:       {t_filter / n * 1e3:6.2f} ms per run")
+    print(f"max abs difference {np.max(np.abs(cold - warm)):.3g} J/g")
@@ -0,0 +1,283 @@
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from common.cache_dir import CACHE_DIR
+from common.column_cache import file_hash
+from common.result_store import ResultStore, fingerprint
+from common.stage_cache import StageCache
+from cure_kinetics.dsc_workbook import load_dsc_export
+from cure_kinetics.fitting import ALPHA_VALS, X0, LOWER_BOUNDS, UPPER_BOUNDS, SOLVER_SETTINGS, \
+    JOINT_LOWER_BOUNDS, JOINT_UPPER_BOUNDS, JOINT_SEED, JOINT_X_SCALE, N_STARTS, SCREEN_POINTS, SCREEN_SETTINGS, \
+    fit_autocatalytic, fit_joint, fit_k1
+from cure_kinetics.integration import integrate_heat_flow_rate
+from cure_kinetics.kinetics import KineticParameters, interp_rate
+from cure_kinetics.preprocessing import apply_lowpass_filter, normalize_heat_flow, window_data
+from cure_kinetics.resources.constants import START_TIME_120, START_TIME_150, SAMPLE_WEIGHT_120, \
+    SAMPLE_WEIGHT_150, SAMPLE_WEIGHT_180, RAW_DATA_CUTOFF_FREQ, \
+    FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE, END_TIME_120, TIME_UNIT_CONVERSION_FACTOR
+
+RESOURCES = Path(__file__).parent / "resources"
+
+# Part of every stored fit key, bump when the pipeline changes its results.
+PIPELINE_VERSION = 2
+
+# Only these columns of the DSC exports are used, the rest is not parsed.
+DSC_COLUMNS = ("Time", "Unsubtracted", "Baseline")
+
+# Stage outputs shared by all datasets of this process.
+STAGES = StageCache()
+
+
+@lru_cache(maxsize=None)
+def _file_hash(path: Path, mtime_ns: int, size: int) -> str:
+    return file_hash(path)
+
+
+def source_hash(path: Path) -> str:
+    """file_hash of `path`, only recomputed when the file is modified."""
+    stat = Path(path).stat()
+    return _file_hash(Path(path).resolve(), stat.st_mtime_ns, stat.st_size)
+
+
+class CureDataset:
+    """
+    One isothermal DSC run. Every stage (load -> window -> normalize ->
+    filter -> integrate) is computed on first access and memoized, so
+    nothing is read from disk until a result is actually needed.
+
+    Stage outputs are also kept in `stage_cache` (STAGES by default) under
+    a key chained from the stage before and the stage's own settings, so
+    datasets of the same file share the stages their settings agree on: a
+    new cutoff frequency reuses the loaded, windowed and normalized arrays
+    and only filters and integrates again.
+    """
+    def __init__(self, path: Path, temperature: float, sample_weight: float,
+                 start_time: Optional[float] = None, end_time: Optional[float] = None,
+                 cutoff_freq: float = RAW_DATA_CUTOFF_FREQ,
+                 baseline_fraction: float = FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE,
+                 stage_cache: Optional[StageCache] = None):
+        self.path = Path(path)
+        self.temperature = temperature  # °C
+        self.sample_weight = sample_weight  # mg
+        self.start_time = start_time  # minutes
+        self.end_time = end_time  # minutes
+        self.cutoff_freq = cutoff_freq  # 1/minutes
+        self.baseline_fraction = baseline_fraction
+        self.stage_cache = STAGES if stage_cache is None else stage_cache
+
+    def __repr__(self):
+        return f"CureDataset({self.path.name!r}, temperature={self.temperature})"
+
+    def __getstate__(self):
+        # a dataset sent to a worker process uses that process' STAGES, not a copy of ours
+        state = dict(self.__dict__)
+        if state["stage_cache"] is STAGES:
+            state["stage_cache"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.stage_cache is None:
+            self.stage_cache = STAGES
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest of the source file contents and all preprocessing settings."""
+        return fingerprint(source_hash(self.path), self.temperature, self.sample_weight, self.start_time,
+                           self.end_time, self.cutoff_freq, self.baseline_fraction)
+
+    @cached_property
+    def stage_keys(self) -> Dict[str, str]:
+        """Cache key of every stage, each depending on the one before and the stage's settings."""
+        raw = fingerprint("raw", source_hash(self.path), DSC_COLUMNS)
+        windowed = fingerprint("windowed", raw, self.start_time, self.end_time)
+        net_heat_flow = fingerprint("net_heat_flow", windowed, self.sample_weight, self.baseline_fraction)
+        filtered_heat_flow = fingerprint("filtered_heat_flow", net_heat_flow, self.cutoff_freq)
+        return {
+            "raw": raw,
+            "windowed": windowed,
+            "time_seconds": fingerprint("time_seconds", windowed),
+            "net_heat_flow": net_heat_flow,
+            "filtered_heat_flow": filtered_heat_flow,
+            "heat_released": fingerprint("heat_released", filtered_heat_flow),
+        }
+
+    def _stage(self, name: str, compute):
+        return self.stage_cache.get_or_compute(self.stage_keys[name], compute)
+
+    @cached_property
+    def raw(self) -> Dict[str, np.ndarray]:
+        return self._stage("raw", lambda: load_dsc_export(self.path, columns=DSC_COLUMNS))
+
+    @cached_property
+    def windowed(self) -> Dict[str, np.ndarray]:
+        return self._stage("windowed", lambda: window_data(self.raw, self.start_time, self.end_time))
+
+    @property
+    def time(self) -> np.ndarray:
+        """Time since start of the run (minutes)."""
+        return np.asarray(self.windowed['Time'])
+
+    @cached_property
+    def time_seconds(self) -> np.ndarray:
+        return self._stage("time_seconds", lambda: self.time * TIME_UNIT_CONVERSION_FACTOR)
+
+    @cached_property
+    def net_heat_flow(self) -> np.ndarray:
+        """Net specific heat flow (W/g), zero at the end of the run."""
+        return self._stage("net_heat_flow",
+                           lambda: normalize_heat_flow(self.windowed, self.sample_weight, self.baseline_fraction))
+
+    @cached_property
+    def filtered_heat_flow(self) -> np.ndarray:
+        return self._stage("filtered_heat_flow",
+                           lambda: apply_lowpass_filter(self.net_heat_flow, self.time, cutoff_freq=self.cutoff_freq))
+
+    @cached_property
+    def heat_released(self) -> np.ndarray:
+        """Cumulative heat released (J/g)."""
+        return self._stage("heat_released",
+                           lambda: integrate_heat_flow_rate(self.filtered_heat_flow, self.time_seconds))
+
+    @property
+    def total_heat(self) -> float:
+        return float(self.heat_released[-1])
+
+    def as_dict(self) -> Dict[str, np.ndarray]:
+        """
+        The windowed columns plus the derived heat flows, keyed like the
+        output of `prepare_for_plotting`.
+        """
+        data_out = dict(self.windowed)
+        data_out['Net Heat Flow'] = self.net_heat_flow
+        data_out['Filtered Heat Flow'] = self.filtered_heat_flow
+        data_out['Time Seconds'] = self.time_seconds
+        return data_out
+
+
+class CureStudy:
+    """
+    A set of isothermal runs of one resin, normalized by a common reference
+    enthalpy, and the kinetic parameters fitted to them.
+
+    The reference enthalpy defaults to the largest total heat of all runs,
+    which needs every run to be integrated. Pass `delta_H_ref` (J/g) to
+    work with a single run without touching the others.
+
+    With a `parameter_store`, fitted parameters are looked up by the
+    fingerprint of the runs and all fit settings before fitting, so an
+    unchanged study is never refitted (nor even loaded).
+    """
+    def __init__(self, datasets: Iterable[CureDataset], delta_H_ref: Optional[float] = None,
+                 k1_temperatures: Sequence[float] = (120, 150), fit_temperatures: Sequence[float] = (120, 180),
+                 alpha_vals: np.ndarray = ALPHA_VALS, parameter_store: Optional[ResultStore] = None):
+        self.datasets = {d.temperature: d for d in datasets}
+        self._delta_H_ref = delta_H_ref
+        self.k1_temperatures = tuple(k1_temperatures)
+        self.fit_temperatures = tuple(fit_temperatures)
+        self.alpha_vals = alpha_vals
+        self.parameter_store = parameter_store
+
+        self._fraction_cured: Dict[float, np.ndarray] = {}
+        self._cure_rate: Dict[float, np.ndarray] = {}
+
+    def __getitem__(self, temperature: float) -> CureDataset:
+        return self.datasets[temperature]
+
+    @property
+    def temperatures(self):
+        return sorted(self.datasets)
+
+    @cached_property
+    def delta_H_max(self) -> float:
+        if self._delta_H_ref is not None:
+            return self._delta_H_ref
+        return max(d.total_heat for d in self.datasets.values())
+
+    def fraction_cured(self, temperature: float) -> np.ndarray:
+        if temperature not in self._fraction_cured:
+            self._fraction_cured[temperature] = self[temperature].heat_released / self.delta_H_max
+        return self._fraction_cured[temperature]
+
+    def cure_rate(self, temperature: float) -> np.ndarray:
+        """da/dt (1/s) of the run at `temperature`."""
+        if temperature not in self._cure_rate:
+            self._cure_rate[temperature] = np.gradient(self.fraction_cured(temperature), self[temperature].time_seconds)
+        return self._cure_rate[temperature]
+
+    @cached_property
+    def k1_parameters(self):
+        """(A1, E1) from the initial cure rates at `k1_temperatures`."""
+        initial_rates = [self.cure_rate(T)[0] for T in self.k1_temperatures]
+        return fit_k1(initial_rates, np.array(self.k1_temperatures) + 273.15)
+
+    def rate_at_alpha(self, temperature: float, alpha_vals: Optional[np.ndarray] = None) -> np.ndarray:
+        alpha_vals = self.alpha_vals if alpha_vals is None else alpha_vals
+        return interp_rate(self.fraction_cured(temperature), self.cure_rate(temperature), alpha_vals)
+
+    @cached_property
+    def autocatalytic_fit(self) -> OptimizeResult:
+        A1, E1 = self.k1_parameters
+        data = {T + 273.15: self.rate_at_alpha(T) for T in self.fit_temperatures}
+        return fit_autocatalytic(A1, E1, data, self.alpha_vals)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Digest of every input of the kinetic fit."""
+        return fingerprint(PIPELINE_VERSION,
+                           [self.datasets[T].fingerprint for T in self.temperatures], self._delta_H_ref,
+                           self.k1_temperatures, self.fit_temperatures, self.alpha_vals,
+                           X0, LOWER_BOUNDS, UPPER_BOUNDS, SOLVER_SETTINGS)
+
+    def _fit_kinetic_parameters(self) -> KineticParameters:
+        A1, E1 = self.k1_parameters
+        log_A2, E2, m, n = self.autocatalytic_fit.x
+        return KineticParameters(*(float(v) for v in (A1, E1, 10 ** log_A2, E2, m, n)))
+
+    @cached_property
+    def kinetic_parameters(self) -> KineticParameters:
+        if self.parameter_store is None:
+            return self._fit_kinetic_parameters()
+        record = self.parameter_store.get_or_compute(
+            self.fingerprint, lambda: self._fit_kinetic_parameters()._asdict())
+        return KineticParameters(**record)
+
+    @cached_property
+    def joint_fit(self) -> OptimizeResult:
+        """All six parameters fitted together to every run, started from the sequential fit and N_STARTS more points."""
+        p = self.kinetic_parameters
+        data = {T + 273.15: self.rate_at_alpha(T) for T in self.temperatures}
+        x0 = [np.log10(p.A1), p.E1, np.log10(p.A2), p.E2, p.m, p.n]
+        return fit_joint(data, self.alpha_vals, x0=x0)
+
+    def _fit_joint_parameters(self) -> KineticParameters:
+        log_A1, E1, log_A2, E2, m, n = self.joint_fit.x
+        return KineticParameters(*(float(v) for v in (10 ** log_A1, E1, 10 ** log_A2, E2, m, n)))
+
+    @cached_property
+    def joint_kinetic_parameters(self) -> KineticParameters:
+        if self.parameter_store is None:
+            return self._fit_joint_parameters()
+        key = fingerprint(self.fingerprint, "joint", JOINT_LOWER_BOUNDS, JOINT_UPPER_BOUNDS, JOINT_X_SCALE,
+                          N_STARTS, JOINT_SEED, SCREEN_POINTS, SCREEN_SETTINGS)
+        record = self.parameter_store.get_or_compute(key, lambda: self._fit_joint_parameters()._asdict())
+        return KineticParameters(**record)
+
+
+@lru_cache(maxsize=None)
+def default_study() -> CureStudy:
+    """
+    The three isothermal runs shipped in `resources/`. Building the study
+    is free, each run is only loaded when one of its results is used.
+    """
+    return CureStudy([
+        CureDataset(RESOURCES / "isothermal_120.txt", 120, SAMPLE_WEIGHT_120,
+                    start_time=START_TIME_120, end_time=END_TIME_120),
+        CureDataset(RESOURCES / "isothermal_150.txt", 150, SAMPLE_WEIGHT_150,
+                    start_time=START_TIME_150),
+        CureDataset(RESOURCES / "isothermal_180.txt", 180, SAMPLE_WEIGHT_180),
+    ], parameter_store=ResultStore(CACHE_DIR / "kinetic_parameters"))
@@ -0,0 +1,106 @@
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from common.column_cache import load_columns
+
+# Sheet of the Pyris workbooks that holds the run, the other sheet is a README.
+DATA_SHEET = "Sheet1"
+
+# Method steps are introduced by rows like '2) Sapphire DSC Isothermal'.
+METHOD_STEP_PATTERN = re.compile(r"^\s*\d+\)")
+
+
+def _open_data_sheet(path: Path):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Reading .xlsx DSC workbooks requires openpyxl (pip install openpyxl).") from e
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    sheet = workbook[DATA_SHEET] if DATA_SHEET in workbook.sheetnames else workbook.worksheets[0]
+    return workbook, sheet
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def read_dsc_workbook(path: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Stream the last method step (the isothermal hold) out of a Pyris DSC
+    workbook, e.g. `LME_0_13_120.xlsx`, and return it as a dict mapping
+    header -> column array, with the same headers as the txt exports.
+
+    The sheet is read row by row in read-only mode: the metadata block,
+    earlier method steps and the trailing calibration tables are skipped.
+    """
+    workbook, sheet = _open_data_sheet(Path(path))
+    try:
+        header: Optional[List[str]] = None
+        first_col = 0
+        rows: List[tuple] = []
+        for row in sheet.iter_rows(values_only=True):
+            if header is None:
+                # the column headers are the first row with a 'Time' cell
+                names = [str(v).strip() if v is not None else "" for v in row]
+                if "Time" in names:
+                    first_col = names.index("Time")
+                    header = [n for n in names[first_col:] if n]
+                continue
+
+            values = row[first_col:first_col + len(header)]
+            if len(values) == len(header) and all(_is_number(v) for v in values):
+                rows.append(values)
+            elif row[0] is not None and METHOD_STEP_PATTERN.match(str(row[0])):
+                # a new method step starts, only the last one is returned
+                rows = []
+            elif rows:
+                # calibration tables follow the data, nothing left to read
+                break
+    finally:
+        workbook.close()
+
+    if header is None:
+        raise ValueError(f"No 'Time' header row found in {path}.")
+
+    if columns is None:
+        columns = header
+    missing = [c for c in columns if c not in header]
+    if missing:
+        raise KeyError(f"Columns {missing} not found in {path}.")
+
+    table = np.array(rows, dtype=float).reshape(-1, len(header))
+    return {c: np.ascontiguousarray(table[:, header.index(c)]) for c in columns}
+
+
+def read_sample_weight(path: Path) -> float:
+    """
+    Return the sample weight (mg) recorded in the metadata block of a DSC workbook.
+    """
+    workbook, sheet = _open_data_sheet(Path(path))
+    try:
+        for row in sheet.iter_rows(values_only=True, max_row=50):
+            label = str(row[0]).strip() if row[0] is not None else ""
+            if label == "Display Weight:" and _is_number(row[1]):
+                return float(row[1])
+            if label == "Sample Weight:" and row[1] is not None:
+                return float(str(row[1]).split()[0])
+    finally:
+        workbook.close()
+    raise ValueError(f"No sample weight found in {path}.")
+
+
+def load_dsc_export(path: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Load a DSC run from either a raw `.xlsx` workbook or a txt export.
+
+    Both go through the binary column cache, so a workbook is only streamed
+    once and later runs reload the cached arrays.
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        return load_columns(path, columns=columns, reader=read_dsc_workbook)
+    return load_columns(path, columns=columns)
@@ -0,0 +1,210 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares, OptimizeResult
+from scipy.stats import qmc
+
+from cure_kinetics.resources.constants import R
+
+#---------------------------------------------------------------------------------------
+# Defaults of the autocatalytic fit:
+#---------------------------------------------------------------------------------------
+ALPHA_VALS = np.linspace(0.05, 0.95, 400)
+
+X0 = np.array([6.0, 6e4, 1.2, 1.25])  # log_A2, E2, m, n
+
+# Bounds in *physical space*
+LOWER_BOUNDS = [3.0, 3e4, 0.1, 0.1]   # log10(A2), E2, m, n
+UPPER_BOUNDS = [10.0, 2e5, 3.0, 3.0]
+
+SOLVER_SETTINGS = dict(method="trf", ftol=1e-12, xtol=1e-12, gtol=1e-12, max_nfev=20000)
+
+
+def fit_k1(initial_rates: Sequence[float], temperatures: Sequence[float]) -> Tuple[float, float]:
+    """
+    Fit A1, E1 to the cure rate at alpha = 0 of isothermal runs.
+    Temperatures in Kelvin.
+
+    linearize and use least squares to fit: ln(d) = -E1 * (1/(R*T)) + ln(A1)
+    """
+    x = 1.0 / (R * np.asarray(temperatures, dtype=float))
+    y = np.log(initial_rates)
+    m, b = np.polyfit(x, y, 1)
+
+    E1 = -m
+    A1 = np.exp(b)
+    return A1, E1
+
+
+class StackedRateModel:
+    """
+    Kamal-Sourour cure rate of several isothermal runs on a common alpha
+    grid, evaluated as one stacked (n_T * n_alpha,) array.
+
+    `data` maps temperature (K) -> measured cure rate at `alpha_vals`.
+    Parameters are x = (log10(A1), E1, log10(A2), E2, m, n); everything
+    that does not depend on them is computed once here.
+    """
+    def __init__(self, data: Dict[float, np.ndarray], alpha_vals: np.ndarray):
+        T = np.array(list(data.keys()), dtype=float)[:, np.newaxis]
+        alpha = np.asarray(alpha_vals, dtype=float)
+        self.data = data
+        self.alpha_vals = alpha
+        self.measured = np.stack([np.asarray(rates, dtype=float) for rates in data.values()])
+        self.inv_RT = 1.0 / (R * T)
+        self.log_alpha = np.log(alpha)
+        self.log_unreacted = np.log1p(-alpha)
+
+    def subsample(self, max_points: int) -> 'StackedRateModel':
+        """The same model on every k-th alpha point, at most `max_points` per run."""
+        step = -(-len(self.alpha_vals) // max_points)
+        if step == 1:
+            return self
+        return StackedRateModel({T: rates[::step] for T, rates in zip(self.data, self.measured)},
+                                self.alpha_vals[::step])
+
+    def terms(self, x):
+        """Non-catalytic and autocatalytic part of the rate, both (n_T, n_alpha)."""
+        log_A1, E1, log_A2, E2, m, n = x
+        unreacted_n = np.exp(n * self.log_unreacted)
+        k1 = 10 ** log_A1 * np.exp(-E1 * self.inv_RT)
+        k2 = 10 ** log_A2 * np.exp(-E2 * self.inv_RT)
+        return k1 * unreacted_n, k2 * np.exp(m * self.log_alpha) * unreacted_n
+
+    def residuals(self, x) -> np.ndarray:
+        catalytic, autocatalytic = self.terms(x)
+        return (catalytic + autocatalytic - self.measured).ravel()
+
+    def jacobian(self, x) -> np.ndarray:
+        catalytic, autocatalytic = self.terms(x)
+        return np.column_stack([
+            (np.log(10.0) * catalytic).ravel(),                             # d/d log_A1
+            (-self.inv_RT * catalytic).ravel(),                             # d/d E1
+            (np.log(10.0) * autocatalytic).ravel(),                         # d/d log_A2
+            (-self.inv_RT * autocatalytic).ravel(),                         # d/d E2
+            (self.log_alpha * autocatalytic).ravel(),                       # d/d m
+            (self.log_unreacted * (catalytic + autocatalytic)).ravel(),     # d/d n
+        ])
+
+
+def fit_autocatalytic(A1: float, E1: float, data: Dict[float, np.ndarray], alpha_vals: np.ndarray = ALPHA_VALS,
+                      x0: Sequence[float] = X0, lower_bounds: Sequence[float] = LOWER_BOUNDS,
+                      upper_bounds: Sequence[float] = UPPER_BOUNDS, **solver_settings) -> OptimizeResult:
+    """
+    Fit log10(A2), E2, m, n of the autocatalytic term, with A1, E1 fixed.
+
+    `data` maps temperature (K) -> measured cure rate at `alpha_vals`.
+    Returns the `least_squares` result, `result.x` is (log_A2, E2, m, n).
+
+    The residuals of all temperatures are one stacked (n_T * n_alpha,) array
+    and the Jacobian is analytic; pass jac="2-point" to fall back to finite
+    differences.
+    """
+    settings = dict(SOLVER_SETTINGS, **solver_settings)
+    model = StackedRateModel(data, alpha_vals)
+    fixed = [np.log10(A1), E1]
+
+    def residuals(params):
+        return model.residuals([*fixed, *params])
+
+    def jacobian(params):
+        return model.jacobian([*fixed, *params])[:, 2:]
+
+    settings.setdefault("jac", jacobian)
+    return least_squares(
+        residuals,
+        x0,
+        bounds=(lower_bounds, upper_bounds),
+        **settings
+    )
+
+
+#---------------------------------------------------------------------------------------
+# Joint fit of all six parameters:
+#---------------------------------------------------------------------------------------
+JOINT_LOWER_BOUNDS = [0.0, 2e4, 0.0, 2e4, 0.1, 0.1]   # log10(A1), E1, log10(A2), E2, m, n
+JOINT_UPPER_BOUNDS = [15.0, 2e5, 15.0, 2e5, 3.0, 3.0]
+
+# E is in J/mol, the other parameters are O(1)
+JOINT_X_SCALE = np.array([1.0, 1e4, 1.0, 1e4, 1.0, 1.0])
+
+N_STARTS = 16
+# Seed of the Latin hypercube of starting points, fixed so that repeated fits agree.
+JOINT_SEED = 0
+
+# The starts are fitted on at most this many alpha points per run, with loose
+# tolerances; only the best one is refined on all points with SOLVER_SETTINGS.
+SCREEN_POINTS = 100
+SCREEN_SETTINGS = dict(SOLVER_SETTINGS, ftol=1e-8, xtol=1e-8, gtol=1e-8, max_nfev=500)
+
+
+def multistart_points(model: StackedRateModel, n_starts: int, lower_bounds: Sequence[float] = JOINT_LOWER_BOUNDS,
+                      upper_bounds: Sequence[float] = JOINT_UPPER_BOUNDS, seed: Optional[int] = JOINT_SEED
+                      ) -> np.ndarray:
+    """
+    (n_starts, 6) starting points for the joint fit.
+
+    log10(A) and E are strongly correlated, so instead of drawing them
+    independently, E and the rate constant at the mean temperature of the
+    runs are drawn (Latin hypercube), the latter within a few decades of
+    the measured rates, and log10(A) follows from both.
+    """
+    lower, upper = np.asarray(lower_bounds, dtype=float), np.asarray(upper_bounds, dtype=float)
+    sample = qmc.LatinHypercube(d=6, seed=seed).random(n_starts)
+
+    inv_RT_ref = float(np.mean(model.inv_RT))
+    log_rate = np.log10(np.max(np.abs(model.measured)))
+    log_k_ref = log_rate - 3.0 + 3.0 * sample[:, [0, 2]]
+    E = lower[[1, 3]] + (upper[[1, 3]] - lower[[1, 3]]) * sample[:, [1, 3]]
+    log_A = log_k_ref + E * inv_RT_ref / np.log(10.0)
+
+    points = lower + (upper - lower) * sample
+    points[:, [0, 2]] = log_A
+    points[:, [1, 3]] = E
+    return np.clip(points, lower, upper)
+
+
+def _fit_from_start(model: StackedRateModel, x0: np.ndarray, bounds, settings) -> OptimizeResult:
+    return least_squares(model.residuals, x0, jac=model.jacobian, bounds=bounds, x_scale=JOINT_X_SCALE, **settings)
+
+
+def fit_joint(data: Dict[float, np.ndarray], alpha_vals: np.ndarray = ALPHA_VALS, x0: Optional[Sequence[float]] = None,
+              n_starts: int = N_STARTS, max_workers: Optional[int] = None, seed: Optional[int] = JOINT_SEED,
+              lower_bounds: Sequence[float] = JOINT_LOWER_BOUNDS, upper_bounds: Sequence[float] = JOINT_UPPER_BOUNDS,
+              **solver_settings) -> OptimizeResult:
+    """
+    Fit log10(A1), E1, log10(A2), E2, m, n together to every run in `data`
+    (temperature (K) -> measured cure rate at `alpha_vals`).
+
+    `n_starts` starting points (plus `x0`, if given) are fitted with loose
+    tolerances on a subsampled alpha grid across `max_workers` processes
+    (default: all cores), the best one is refined on all points with the
+    full solver settings. Residuals and the analytic Jacobian are stacked
+    arrays, so the cost grows linearly with the number of runs and only the
+    refinement sees the full alpha grid.
+
+    Returns the refined `least_squares` result with `result.starts`, the
+    final cost of every start.
+    """
+    model = StackedRateModel(data, alpha_vals)
+    screen_model = model.subsample(SCREEN_POINTS)
+    bounds = (lower_bounds, upper_bounds)
+    starts = multistart_points(model, n_starts, lower_bounds, upper_bounds, seed)
+    if x0 is not None:
+        starts = np.vstack([np.clip(x0, lower_bounds, upper_bounds), starts])
+
+    max_workers = max_workers or os.cpu_count() or 1
+    n_starts = len(starts)
+    if max_workers == 1 or n_starts == 1:
+        screened = [_fit_from_start(screen_model, start, bounds, SCREEN_SETTINGS) for start in starts]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, n_starts)) as pool:
+            screened = list(pool.map(_fit_from_start, [screen_model] * n_starts, starts,
+                                     [bounds] * n_starts, [SCREEN_SETTINGS] * n_starts))
+
+    best = min(screened, key=lambda result: result.cost)
+    result = _fit_from_start(model, best.x, bounds, dict(SOLVER_SETTINGS, **solver_settings))
+    result.starts = np.array([r.cost for r in screened])
+    return result
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+def cumulative_integral(y, x=None, dx: float = 1.0, axis: int = -1, method: str = "trapezoid") -> np.ndarray:
+    """
+    Cumulative integral of `y` along `axis`, starting at 0, same shape as `y`.
+
+    `y` may hold many runs stacked along the other axes; `x` is either a 1-D
+    sample grid shared by all of them or an array of the same shape as `y`.
+    Without `x` the samples are `dx` apart.
+
+    method="trapezoid" is the trapezoidal rule, method="simpson" uses
+    `scipy.integrate.cumulative_simpson`, which is only worth it for
+    smooth, (near) uniformly sampled signals.
+    """
+    y = np.moveaxis(np.asarray(y, dtype=float), axis, -1)
+    if x is not None:
+        x = np.asarray(x, dtype=float)
+        if x.ndim > 1:
+            x = np.moveaxis(x, axis, -1)
+
+    if method == "trapezoid":
+        spacing = np.diff(x, axis=-1) if x is not None else dx
+        out = np.empty_like(y)
+        out[..., 0] = 0.0
+        np.cumsum((y[..., 1:] + y[..., :-1]) / 2 * spacing, axis=-1, out=out[..., 1:])
+    elif method == "simpson":
+        from scipy.integrate import cumulative_simpson
+        if x is not None:
+            out = cumulative_simpson(y, x=np.broadcast_to(x, y.shape), axis=-1, initial=0)
+        else:
+            out = cumulative_simpson(y, dx=dx, axis=-1, initial=0)
+    else:
+        raise ValueError(f"Unknown integration method '{method}', use 'trapezoid' or 'simpson'.")
+
+    return np.moveaxis(out, -1, axis)
+
+def integrate_heat_flow_rate(heat_flow_rate, time, method: str = "trapezoid") -> np.ndarray:
+    """
+    Integrate heat flow rate (W/g) over time (s) to get total heat released (J/g).
+
+    We use the trapezoidal rule for numerical integration, or Simpson's
+    rule with method="simpson".
+    """
+    return cumulative_integral(heat_flow_rate, time, method=method)
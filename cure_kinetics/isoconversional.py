@@ -0,0 +1,133 @@
+"""
+Model-free (isoconversional) activation energy E(alpha) of isothermal runs.
+
+Friedman: ln(da/dt) at fixed alpha is linear in 1/T with slope -E/R.
+
+Advanced Vyazovkin: E minimizes, for every conversion step
+(alpha - d_alpha, alpha],
+    Phi(E) = sum_{i != j} J_i(E) / J_j(E),  J_i(E) = exp(-E / (R T_i)) dt_i
+where dt_i is the time run i needs for that step. Phi is a sum of
+exponentials in E, hence convex: a coarse grid search followed by a few
+Newton steps, both vectorized over all alpha, finds the minimum.
+
+    python -m cure_kinetics.isoconversional
+"""
+from typing import NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from cure_kinetics.dataset import CureStudy, default_study
+from cure_kinetics.kinetics import interp_runs
+from cure_kinetics.resources.constants import R
+
+ALPHA_VALS = np.linspace(0.05, 0.95, 181)
+
+# Search range (J/mol) of the Vyazovkin grid search, refined by Newton steps.
+E_GRID = np.linspace(1e3, 3e5, 300)
+NEWTON_STEPS = 8
+
+
+class IsoconversionalRuns(NamedTuple):
+    """
+    Runs on a shared alpha grid: temperatures (K), cure rate (1/s) and
+    time (s) from the start of the run (alpha = 0) to reach every alpha,
+    both (n_runs, n_alpha).
+    """
+    alpha: np.ndarray
+    temperatures: np.ndarray
+    rate: np.ndarray
+    time: np.ndarray
+
+
+def runs_on_alpha_grid(fracs: Sequence[np.ndarray], rates: Sequence[np.ndarray], times: Sequence[np.ndarray],
+                       temperatures: Sequence[float], alpha_vals: np.ndarray = ALPHA_VALS) -> IsoconversionalRuns:
+    """
+    Interpolate all runs onto `alpha_vals` in one pass. Measured fractions
+    cured are noisy, the running maximum is used so that the time at alpha
+    is the first time the run reaches it.
+    """
+    fracs = [np.maximum.accumulate(np.asarray(frac, dtype=float)) for frac in fracs]
+    alpha_vals = np.asarray(alpha_vals, dtype=float)
+    rate = interp_runs(fracs, rates, alpha_vals)
+    time = interp_runs(fracs, times, alpha_vals)
+    return IsoconversionalRuns(alpha_vals, np.asarray(temperatures, dtype=float), rate, time)
+
+
+def study_runs(study: CureStudy, alpha_vals: np.ndarray = ALPHA_VALS) -> IsoconversionalRuns:
+    temperatures = study.temperatures
+    return runs_on_alpha_grid([study.fraction_cured(T) for T in temperatures],
+                              [study.cure_rate(T) for T in temperatures],
+                              # the windowed runs start at alpha = 0, but not at time 0
+                              [study[T].time_seconds - study[T].time_seconds[0] for T in temperatures],
+                              np.array(temperatures) + 273.15, alpha_vals)
+
+
+def friedman(runs: IsoconversionalRuns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    E(alpha) (J/mol) and ln(A f(alpha)) from a straight line fit of
+    ln(da/dt) against 1/T at every alpha. Non-positive rates give nan.
+    """
+    x = 1.0 / runs.temperatures
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.where(runs.rate > 0, np.log(runs.rate), np.nan)
+    x_mean = x.mean()
+    y_mean = y.mean(axis=0)
+    slope = ((x - x_mean) @ (y - y_mean)) / np.sum((x - x_mean) ** 2)
+    return -R * slope, y_mean - slope * x_mean
+
+
+def _vyazovkin_terms(E: np.ndarray, ratio: np.ndarray, d: np.ndarray):
+    """Phi and its first two derivatives at E (n_alpha,) or (n_E, n_alpha)."""
+    w = ratio * np.exp(-E[..., np.newaxis] * d)
+    return w.sum(axis=-1), -(w * d).sum(axis=-1), (w * d ** 2).sum(axis=-1)
+
+
+def vyazovkin(runs: IsoconversionalRuns, e_grid: np.ndarray = E_GRID, newton_steps: int = NEWTON_STEPS) -> np.ndarray:
+    """
+    E(alpha) (J/mol) of the advanced Vyazovkin method. The first alpha has
+    no preceding step, its step starts at alpha = 0, which every run must
+    reach at time 0.
+    """
+    dt = np.diff(runs.time, axis=1, prepend=0.0)
+    i, j = np.nonzero(~np.eye(len(runs.temperatures), dtype=bool))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (dt[i] / dt[j]).T                                   # (n_alpha, n_pairs)
+    d = (1.0 / runs.temperatures[i] - 1.0 / runs.temperatures[j]) / R  # (n_pairs,)
+
+    # grid search, then Newton steps on the convex Phi, kept inside the grid cell around the best point
+    phi = _vyazovkin_terms(e_grid[:, np.newaxis], ratio, d)[0]
+    best = np.argmin(np.where(np.isfinite(phi), phi, np.inf), axis=0)
+    step = e_grid[1] - e_grid[0]
+    low, high = e_grid[best] - step, e_grid[best] + step
+    E = e_grid[best]
+    for _ in range(newton_steps):
+        _, gradient, curvature = _vyazovkin_terms(E, ratio, d)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            E = np.clip(E - gradient / curvature, low, high)
+    valid = np.all(np.isfinite(ratio) & (ratio > 0), axis=1)
+    return np.where(valid, E, np.nan)
+
+
+if __name__ == "__main__":
+    from matplotlib import pyplot as plt
+    import timeit
+
+    study = default_study()
+    runs = study_runs(study)
+    E_friedman, _ = friedman(runs)
+    E_vyazovkin = vyazovkin(runs)
+
+    dense = study_runs(study, np.linspace(0.02, 0.98, 1000))
+    t_dense = min(timeit.repeat(lambda: vyazovkin(study_runs(study, dense.alpha)), number=5, repeat=3)) / 5
+    print(f"interpolation + Vyazovkin at {len(dense.alpha)} conversion levels: {t_dense * 1e3:.1f} ms")
+
+    p = study.kinetic_parameters
+    plt.plot(runs.alpha, E_friedman / 1e3, label='Friedman')
+    plt.plot(runs.alpha, E_vyazovkin / 1e3, label='Vyazovkin')
+    plt.axhline(p.E1 / 1e3, color='k', linestyle='--', label='E1 (model)')
+    plt.axhline(p.E2 / 1e3, color='k', linestyle=':', label='E2 (model)')
+    plt.xlabel('Degree of Cure (α)')
+    plt.ylabel('E (kJ/mol)')
+    plt.title('Isoconversional activation energy')
+    plt.legend()
+    plt.show()
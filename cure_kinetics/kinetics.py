@@ -0,0 +1,55 @@
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from cure_kinetics.resources.constants import R
+
+
+class KineticParameters(NamedTuple):
+    """
+    Parameters of the Kamal-Sourour (autocatalytic) cure model:
+    da/dt = (k1 + k2 * a^m) * (1 - a)^n, with k_i = A_i * exp(-E_i / (R T)).
+    """
+    A1: float
+    E1: float
+    A2: float
+    E2: float
+    m: float
+    n: float
+
+
+def arrhenius(A, E, T):
+    """
+    Rate constant A * exp(-E / (R T)), T in Kelvin.
+    """
+    return A * np.exp(-E / (R * T))
+
+def da_dt(A1, E1, A2, E2, m, n, alpha, T):
+    term_1 = arrhenius(A1, E1, T)
+    term_2 = arrhenius(A2, E2, T) * (alpha ** m)
+    return (term_1 + term_2) * ((1 - alpha) ** n)
+
+def interp_rate(frac, rate, alpha_vals):
+    """Interpolation helper: get rate(alpha)."""
+    return np.interp(alpha_vals, frac, rate)
+
+def interp_runs(fracs: Sequence[np.ndarray], values: Sequence[np.ndarray], alpha_vals) -> np.ndarray:
+    """
+    interp_rate of several runs at once: (n_runs, n_alpha) array of
+    `values[i]` interpolated at `alpha_vals` along `fracs[i]`.
+
+    The runs are laid end to end, each shifted past the previous one, so a
+    single np.interp call covers all of them; queries are clamped to the
+    range of their own run, like np.interp does for a single run. As for
+    np.interp, every `fracs[i]` has to be increasing.
+    """
+    fracs = [np.asarray(frac, dtype=float) for frac in fracs]
+    alpha_vals = np.asarray(alpha_vals, dtype=float)
+    low = np.array([frac[0] for frac in fracs])[:, np.newaxis]
+    high = np.array([frac[-1] for frac in fracs])[:, np.newaxis]
+    span = max(float(np.max(high - low)), float(np.ptp(alpha_vals))) + 1.0
+    offsets = span * np.arange(len(fracs))[:, np.newaxis] - low
+
+    xp = np.concatenate([frac + offset for frac, offset in zip(fracs, offsets[:, 0])])
+    fp = np.concatenate([np.asarray(value, dtype=float) for value in values])
+    return np.interp(np.clip(alpha_vals, low, high) + offsets, xp, fp)
@@ -0,0 +1,222 @@
+"""
+Precomputed isothermal cure tables for fast, batched cure state queries:
+alpha at (T, t) and the time to reach alpha at T.
+
+Both tables live on regular grids in coordinates where they are smooth and
+close to linear, so bilinear interpolation is accurate and every query is
+a constant-time index computation:
+
+    time to alpha:  ln t             over (1/T, logit(alpha))
+    alpha at time:  logit(alpha)     over (1/T, ln t - ln t_50(T))
+
+t_50(T) is the time to alpha = 0.5, scaling time per temperature makes
+the cure curves of all temperatures nearly collapse. Tables are built from
+the isothermal solver and stored on disk under the fingerprint of the
+parameters and grid.
+
+    python -m cure_kinetics.lookup
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from common.cache_dir import CACHE_DIR
+from common.result_store import fingerprint
+from cure_kinetics.kinetics import KineticParameters
+from cure_kinetics.simulation import solve_isothermal
+
+T_RANGE = (80.0, 220.0)     # °C
+N_TEMPERATURES = 141
+LOGIT_RANGE = (-9.0, 9.0)   # alpha from 1.2e-4 to 1 - 1.2e-4
+N_ALPHA = 513
+SCALED_TIME_RANGE = (-12.0, 12.0)   # ln(t / t_50)
+N_TIME = 513
+
+TABLE_FORMAT_VERSION = 1
+
+
+def _logit(alpha):
+    with np.errstate(divide='ignore'):
+        return np.log(alpha) - np.log1p(-alpha)
+
+
+def _expit(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x))
+
+
+def _axis(values, first: float, step: float, n: int, clamp: bool):
+    """Cell index and weight of `values` on a regular axis, linear extrapolation past the ends unless `clamp`."""
+    position = (values - first) / step
+    if clamp:
+        position = np.clip(position, 0.0, n - 1)
+    index = np.clip(np.floor(np.nan_to_num(position)), 0, n - 2).astype(np.intp)
+    return index, position - index
+
+
+def _bilinear(table: np.ndarray, i: np.ndarray, wi: np.ndarray, j: np.ndarray, wj: np.ndarray) -> np.ndarray:
+    low = table[i, j] + wj * (table[i, j + 1] - table[i, j])
+    high = table[i + 1, j] + wj * (table[i + 1, j + 1] - table[i + 1, j])
+    return low + wi * (high - low)
+
+
+class CureLookupTable:
+    """
+    Isothermal alpha(T, t) and t(T, alpha) tables of one parameter set.
+    Queries broadcast their arguments; temperatures outside the table give nan.
+    """
+    def __init__(self, params: KineticParameters, inv_T: np.ndarray, logit_alpha: np.ndarray,
+                 ln_time: np.ndarray, scaled_time: np.ndarray, logit_forward: np.ndarray, ln_t50: np.ndarray):
+        self.params = KineticParameters(*params)
+        self.inv_T = inv_T
+        self.logit_alpha = logit_alpha
+        self.ln_time = ln_time
+        self.scaled_time = scaled_time
+        self.logit_forward = logit_forward
+        self.ln_t50 = ln_t50
+
+    @classmethod
+    def build(cls, params: KineticParameters, T_range: Tuple[float, float] = T_RANGE,
+              n_temperatures: int = N_TEMPERATURES, logit_range: Tuple[float, float] = LOGIT_RANGE,
+              n_alpha: int = N_ALPHA, scaled_time_range: Tuple[float, float] = SCALED_TIME_RANGE,
+              n_time: int = N_TIME) -> 'CureLookupTable':
+        inv_T = np.linspace(1.0 / (T_range[1] + 273.15), 1.0 / (T_range[0] + 273.15), n_temperatures)
+        logit_alpha = np.linspace(*logit_range, n_alpha)
+        scaled_time = np.linspace(*scaled_time_range, n_time)
+        alpha = _expit(logit_alpha)
+
+        ln_time = np.empty((n_temperatures, n_alpha))
+        logit_forward = np.empty((n_temperatures, n_time))
+        ln_t50 = np.empty(n_temperatures)
+        for k, T_K in enumerate(1.0 / inv_T):
+            solution = solve_isothermal(params, T_K - 273.15)
+            ln_time[k] = np.log(solution.time_to(alpha))
+            ln_t50[k] = np.log(solution.time_to(0.5))
+            logit_forward[k] = _logit(solution.alpha(np.exp(ln_t50[k] + scaled_time)))
+        return cls(params, inv_T, logit_alpha, ln_time, scaled_time, logit_forward, ln_t50)
+
+    def _temperature_axis(self, T_C):
+        inv_T = 1.0 / (np.asarray(T_C, dtype=float) + 273.15)
+        step = self.inv_T[1] - self.inv_T[0]
+        i, wi = _axis(inv_T, self.inv_T[0], step, len(self.inv_T), clamp=True)
+        outside = (inv_T < self.inv_T[0] - 1e-12 * step) | (inv_T > self.inv_T[-1] + 1e-12 * step)
+        return i, wi, outside
+
+    def time_to(self, T_C, alpha) -> np.ndarray:
+        """Time (s) to reach `alpha` at `T_C` (°C)."""
+        i, wi, outside = self._temperature_axis(T_C)
+        alpha = np.asarray(alpha, dtype=float)
+        logit_alpha = _logit(np.clip(alpha, 0.0, 1.0))
+        step = self.logit_alpha[1] - self.logit_alpha[0]
+        j, wj = _axis(logit_alpha, self.logit_alpha[0], step, len(self.logit_alpha), clamp=False)
+        with np.errstate(invalid='ignore'):
+            t = np.exp(_bilinear(self.ln_time, i, wi, j, wj))
+        t = np.where(alpha <= 0.0, 0.0, np.where(alpha >= 1.0, np.inf, t))
+        return np.where(outside, np.nan, t)
+
+    def alpha(self, T_C, t) -> np.ndarray:
+        """Degree of cure at time `t` (s) of an isothermal cure at `T_C` (°C)."""
+        i, wi, outside = self._temperature_axis(T_C)
+        t = np.asarray(t, dtype=float)
+        ln_t50 = self.ln_t50[i] + wi * (self.ln_t50[i + 1] - self.ln_t50[i])
+        with np.errstate(divide='ignore'):
+            scaled = np.log(np.maximum(t, 0.0)) - ln_t50
+        step = self.scaled_time[1] - self.scaled_time[0]
+        j, wj = _axis(scaled, self.scaled_time[0], step, len(self.scaled_time), clamp=False)
+        with np.errstate(invalid='ignore'):
+            alpha = _expit(_bilinear(self.logit_forward, i, wi, j, wj))
+        alpha = np.where(t <= 0.0, 0.0, alpha)
+        return np.where(outside, np.nan, alpha)
+
+    def save(self, path: Path) -> None:
+        """Write the tables to `path` (.npz), atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=path.stem, suffix=".npz", dir=path.parent)
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, params=np.array(self.params), inv_T=self.inv_T, logit_alpha=self.logit_alpha,
+                     ln_time=self.ln_time, scaled_time=self.scaled_time, logit_forward=self.logit_forward,
+                     ln_t50=self.ln_t50)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'CureLookupTable':
+        with np.load(path) as tables:
+            return cls(KineticParameters(*tables["params"].tolist()), tables["inv_T"], tables["logit_alpha"],
+                       tables["ln_time"], tables["scaled_time"], tables["logit_forward"], tables["ln_t50"])
+
+
+def lookup_table(params: KineticParameters, cache_dir: Optional[Path] = CACHE_DIR / "lookup",
+                 **grid) -> CureLookupTable:
+    """
+    The lookup table of `params`, loaded from `cache_dir` when it was built
+    before with the same parameters and grid, built and stored otherwise.
+    """
+    if cache_dir is None:
+        return CureLookupTable.build(params, **grid)
+    key = fingerprint(TABLE_FORMAT_VERSION, [float(v) for v in params], sorted(grid.items()))
+    path = Path(cache_dir) / f"{key}.npz"
+    try:
+        return CureLookupTable.load(path)
+    except (OSError, ValueError, KeyError):
+        pass
+    table = CureLookupTable.build(params, **grid)
+    try:
+        table.save(path)
+    except OSError:
+        # not persisted, the table is still returned
+        pass
+    return table
+
+
+def accuracy_report(table: CureLookupTable, n_temperatures: int = 25, n_points: int = 400,
+                    seed: int = 0) -> dict:
+    """
+    Compare table lookups with direct simulation at random temperatures
+    within the table (off the grid) and times/conversions along each cure.
+
+    Returns the maximum and mean absolute alpha error and the maximum
+    relative error of the time to alpha for alpha in [0.01, 0.99].
+    """
+    rng = np.random.default_rng(seed)
+    T_min, T_max = 1.0 / table.inv_T[-1] - 273.15, 1.0 / table.inv_T[0] - 273.15
+    alpha_errors, time_errors = [], []
+    for T_C in rng.uniform(T_min, T_max, n_temperatures):
+        solution = solve_isothermal(table.params, T_C)
+        t = np.sort(rng.uniform(0.0, 1.0, n_points)) * solution.time_to(0.999)
+        alpha_errors.append(np.abs(table.alpha(T_C, t) - solution.alpha(t)))
+        alpha = rng.uniform(0.01, 0.99, n_points)
+        time_errors.append(np.abs(table.time_to(T_C, alpha) / solution.time_to(alpha) - 1.0))
+    alpha_errors = np.concatenate(alpha_errors)
+    time_errors = np.concatenate(time_errors)
+    return {
+        "max_alpha_error": float(alpha_errors.max()),
+        "mean_alpha_error": float(alpha_errors.mean()),
+        "max_relative_time_error": float(time_errors.max()),
+    }
+
+
+if __name__ == "__main__":
+    import time
+    import timeit
+
+    from cure_kinetics.dataset import default_study
+
+    params = default_study().kinetic_parameters
+    start = time.perf_counter()
+    table = lookup_table(params)
+    print(f"table ready in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    for name, value in accuracy_report(table).items():
+        print(f"{name:>24}: {value:.2e}")
+
+    rng = np.random.default_rng(1)
+    T_q, t_q, alpha_q = rng.uniform(100, 200, 100000), rng.uniform(0, 20000, 100000), rng.uniform(0, 1, 100000)
+    t_alpha = min(timeit.repeat(lambda: table.alpha(T_q, t_q), number=10, repeat=3)) / 10
+    t_time = min(timeit.repeat(lambda: table.time_to(T_q, alpha_q), number=10, repeat=3)) / 10
+    t_single = min(timeit.repeat(lambda: table.time_to(150.0, 0.9), number=1000, repeat=3)) / 1000
+    t_simulate = min(timeit.repeat(lambda: solve_isothermal(params, 150.0).time_to(0.9), number=100, repeat=3)) / 100
+    print(f"100000 alpha queries {t_alpha * 1e3:.1f} ms, 100000 time queries {t_time * 1e3:.1f} ms")
+    print(f"single time-to-0.9 query {t_single * 1e6:.0f} us, by simulation {t_simulate * 1e6:.0f} us")
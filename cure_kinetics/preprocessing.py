@@ -0,0 +1,99 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.signal import butter, filtfilt
+
+from cure_kinetics.resources.constants import RAW_DATA_CUTOFF_FREQ, \
+    FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE, TIME_UNIT_CONVERSION_FACTOR
+
+
+def apply_lowpass_filter(data: np.ndarray, time: np.ndarray, cutoff_freq: float) -> np.ndarray:
+    t = np.asarray(time)
+    x = np.asarray(data)
+
+    # 1) sampling frequency (assumes ~uniform spacing)
+    dt = np.mean(np.diff(t))
+    fs = 1.0 / dt
+
+    # 2) design low-pass filter
+    order = 2
+    b, a = butter(order, cutoff_freq / (0.5 * fs), btype="low")
+
+    # 3) apply zero-phase filter
+    return filtfilt(b, a, x)
+
+def window_indices(data: Dict[str, np.ndarray], start_time: Optional[float] = None, end_time: Optional[float] = None) -> Tuple[int, int]:
+    """
+    Start and end index of the window between start_time (or first exothermic event) and end_time.
+    """
+    time = np.asarray(data['Time'])
+
+    # time is monotonic, so the first sample at/after a time is a binary search away
+    index_at_start_time = int(np.searchsorted(time, start_time, side='left')) if start_time else 0
+    index_at_end_time = int(np.searchsorted(time, end_time, side='left')) if end_time else len(time)
+
+    exotherm = np.asarray(data['Unsubtracted']) > np.asarray(data['Baseline'])
+    index_first_exotherm = int(np.argmax(exotherm))
+    if not exotherm[index_first_exotherm]:
+        raise ValueError("No exothermic heat flow found in the data.")
+
+    start_index = max(index_first_exotherm, index_at_start_time)
+    return start_index, index_at_end_time
+
+def window_data(data: Dict[str, np.ndarray], start_time: Optional[float] = None, end_time: Optional[float]=None) -> Dict[str, np.ndarray]:
+    """
+    Window the data between start_time (or first exothermic event) and end_time.
+    The returned columns are views into `data`, nothing is copied.
+    """
+    start_index, end_index = window_indices(data, start_time, end_time)
+    return {key: item[start_index:end_index] for key, item in data.items()}
+
+def repair_spikes(values: np.ndarray, ratio: float = 5.0) -> np.ndarray:
+    """
+    Replace single-sample dips, where a sample is more than `ratio` times
+    smaller than its predecessor, by the mean of both neighbours.
+    """
+    values = np.array(values, dtype=float)
+    previous, current, following = values[:-2], values[1:-1], values[2:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spikes = previous / current > ratio
+    current[spikes] = (previous[spikes] + following[spikes]) / 2
+    return values
+
+def normalize_heat_flow(windowed_data: Dict[str, np.ndarray], sample_weight: float,
+                        baseline_fraction: float = FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE,
+                        spike_ratio: Optional[float] = None) -> np.ndarray:
+    """
+    Net specific heat flow (W/g) of windowed data, shifted to 0 at the end of the measurement.
+
+    Spikes (as seen in 180 deg data) are only repaired when `spike_ratio` is given.
+    """
+    unsubtracted_heat_flow = np.asarray(windowed_data['Unsubtracted'])
+    if spike_ratio is not None:
+        unsubtracted_heat_flow = repair_spikes(unsubtracted_heat_flow, spike_ratio)
+
+    # Convert to W/g
+    net_heat_flow = (unsubtracted_heat_flow - np.asarray(windowed_data['Baseline'])) / sample_weight
+
+    # Normalize to 0 mW at the end of the measurement
+    nr_indices = baseline_fraction * len(net_heat_flow)
+    final_heat_flow_at_end = net_heat_flow[-int(nr_indices):].mean()
+    net_heat_flow -= final_heat_flow_at_end
+    return net_heat_flow
+
+def prepare_for_plotting(data: Dict[str, np.ndarray], sample_weight: float, start_time: Optional[float]=None, end_time: Optional[float]= None,
+                         cutoff_freq: float = RAW_DATA_CUTOFF_FREQ,
+                         baseline_fraction: float = FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE,
+                         spike_ratio: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Prepare the data for plotting by filtering and normalizing.
+    """
+    data_out = window_data(data, start_time, end_time)
+
+    data_out['Net Heat Flow'] = normalize_heat_flow(data_out, sample_weight, baseline_fraction, spike_ratio)
+
+    data_out['Filtered Heat Flow'] = apply_lowpass_filter(
+        data_out['Net Heat Flow'], data_out['Time'], cutoff_freq=cutoff_freq)
+
+    data_out['Time Seconds'] = np.asarray(data_out['Time']) * TIME_UNIT_CONVERSION_FACTOR
+    return data_out
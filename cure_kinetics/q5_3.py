@@ -1,10 +1,19 @@
+import sys
+from pathlib import Path
+
 import numpy as np
-from q3 import fraction_cured_150, cure_rate_150
-from q5 import E1_solution, A1_solution
-from q5_2 import m_solution, n_solution, E2_solution, A2_solution, simulate_cure
+
+# Also runnable from this directory, as before: the packages are imported from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cure_kinetics.dataset import default_study
+from cure_kinetics.simulation import simulate_cure
 
 if __name__ == "__main__":
     from matplotlib import pyplot as plt
+
+    study = default_study()
+    A1_solution, E1_solution, A2_solution, E2_solution, m_solution, n_solution = study.kinetic_parameters
     t_lst = np.linspace(0, 30000, 10000)
 
     cure_temp = 150
@@ -13,7 +22,7 @@ if __name__ == "__main__":
     da_dt_vals = sim_results[1]
     plt.plot(alpha_vals, da_dt_vals, label=f'Simulated {cure_temp}°C')
 
-    plt.plot(fraction_cured_150, cure_rate_150, '--', label='Experimental 150°C')
+    plt.plot(study.fraction_cured(150), study.cure_rate(150), '--', label='Experimental 150°C')
     plt.xlabel('Time (s)')
     plt.ylabel('Degree of Cure (α)')
     plt.title('Cure rate vs. degree of cure, simulated vs. experimental')
@@ -0,0 +1,347 @@
+"""
+Streaming analysis of an isothermal DSC run while the instrument is still
+measuring: the export file is tailed, only the rows added since the last
+read are parsed, and the degree of cure is updated from them.
+
+The batch pipeline (window -> normalize -> filter -> integrate) needs the
+whole run, in two places:
+
+    baseline   the heat flow is shifted to 0 at the end of the run (mean of
+               its last `baseline_fraction`); here the end level is a guess
+               (e.g. from an earlier run) until the heat flow has passed its
+               peak and levelled off, and then the running mean of the
+               recent heat flow, an exponential average over the last
+               `baseline_fraction` of the elapsed time,
+    filter     filtfilt runs the Butterworth filter forwards and backwards;
+               here it runs forwards twice with carried state (the same
+               magnitude response, delayed by 2 sqrt(2) / (2 pi f_c)).
+
+Filter and integral are linear and the filter passes a constant unchanged,
+so the baseline enters the heat released as a term c * (t - t_0): the
+filtered heat flow is integrated without it and the latest baseline is
+applied when the heat is read. The state is a handful of scalars, however
+long the run.
+
+    python -m cure_kinetics.streaming cure_kinetics/resources/isothermal_120.txt --replay
+"""
+import argparse
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+from scipy.signal import butter, lfilter, lfilter_zi
+
+from common.table_io import parse_rows, read_header
+from cure_kinetics.resources.constants import RAW_DATA_CUTOFF_FREQ, FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE, \
+    TIME_UNIT_CONVERSION_FACTOR
+
+# Only these columns of the exports are parsed.
+STREAM_COLUMNS = ("Time", "Unsubtracted", "Baseline")
+POLL_INTERVAL = 5.0  # s
+# The heat flow has levelled off when, at its current slope, it would drift less than this over the elapsed time.
+SETTLE_TOLERANCE = 1e-3  # W/g
+# The running means are advanced in blocks of at most this many e-folds of decay, whose inverse must not overflow.
+MAX_DECAY = 300.0
+
+
+class ExportTail:
+    """
+    Incremental reader of a tab-separated DSC export that is still being
+    written: every `read` parses the complete rows added since the last one.
+    """
+    def __init__(self, path: Path, columns: Sequence[str] = STREAM_COLUMNS):
+        self.path = Path(path)
+        self.columns = tuple(columns)
+        self.usecols: Optional[list] = None
+        self.n_header_columns = 0
+        self.offset = 0
+
+    def read(self) -> Dict[str, np.ndarray]:
+        """Columns of the rows completed since the last read (empty arrays if none)."""
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < self.offset:
+                raise ValueError(f"{self.path} was truncated, the run was restarted?")
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        # a row still being written is left for the next read
+        end = chunk.rfind(b"\n") + 1
+        chunk = chunk[:end]
+        self.offset += end
+        if self.usecols is None and chunk:
+            header_line, _, chunk = chunk.partition(b"\n")
+            header = read_header(header_line.decode("utf-8", errors="replace"))
+            missing = [c for c in self.columns if c not in header]
+            if missing:
+                raise KeyError(f"Columns {missing} not found in {self.path}.")
+            self.usecols = [header.index(c) for c in self.columns]
+            self.n_header_columns = len(header)
+
+        if self.usecols is None:
+            table = np.empty((0, len(self.columns)))
+        else:
+            table = parse_rows(chunk, self.n_header_columns, self.usecols)
+        return {c: np.ascontiguousarray(table[:, i]) for i, c in enumerate(self.columns)}
+
+
+def _running_mean(level: float, weights: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    level_k = level_{k-1} + (x_k - level_{k-1}) * weights_k for every row
+    (weights in [0, 1]), as level_k = P_k (level_s + sum_j weights_j x_j / P_j)
+    with P_k the product of (1 - weights) since the start s of its block.
+    A block starts at a weight of 1, which restarts the mean at x, and after
+    MAX_DECAY e-folds.
+    """
+    with np.errstate(divide='ignore'):
+        decay = np.minimum(-np.log1p(-weights), MAX_DECAY)
+    block = np.floor(np.cumsum(decay) / MAX_DECAY)
+    starts = np.flatnonzero(np.diff(block, prepend=-1.0))
+    out = np.empty(len(x))
+    for start, stop in zip(starts, np.r_[starts[1:], len(x)]):
+        level += (x[start] - level) * weights[start]
+        d = np.cumsum(decay[start + 1:stop])
+        out[start] = level
+        out[start + 1:stop] = np.exp(-d) * (level + np.cumsum(weights[start + 1:stop] * x[start + 1:stop] * np.exp(d)))
+        level = out[stop - 1]
+    return out
+
+
+class StreamUpdate(NamedTuple):
+    """
+    Results for the rows of one update: time since the start of the run
+    (minutes), filtered net heat flow (W/g) and heat released (J/g), both
+    with the baseline estimated at this update, and degree of cure.
+    """
+    time: np.ndarray
+    heat_flow: np.ndarray
+    heat_released: np.ndarray
+    alpha: np.ndarray
+
+
+class StreamingCure:
+    """
+    Online counterpart of CureDataset for one run: `update` takes the new
+    rows of the export and returns their results. Parameters are those of
+    CureDataset; `delta_H_ref` (J/g) turns heat into degree of cure and
+    `baseline_guess` (W/g) is the net heat flow expected at the end of the
+    run, used until the measured one has levelled off.
+    """
+    def __init__(self, sample_weight: float, delta_H_ref: float, start_time: Optional[float] = None,
+                 end_time: Optional[float] = None, cutoff_freq: float = RAW_DATA_CUTOFF_FREQ,
+                 baseline_fraction: float = FRACTION_OF_DATA_TO_AVERAGE_FOR_BASELINE,
+                 baseline_guess: float = 0.0):
+        self.sample_weight = sample_weight  # mg
+        self.delta_H_ref = delta_H_ref  # J/g
+        self.start_time = start_time  # minutes
+        self.end_time = end_time  # minutes
+        self.cutoff_freq = cutoff_freq  # 1/minutes
+        self.baseline_fraction = baseline_fraction
+        self.baseline_guess = baseline_guess  # W/g
+
+        self.started = False
+        self.seen_exotherm = False
+        self.t_start: Optional[float] = None  # minutes
+        self.n_samples = 0
+        self.filter = None
+        self.filter_state = None
+        self.last_time: Optional[float] = None  # minutes
+        self.last_filtered = 0.0
+        self.integral = 0.0  # of the filtered heat flow before the baseline shift, J/g
+        # running means of the heat flow over the last baseline_fraction and twice that, W/g
+        self.level = 0.0
+        self.slow_level = 0.0
+        self.first_filtered = 0.0
+        self.peak = -np.inf
+        self.settled = False
+        # windowed rows that came before the sampling rate was known
+        self.pending: Optional[Dict[str, np.ndarray]] = None
+
+    @property
+    def baseline(self) -> float:
+        """Current estimate of the net heat flow at the end of the run (W/g)."""
+        return self.level if self.settled else self.baseline_guess
+
+    @property
+    def elapsed(self) -> float:
+        """Minutes since the start of the analysed window."""
+        return 0.0 if self.last_time is None else self.last_time - self.t_start
+
+    @property
+    def heat_released(self) -> float:
+        """Heat released up to the last row (J/g) with the current baseline."""
+        return self.integral - self.baseline * self.elapsed * TIME_UNIT_CONVERSION_FACTOR
+
+    @property
+    def alpha(self) -> float:
+        return self.heat_released / self.delta_H_ref
+
+    def _window(self, rows: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """The rows inside the analysed window: from start_time and the first exotherm to end_time."""
+        time = rows["Time"]
+        keep = np.ones(len(time), dtype=bool)
+        if not self.started:
+            exotherm = np.logical_or.accumulate(rows["Unsubtracted"] > rows["Baseline"]) | self.seen_exotherm
+            self.seen_exotherm = bool(exotherm[-1]) if len(exotherm) else self.seen_exotherm
+            keep = exotherm & (time >= self.start_time if self.start_time else True)
+            self.started = bool(keep.any())
+        if self.end_time:
+            keep &= time < self.end_time
+        return {key: column[keep] for key, column in rows.items()}
+
+    def _design_filter(self, time: np.ndarray, net: np.ndarray) -> None:
+        # sampling frequency from the first rows, like apply_lowpass_filter
+        fs = 1.0 / np.mean(np.diff(time))
+        b, a = butter(2, self.cutoff_freq / (0.5 * fs), btype="low")
+        self.filter = (b, a)
+        # both passes start settled at the first value, so there is no start-up transient
+        zi = lfilter_zi(b, a)
+        self.filter_state = [zi * net[0], zi * net[0]]
+
+    def update(self, rows: Dict[str, np.ndarray]) -> StreamUpdate:
+        """Results for the new `rows` (columns of STREAM_COLUMNS, in time order)."""
+        rows = self._window(rows)
+        if self.pending is not None:
+            rows = {key: np.r_[self.pending[key], column] for key, column in rows.items()}
+            self.pending = None
+        time = np.asarray(rows["Time"], dtype=float)
+        empty = np.empty(0)
+        if not len(time):
+            return StreamUpdate(empty, empty, empty, empty)
+        net = (rows["Unsubtracted"] - rows["Baseline"]) / self.sample_weight
+        if self.filter is None:
+            if len(time) < 2:
+                # the sampling rate is not known yet, keep the row for the next update
+                self.pending = rows
+                return StreamUpdate(empty, empty, empty, empty)
+            self.t_start = float(time[0])
+            self._design_filter(time, net)
+            self.last_time = float(time[0])
+            self.last_filtered = self.first_filtered = float(net[0])
+            self.level = self.slow_level = float(net[0])
+
+        b, a = self.filter
+        filtered, self.filter_state[0] = lfilter(b, a, net, zi=self.filter_state[0])
+        filtered, self.filter_state[1] = lfilter(b, a, filtered, zi=self.filter_state[1])
+
+        # trapezoid integral of the filtered heat flow, carried over from the last row
+        seconds = np.diff(np.r_[self.last_time, time]) * TIME_UNIT_CONVERSION_FACTOR
+        steps = 0.5 * (filtered + np.r_[self.last_filtered, filtered[:-1]]) * seconds
+        integral = self.integral + np.cumsum(steps)
+
+        # end-of-run level: exponential average over the last baseline_fraction of the elapsed time,
+        # whose mean age (half a trailing window) matches the mean of the last fraction of the rows;
+        # the average over twice the window lags it by slope * window, which gives the drift
+        window = 0.5 * self.baseline_fraction * (time - self.t_start)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(window > 0, np.diff(np.r_[self.last_time, time]) / window, 0.0)
+        level = _running_mean(self.level, np.minimum(1.0, ratio), net)
+        slow_level = _running_mean(self.slow_level, np.minimum(1.0, 0.5 * ratio), net)
+        peak = np.maximum.accumulate(np.r_[self.peak, filtered])[1:]
+        if not self.settled:
+            # past the peak, half way down to the start level, the heat flow settles once it stops drifting
+            drift = np.abs(level - slow_level) * 2.0 / self.baseline_fraction
+            self.settled = bool(np.any((window > 0) & (filtered < 0.5 * (peak + self.first_filtered))
+                                       & (drift < SETTLE_TOLERANCE)))
+
+        self.level, self.slow_level, self.peak = float(level[-1]), float(slow_level[-1]), float(peak[-1])
+        self.integral = float(integral[-1])
+        self.last_time = float(time[-1])
+        self.last_filtered = float(filtered[-1])
+        self.n_samples += len(time)
+
+        elapsed = (time - self.t_start) * TIME_UNIT_CONVERSION_FACTOR
+        heat_released = integral - self.baseline * elapsed
+        return StreamUpdate(time - self.t_start, filtered - self.baseline, heat_released,
+                            heat_released / self.delta_H_ref)
+
+
+def follow(path: Path, analysis: StreamingCure, poll_interval: float = POLL_INTERVAL,
+           idle_timeout: Optional[float] = None) -> Iterator[StreamUpdate]:
+    """
+    Tail the export at `path` and yield the results of every batch of new
+    rows. Stops after `idle_timeout` s without new rows (never by default).
+    """
+    tail = ExportTail(path)
+    idle_since = time.monotonic()
+    while True:
+        rows = tail.read()
+        if len(rows["Time"]):
+            idle_since = time.monotonic()
+            update = analysis.update(rows)
+            if len(update.time):
+                yield update
+        elif idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+def replay(source: Path, target: Path, rows_per_write: int, write_interval: float = 0.0) -> None:
+    """
+    Write the export `source` to `target` `rows_per_write` rows at a time,
+    like an instrument that is still measuring.
+    """
+    lines = Path(source).read_bytes().splitlines(keepends=True)
+    with open(target, "wb") as f:
+        f.write(lines[0])
+        for i in range(1, len(lines), rows_per_write):
+            f.write(b"".join(lines[i:i + rows_per_write]))
+            f.flush()
+            time.sleep(write_interval)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import threading
+
+    from cure_kinetics.dataset import default_study
+    from cure_kinetics.simulation import solve_isothermal
+
+    parser = argparse.ArgumentParser(description="Follow a growing isothermal DSC export and report the cure.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--temperature", type=float, default=120.0, help="°C, for the expected cure")
+    parser.add_argument("--sample-weight", type=float, default=None, help="mg (default: the shipped run's)")
+    parser.add_argument("--start-time", type=float, default=None, help="minutes")
+    parser.add_argument("--end-time", type=float, default=None, help="minutes")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="alpha deviation from the model to flag")
+    parser.add_argument("--replay", action="store_true", help="replay the export into a growing file")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="s without new rows before stopping")
+    args = parser.parse_args()
+
+    study = default_study()
+    reference = study[args.temperature]
+    sample_weight = args.sample_weight or reference.sample_weight
+    start_time = args.start_time if args.start_time is not None else reference.start_time
+    end_time = args.end_time if args.end_time is not None else reference.end_time
+    # the end level guessed from the other runs of the study
+    others = [study[T] for T in study.temperatures if T != args.temperature]
+    baseline_guess = np.mean([
+        np.mean(((d.windowed["Unsubtracted"] - d.windowed["Baseline"]) / d.sample_weight)[-int(d.baseline_fraction * len(d.time)):])
+        for d in others])
+    analysis = StreamingCure(sample_weight, study.delta_H_max, start_time, end_time, baseline_guess=baseline_guess)
+    expected = solve_isothermal(study.kinetic_parameters, args.temperature)
+
+    path, poll_interval, idle_timeout = args.path, POLL_INTERVAL, args.idle_timeout
+    if args.replay:
+        # an hour of rows every 10 ms
+        path = Path(tempfile.mkdtemp()) / args.path.name
+        path.touch()
+        threading.Thread(target=replay, args=(args.path, path, 3600, 0.01), daemon=True).start()
+        poll_interval, idle_timeout = 0.005, idle_timeout or 1.0
+
+    start = time.perf_counter()
+    flagged = False
+    for update in follow(path, analysis, poll_interval, idle_timeout):
+        deviation = analysis.alpha - float(expected.alpha(update.time[-1] * TIME_UNIT_CONVERSION_FACTOR))
+        print(f"{update.time[-1]:8.1f} min  alpha {analysis.alpha:.3f}  model {analysis.alpha - deviation:.3f}"
+              f"  baseline {analysis.baseline * 1e3:+.1f} mW/g{'' if analysis.settled else ' (guess)'}")
+        if abs(deviation) > args.tolerance and not flagged:
+            print(f"  alpha deviates from the model by {deviation:+.3f}")
+            flagged = True
+    print(f"{analysis.n_samples} rows in {time.perf_counter() - start:.2f} s")
+
+    if reference.path.name == args.path.name:
+        print(f"final heat released {analysis.heat_released:.2f} J/g, batch pipeline {reference.total_heat:.2f} J/g")
@@ -0,0 +1,275 @@
+"""
+Sensitivity of the cure results to the preprocessing settings.
+
+The full pipeline (window -> normalize -> filter -> integrate -> k1 and
+autocatalytic fit) is evaluated over a full factorial grid of
+
+    cutoff_freq         low-pass cutoff frequency (1/min), all runs
+    baseline_fraction   fraction of the run averaged for the baseline, all runs
+    start_time_<T>      window start (minutes) of the run at T °C
+
+Settings are processed in chunks that only differ in the cutoff frequency,
+so within a chunk every run is loaded, windowed and normalized once and the
+shared stage cache (see CureDataset) only filters and integrates again.
+Chunks run across a process pool and, with a store, are kept under the
+fingerprint of their inputs, so an enlarged grid only computes what is new.
+
+For every output (delta_H_max, total heats, initial cure rates, kinetic
+parameters) the report gives its range over the grid, the first-order
+variance share of each setting and the local elasticity d ln y / d ln x at
+the nominal settings of constants.py.
+
+    python -m cure_kinetics.sweep -o sweep.csv
+"""
+import argparse
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.cache_dir import CACHE_DIR
+from common.result_store import ResultStore, fingerprint
+from cure_kinetics.dataset import PIPELINE_VERSION, CureDataset, CureStudy, default_study, source_hash
+from cure_kinetics.fitting import ALPHA_VALS, LOWER_BOUNDS, SOLVER_SETTINGS, UPPER_BOUNDS, X0
+
+# Settings that apply to every run; the others are start_time_<T> of single runs.
+STUDY_SETTINGS = ("cutoff_freq", "baseline_fraction")
+
+DEFAULT_GRID = {
+    "cutoff_freq": (0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5, 0.7, 1.0),
+    "baseline_fraction": (0.02, 0.03, 0.04, 0.05, 0.06, 0.08),
+    "start_time_120": (2.0, 3.0, 4.0, 5.0, 6.0, 8.0),
+    "start_time_150": (1.0, 1.5, 2.3, 3.0, 4.0),
+}
+
+
+class RunSpec(NamedTuple):
+    """What it takes to rebuild a CureDataset in a worker, without its loaded arrays."""
+    path: Path
+    temperature: float
+    sample_weight: float
+    start_time: Optional[float]
+    end_time: Optional[float]
+    cutoff_freq: float
+    baseline_fraction: float
+
+
+def run_specs(study: CureStudy) -> List[RunSpec]:
+    return [RunSpec(d.path, d.temperature, d.sample_weight, d.start_time, d.end_time, d.cutoff_freq,
+                    d.baseline_fraction) for d in (study[T] for T in study.temperatures)]
+
+
+def nominal_settings(specs: Sequence[RunSpec], names: Sequence[str]) -> Dict[str, Optional[float]]:
+    """The settings of the unswept study."""
+    runs = {f"start_time_{spec.temperature:g}": spec for spec in specs}
+    nominal = {}
+    for name in names:
+        if name in STUDY_SETTINGS:
+            nominal[name] = getattr(specs[0], name)
+        elif name in runs:
+            nominal[name] = runs[name].start_time
+        else:
+            raise KeyError(f"Unknown sweep setting {name!r}, expected one of {STUDY_SETTINGS} or start_time_<T>.")
+    return nominal
+
+
+def build_study(specs: Sequence[RunSpec], setting: Dict[str, float], **study_kwargs) -> CureStudy:
+    """The study of `specs` with the values of `setting` replacing theirs."""
+    datasets = []
+    for spec in specs:
+        kwargs = spec._asdict()
+        kwargs.update({name: value for name, value in setting.items() if name in STUDY_SETTINGS})
+        kwargs["start_time"] = setting.get(f"start_time_{spec.temperature:g}", spec.start_time)
+        datasets.append(CureDataset(**kwargs))
+    return CureStudy(datasets, **study_kwargs)
+
+
+def output_names(specs: Sequence[RunSpec], k1_temperatures: Sequence[float]) -> Tuple[str, ...]:
+    return ("delta_H_max",
+            *(f"total_heat_{spec.temperature:g}" for spec in specs),
+            *(f"initial_rate_{T:g}" for T in k1_temperatures),
+            "log_A1", "E1", "log_A2", "E2", "m", "n")
+
+
+def evaluate(specs: Sequence[RunSpec], setting: Dict[str, float]) -> List[float]:
+    """Outputs (see output_names) of the full pipeline at `setting`, nan where it fails."""
+    study = build_study(specs, setting)
+    try:
+        p = study.kinetic_parameters
+        kinetics = [np.log10(p.A1), p.E1, np.log10(p.A2), p.E2, p.m, p.n]
+    except (ValueError, np.linalg.LinAlgError):
+        kinetics = [np.nan] * 6
+    try:
+        return [study.delta_H_max,
+                *(study[spec.temperature].total_heat for spec in specs),
+                *(study.cure_rate(T)[0] for T in study.k1_temperatures),
+                *kinetics]
+    except ValueError:
+        # e.g. a window without exothermic heat flow
+        return [np.nan] * (1 + len(specs) + len(study.k1_temperatures) + 6)
+
+
+def _evaluate_chunk(specs: Sequence[RunSpec], settings: Sequence[Dict[str, float]]) -> np.ndarray:
+    return np.array([evaluate(specs, setting) for setting in settings], dtype=float)
+
+
+class SweepResult:
+    """
+    Outputs of the pipeline (n_settings, n_outputs) at the `settings`
+    (n_settings, n_parameters) of a full factorial grid over `grid`.
+    """
+    def __init__(self, grid: Dict[str, Sequence[float]], nominal: Dict[str, Optional[float]],
+                 settings: np.ndarray, outputs: np.ndarray, output_names: Sequence[str]):
+        self.grid = {name: np.asarray(values, dtype=float) for name, values in grid.items()}
+        self.nominal = nominal
+        self.parameter_names = tuple(grid)
+        self.settings = settings
+        self.outputs = outputs
+        self.output_names = tuple(output_names)
+
+    def __len__(self):
+        return len(self.settings)
+
+    def rows(self) -> List[Dict[str, float]]:
+        return [dict(zip(self.parameter_names + self.output_names, (*s, *o)))
+                for s, o in zip(self.settings, self.outputs)]
+
+    def ranges(self) -> np.ndarray:
+        """(n_outputs, 2) smallest and largest value over the grid."""
+        with np.errstate(all="ignore"):
+            return np.stack([np.nanmin(self.outputs, axis=0), np.nanmax(self.outputs, axis=0)], axis=1)
+
+    def main_effects(self) -> np.ndarray:
+        """
+        (n_parameters, n_outputs) first-order variance shares: the variance
+        of the output's mean at each value of one setting over its total
+        variance. On a full factorial grid this is the first-order Sobol
+        index of the grid; shares well below 1 in total mean interactions.
+        """
+        effects = np.full((len(self.parameter_names), len(self.output_names)), np.nan)
+        with np.errstate(all="ignore"):
+            total = np.nanvar(self.outputs, axis=0)
+            for i, name in enumerate(self.parameter_names):
+                means = np.array([np.nanmean(self.outputs[self.settings[:, i] == value], axis=0)
+                                  for value in self.grid[name]])
+                effects[i] = np.nanvar(means, axis=0) / total
+        return effects
+
+    def elasticities(self) -> np.ndarray:
+        """
+        (n_parameters, n_outputs) d ln y / d ln x at the nominal settings by
+        central differences to the neighbouring grid values of each setting,
+        all others nominal (nearest grid values where the nominal is not on
+        the grid). Log-scaled outputs (log_A) are differenced directly.
+        """
+        centre = np.array([self.grid[name][np.argmin(np.abs(self.grid[name] - (self.nominal[name] or 0.0)))]
+                           for name in self.parameter_names])
+        at_centre = np.all(self.settings == centre, axis=1)
+        logged = np.array([not name.startswith("log_") for name in self.output_names])
+        with np.errstate(all="ignore"):
+            transformed = np.where(logged, np.log(np.abs(self.outputs)), self.outputs)
+        elasticities = np.full((len(self.parameter_names), len(self.output_names)), np.nan)
+        if not at_centre.any():
+            return elasticities
+        for i, name in enumerate(self.parameter_names):
+            values = self.grid[name]
+            k = int(np.searchsorted(values, centre[i]))
+            low, high = values[max(k - 1, 0)], values[min(k + 1, len(values) - 1)]
+            if low == high:
+                continue
+            others = np.all(np.delete(self.settings == centre, i, axis=1), axis=1)
+            y_low = transformed[others & (self.settings[:, i] == low)][0]
+            y_high = transformed[others & (self.settings[:, i] == high)][0]
+            elasticities[i] = (y_high - y_low) / np.log(high / low)
+        return elasticities
+
+
+def sweep(grid: Dict[str, Sequence[float]], study: Optional[CureStudy] = None, max_workers: Optional[int] = None,
+          store: Optional[ResultStore] = None) -> SweepResult:
+    """
+    Evaluate the pipeline of `study` (default: default_study()) at every
+    combination of the `grid` values, across `max_workers` processes
+    (default: all cores). With a `store`, each chunk of settings is kept
+    under the fingerprint of the runs, its settings and the fit settings.
+    """
+    study = default_study() if study is None else study
+    specs = run_specs(study)
+    names = tuple(grid)
+    nominal = nominal_settings(specs, names)
+
+    # the cutoff frequency varies fastest, a chunk shares everything before filtering
+    order = sorted(names, key=lambda name: name == "cutoff_freq")
+    combinations = [dict(zip(order, values)) for values in itertools.product(*(grid[name] for name in order))]
+    n_inner = len(grid["cutoff_freq"]) if "cutoff_freq" in grid else 1
+    chunks = [combinations[i:i + n_inner] for i in range(0, len(combinations), n_inner)]
+
+    base_key = fingerprint("sweep", PIPELINE_VERSION, [(source_hash(s.path), *s[1:]) for s in specs],
+                           study.k1_temperatures, study.fit_temperatures, ALPHA_VALS,
+                           X0, LOWER_BOUNDS, UPPER_BOUNDS, SOLVER_SETTINGS)
+    keys = [fingerprint(base_key, [sorted(setting.items()) for setting in chunk]) for chunk in chunks]
+
+    results: List[Optional[np.ndarray]] = [None] * len(chunks)
+    if store is not None:
+        for i, key in enumerate(keys):
+            record = store.get(key)
+            if record is not None:
+                results[i] = np.array(record["outputs"], dtype=float)
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(missing) <= 1:
+        computed = [_evaluate_chunk(specs, chunks[i]) for i in missing]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            computed = list(pool.map(_evaluate_chunk, itertools.repeat(specs), [chunks[i] for i in missing]))
+
+    for i, outputs in zip(missing, computed):
+        results[i] = outputs
+        if store is not None:
+            # nan is not JSON, failed settings are stored as null
+            store.put(keys[i], {"outputs": [[None if np.isnan(v) else v for v in row] for row in outputs.tolist()]})
+
+    settings = np.array([[setting[name] for name in names] for setting in combinations], dtype=float)
+    return SweepResult(grid, nominal, settings, np.vstack(results),
+                       output_names(specs, study.k1_temperatures))
+
+
+def write_results(result: SweepResult, path: Path) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=result.parameter_names + result.output_names)
+        writer.writeheader()
+        writer.writerows(result.rows())
+
+
+if __name__ == "__main__":
+    import time
+
+    parser = argparse.ArgumentParser(description="Sensitivity of the cure results to the preprocessing settings.")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="CSV of every setting and its outputs")
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--no-store", action="store_true", help="recompute stored chunks")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = None if args.no_store else ResultStore(CACHE_DIR / "sweep")
+    result = sweep(DEFAULT_GRID, max_workers=args.workers, store=store)
+    elapsed = time.perf_counter() - start
+    print(f"{len(result)} settings in {elapsed:.1f} s ({elapsed / len(result) * 1e3:.1f} ms each)")
+    if args.output:
+        write_results(result, args.output)
+
+    width = max(len(name) for name in result.parameter_names)
+    print(f"\n{'output':<16} {'min':>11} {'max':>11}  "
+          + "  ".join(f"{name:>{width}}" for name in result.parameter_names))
+    print(f"{'':<16} {'':>11} {'':>11}  "
+          + "  ".join(f"{'share  elast.':>{width}}" for _ in result.parameter_names))
+    effects, elasticities = result.main_effects(), result.elasticities()
+    for j, name in enumerate(result.output_names):
+        low, high = result.ranges()[j]
+        cells = "  ".join(f"{effects[i, j]:>{width - 8}.2f} {elasticities[i, j]:+7.3f}"
+                          for i in range(len(result.parameter_names)))
+        print(f"{name:<16} {low:>11.5g} {high:>11.5g}  {cells}")
@@ -0,0 +1,185 @@
+"""
+Bootstrap uncertainty of the jointly fitted kinetic parameters.
+
+The residuals of the nominal fit are resampled in blocks (neighbouring
+alpha points of a run are correlated), added back onto the fitted rates and
+the six parameters are refitted, warm-started from the nominal solution.
+Refits run in chunks across a process pool, every chunk is stored under
+the fingerprint of its inputs, so rerunning or enlarging a bootstrap only
+refits the missing chunks.
+
+    python -m cure_kinetics.uncertainty 500
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from common.cache_dir import CACHE_DIR
+from common.result_store import ResultStore, fingerprint
+from cure_kinetics.dataset import CureStudy, default_study
+from cure_kinetics.fitting import JOINT_LOWER_BOUNDS, JOINT_UPPER_BOUNDS, JOINT_X_SCALE, SOLVER_SETTINGS, \
+    StackedRateModel
+from cure_kinetics.kinetics import KineticParameters, da_dt
+
+N_BOOT = 500
+BLOCK_LENGTH = 20
+CHUNK_SIZE = 25
+
+# The refits start next to the optimum, the tight tolerances of the nominal fit are not needed.
+REFIT_SETTINGS = dict(SOLVER_SETTINGS, ftol=1e-10, xtol=1e-10, gtol=1e-10, max_nfev=200)
+
+PARAMETER_NAMES = ("log_A1", "E1", "log_A2", "E2", "m", "n")
+
+
+def block_resample(residuals: np.ndarray, block_length: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Moving block bootstrap of every row of the (n_T, n_alpha) `residuals`.
+    """
+    n_runs, n_points = residuals.shape
+    block_length = min(block_length, n_points)
+    n_blocks = -(-n_points // block_length)
+    starts = rng.integers(0, n_points - block_length + 1, size=(n_runs, n_blocks))
+    index = (starts[:, :, np.newaxis] + np.arange(block_length)).reshape(n_runs, -1)[:, :n_points]
+    return np.take_along_axis(residuals, index, axis=1)
+
+
+def _refit_chunk(temperatures: np.ndarray, alpha_vals: np.ndarray, fitted: np.ndarray, residuals: np.ndarray,
+                 x_nominal: np.ndarray, seed: int, replicates: Sequence[int], block_length: int) -> np.ndarray:
+    """Refit the bootstrap `replicates` (indices), each with its own reproducible random stream."""
+    bounds = (JOINT_LOWER_BOUNDS, JOINT_UPPER_BOUNDS)
+    samples = np.empty((len(replicates), len(x_nominal)))
+    for i, replicate in enumerate(replicates):
+        rng = np.random.default_rng([seed, replicate])
+        synthetic = fitted + block_resample(residuals, block_length, rng)
+        model = StackedRateModel(dict(zip(temperatures, synthetic)), alpha_vals)
+        samples[i] = least_squares(model.residuals, x_nominal, jac=model.jacobian, bounds=bounds,
+                                   x_scale=JOINT_X_SCALE, **REFIT_SETTINGS).x
+    return samples
+
+
+class BootstrapResult:
+    """
+    Bootstrap samples of (log10(A1), E1, log10(A2), E2, m, n) around the
+    nominal fit `x_nominal`.
+    """
+    def __init__(self, x_nominal: np.ndarray, samples: np.ndarray):
+        self.x_nominal = np.asarray(x_nominal, dtype=float)
+        self.samples = np.asarray(samples, dtype=float)
+
+    def __len__(self):
+        return len(self.samples)
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """(6, 6) covariance in fit space, i.e. of log10(A) rather than A."""
+        return np.cov(self.samples, rowvar=False)
+
+    @property
+    def standard_errors(self) -> np.ndarray:
+        return np.sqrt(np.diag(self.covariance))
+
+    @property
+    def correlation(self) -> np.ndarray:
+        return np.corrcoef(self.samples, rowvar=False)
+
+    def parameter_samples(self) -> np.ndarray:
+        """(n_boot, 6) samples in KineticParameters order and units."""
+        physical = self.samples.copy()
+        physical[:, [0, 2]] = 10 ** physical[:, [0, 2]]
+        return physical
+
+    def confidence_intervals(self, level: float = 0.95) -> Dict[str, Tuple[float, float]]:
+        """Percentile intervals of A1, E1, A2, E2, m, n."""
+        tail = 50 * (1 - level)
+        low, high = np.percentile(self.parameter_samples(), [tail, 100 - tail], axis=0)
+        return {name: (float(lo), float(hi)) for name, lo, hi in zip(KineticParameters._fields, low, high)}
+
+    def prediction_band(self, alpha: np.ndarray, temperature: float, level: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Lower and upper percentile of da/dt at `alpha` and `temperature` (°C)
+        over all bootstrap samples.
+        """
+        p = self.parameter_samples().T[:, :, np.newaxis]
+        rates = da_dt(*p, np.asarray(alpha, dtype=float), temperature + 273.15)
+        tail = 50 * (1 - level)
+        low, high = np.percentile(rates, [tail, 100 - tail], axis=0)
+        return low, high
+
+
+def bootstrap_fit(data: Dict[float, np.ndarray], alpha_vals: np.ndarray, x_nominal: Sequence[float],
+                  n_boot: int = N_BOOT, block_length: int = BLOCK_LENGTH, seed: int = 0,
+                  max_workers: Optional[int] = None, chunk_size: int = CHUNK_SIZE,
+                  store: Optional[ResultStore] = None) -> BootstrapResult:
+    """
+    Residual block bootstrap of the joint fit of `data` (temperature (K) ->
+    measured cure rate at `alpha_vals`) around `x_nominal`.
+
+    Replicates are refitted in chunks of `chunk_size` across `max_workers`
+    processes (default: all cores). With a `store`, each chunk is kept under
+    the fingerprint of the data, nominal fit, seed and its replicate range.
+    """
+    x_nominal = np.asarray(x_nominal, dtype=float)
+    model = StackedRateModel(data, alpha_vals)
+    residuals = -model.residuals(x_nominal).reshape(model.measured.shape)
+    fitted = model.measured - residuals
+    temperatures = np.array(list(data.keys()), dtype=float)
+    alpha_vals = model.alpha_vals
+
+    base_key = fingerprint("bootstrap", temperatures, model.measured, alpha_vals, x_nominal,
+                           block_length, seed, REFIT_SETTINGS)
+    chunks = [list(range(start, min(start + chunk_size, n_boot))) for start in range(0, n_boot, chunk_size)]
+    keys = [fingerprint(base_key, chunk[0], len(chunk)) for chunk in chunks]
+
+    results: List[Optional[np.ndarray]] = [None] * len(chunks)
+    if store is not None:
+        for i, key in enumerate(keys):
+            record = store.get(key)
+            if record is not None:
+                results[i] = np.array(record["samples"])
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    args = (temperatures, alpha_vals, fitted, residuals, x_nominal, seed)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(missing) <= 1:
+        computed = [_refit_chunk(*args, chunks[i], block_length) for i in missing]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+            futures = [pool.submit(_refit_chunk, *args, chunks[i], block_length) for i in missing]
+            computed = [future.result() for future in futures]
+
+    for i, samples in zip(missing, computed):
+        results[i] = samples
+        if store is not None:
+            store.put(keys[i], {"samples": samples.tolist()})
+    return BootstrapResult(x_nominal, np.vstack(results) if results else np.empty((0, len(x_nominal))))
+
+
+def bootstrap_study(study: CureStudy, n_boot: int = N_BOOT, max_workers: Optional[int] = None,
+                    store: Optional[ResultStore] = None, **kwargs) -> BootstrapResult:
+    """Bootstrap of the joint fit of every run of `study`."""
+    p = study.joint_kinetic_parameters
+    data = {T + 273.15: study.rate_at_alpha(T) for T in study.temperatures}
+    x_nominal = [np.log10(p.A1), p.E1, np.log10(p.A2), p.E2, p.m, p.n]
+    return bootstrap_fit(data, study.alpha_vals, x_nominal, n_boot=n_boot, max_workers=max_workers,
+                         store=store, **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals of the kinetic parameters.")
+    parser.add_argument("n_boot", type=int, nargs="?", default=N_BOOT)
+    parser.add_argument("-j", "--workers", type=int, default=None)
+    parser.add_argument("--level", type=float, default=0.95)
+    args = parser.parse_args()
+
+    study = default_study()
+    result = bootstrap_study(study, args.n_boot, max_workers=args.workers, store=ResultStore(CACHE_DIR / "bootstrap"))
+    nominal = study.joint_kinetic_parameters
+    print(f"{len(result)} refits, {args.level:.0%} intervals")
+    for name, (low, high) in result.confidence_intervals(args.level).items():
+        print(f"{name:<2} = {getattr(nominal, name):12.6g}  [{low:12.6g}, {high:12.6g}]")
+    print("\nstandard errors (log10 A, E, m, n):",
+          ", ".join(f"{name} {se:.3g}" for name, se in zip(PARAMETER_NAMES, result.standard_errors)))
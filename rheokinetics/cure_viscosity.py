@@ -0,0 +1,103 @@
+"""
+Coupled cure and viscosity histories along temperature programs: the cure
+kinetics give alpha(t, T(t)), the Castro-Macosko model turns it into
+eta(t), and the gel time is where alpha reaches alpha_g.
+
+    python -m rheokinetics.cure_viscosity
+"""
+from typing import NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from cure_kinetics.kinetics import KineticParameters
+from cure_kinetics.simulation import TemperatureProgram, simulate_cure_programs
+from rheokinetics.viscosity import AROCY_L_10, CastroMacosko
+
+
+class CureViscosityHistory(NamedTuple):
+    """
+    Histories at the times `time` (s), one row per program: temperature
+    (°C), degree of cure, cure rate (1/s) and viscosity (Pa.s), and the gel
+    time (s) of every program (inf if it does not gel within `time`).
+    """
+    time: np.ndarray
+    temperature: np.ndarray
+    alpha: np.ndarray
+    rate: np.ndarray
+    viscosity: np.ndarray
+    gel_time: np.ndarray
+
+
+def gel_times(time: np.ndarray, alpha: np.ndarray, alpha_g: float) -> np.ndarray:
+    """
+    First time each row of `alpha` reaches `alpha_g`, linearly interpolated
+    between the samples, inf for rows that never do.
+    """
+    alpha = np.atleast_2d(alpha)
+    gelled = alpha >= alpha_g
+    index = np.argmax(gelled, axis=1)
+    reached = gelled[np.arange(len(alpha)), index]
+    after = np.take_along_axis(alpha, index[:, np.newaxis], axis=1)[:, 0]
+    before = np.take_along_axis(alpha, np.maximum(index - 1, 0)[:, np.newaxis], axis=1)[:, 0]
+    t_after, t_before = time[index], time[np.maximum(index - 1, 0)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(after > before, (alpha_g - before) / (after - before), 1.0)
+    return np.where(reached, t_before + fraction * (t_after - t_before), np.inf)
+
+
+def simulate_cure_viscosity(params: KineticParameters,
+                            programs: Union[TemperatureProgram, Sequence[TemperatureProgram]], t_lst,
+                            viscosity_model: CastroMacosko = AROCY_L_10,
+                            max_viscosity: Optional[float] = None) -> CureViscosityHistory:
+    """
+    Cure and viscosity histories of one program, or of many at once (rows
+    of the returned arrays), at the times `t_lst` (s).
+
+    Cure is integrated for all programs together (see
+    simulate_cure_programs); viscosity is one broadcasted evaluation over
+    all programs and times. Past the gel point the viscosity is inf, unless
+    clamped to `max_viscosity`.
+    """
+    single = isinstance(programs, TemperatureProgram)
+    programs = [programs] if single else list(programs)
+    t_lst = np.asarray(t_lst, dtype=float)
+
+    alpha, rate = simulate_cure_programs(params, programs, t_lst)
+    temperature = np.stack([p.temperature(t_lst) for p in programs])
+    viscosity = viscosity_model.visc(alpha, temperature + 273.15, max_viscosity)
+    gel_time = gel_times(t_lst, alpha, viscosity_model.alpha_g)
+
+    if single:
+        return CureViscosityHistory(t_lst, temperature[0], alpha[0], rate[0], viscosity[0], gel_time[0])
+    return CureViscosityHistory(t_lst, temperature, alpha, rate, viscosity, gel_time)
+
+
+if __name__ == "__main__":
+    import timeit
+    import matplotlib.pyplot as plt
+
+    from cure_kinetics.dataset import default_study
+
+    params = default_study().kinetic_parameters
+    t_lst = np.linspace(0, 4 * 3600, 2000)
+
+    # infusion at 120 °C, then cure at a range of temperatures
+    cure_temperatures = np.linspace(140, 180, 200)
+    cycles = [TemperatureProgram(120).hold(30).ramp(T, 2).hold(120) for T in cure_temperatures]
+    history = simulate_cure_viscosity(params, cycles, t_lst)
+    elapsed = min(timeit.repeat(lambda: simulate_cure_viscosity(params, cycles, t_lst), number=1, repeat=3))
+    print(f"{len(cycles)} cycles x {len(t_lst)} times: {elapsed * 1e3:.0f} ms")
+
+    fig, (ax_eta, ax_gel) = plt.subplots(1, 2, figsize=(11, 4))
+    for i in range(0, len(cycles), 50):
+        ax_eta.plot(t_lst / 60, history.viscosity[i], label=f'cure at {cure_temperatures[i]:.0f}°C')
+    ax_eta.set_yscale('log')
+    ax_eta.set_ylim(1e-2, 1e3)
+    ax_eta.set_xlabel('Time (min)')
+    ax_eta.set_ylabel('Viscosity (Pa.s)')
+    ax_eta.legend()
+    ax_gel.plot(cure_temperatures, history.gel_time / 60)
+    ax_gel.set_xlabel('Cure temperature (°C)')
+    ax_gel.set_ylabel('Gel time (min)')
+    plt.tight_layout()
+    plt.show()
@@ -0,0 +1,167 @@
+"""
+1-D resin infusion along a mould with spatially varying permeability,
+porosity and cross-section, and a resin viscosity that changes in time.
+
+Behind the front the flow is quasi-steady Darcy flow, so the flow rate q
+is the same everywhere and the pressure drop to the front x_f is
+
+    dP = q eta(t) R(x_f),    R(x) = int_0^x dx' / (A K)
+
+while the front advances as the pores fill, A phi dx_f/dt = q. Both
+separate into cumulative integrals over space and time:
+
+    constant pressure:  G(x_f) = dP int_0^t dt' / eta(t'),   G(x) = int_0^x R A phi dx'
+    constant flow:      V(x_f) = q t,                          V(x) = int_0^x A phi dx'
+
+so the front position follows from one interpolation of a precomputed
+integral, exactly and without a time step restriction. Gelled resin
+(eta = inf) stops the front.
+
+    python -m rheokinetics.flow_front
+"""
+from typing import Callable, NamedTuple, Union
+
+import numpy as np
+
+from cure_kinetics.integration import cumulative_integral
+from rheokinetics.permeability import kozeny_carman
+
+Viscosity = Union[float, np.ndarray, Callable[[np.ndarray], np.ndarray]]
+
+
+class FlowFrontResult(NamedTuple):
+    """
+    Front position (m), flow rate (m^3/s) and inlet pressure (Pa) at the
+    times `time` (s), and the fill time (s), inf if the mould is not filled.
+    """
+    time: np.ndarray
+    front: np.ndarray
+    flow_rate: np.ndarray
+    pressure: np.ndarray
+    fill_time: float
+
+
+class Mould1D:
+    """
+    Mould along x (m, from the inlet at x[0] = 0 to the vent at x[-1]) with
+    permeability K (m^2), porosity phi and cross-section A (m^2) at the
+    nodes; scalars are taken as constant along the mould.
+    """
+    def __init__(self, x, permeability, porosity, area):
+        self.x = np.asarray(x, dtype=float)
+        self.permeability = np.broadcast_to(np.asarray(permeability, dtype=float), self.x.shape)
+        self.porosity = np.broadcast_to(np.asarray(porosity, dtype=float), self.x.shape)
+        self.area = np.broadcast_to(np.asarray(area, dtype=float), self.x.shape)
+
+        # resistance per unit viscosity, pore volume and the constant pressure front integral
+        self.resistance = cumulative_integral(1.0 / (self.area * self.permeability), self.x)
+        self.pore_volume = cumulative_integral(self.area * self.porosity, self.x)
+        self.front_integral = cumulative_integral(self.resistance * self.area * self.porosity, self.x)
+
+    @classmethod
+    def from_fibre_volume_fraction(cls, x, Vf, area, **kozeny_carman_kwargs) -> 'Mould1D':
+        """Mould with Kozeny-Carman permeability and porosity 1 - Vf."""
+        Vf = np.asarray(Vf, dtype=float)
+        return cls(x, kozeny_carman(Vf, **kozeny_carman_kwargs), 1.0 - Vf, area)
+
+    @property
+    def length(self) -> float:
+        return float(self.x[-1] - self.x[0])
+
+
+def _viscosity_at(viscosity: Viscosity, t_lst: np.ndarray) -> np.ndarray:
+    if callable(viscosity):
+        return np.asarray(viscosity(t_lst), dtype=float)
+    return np.broadcast_to(np.asarray(viscosity, dtype=float), t_lst.shape)
+
+
+def _first_crossing(t_lst: np.ndarray, values: np.ndarray, target: float) -> float:
+    """First time the non-decreasing `values` reach `target`, linearly interpolated; inf if never."""
+    index = int(np.searchsorted(values, target, side='left'))
+    if index >= len(values):
+        return np.inf
+    if index == 0:
+        return float(t_lst[0])
+    fraction = (target - values[index - 1]) / (values[index] - values[index - 1])
+    return float(t_lst[index - 1] + fraction * (t_lst[index] - t_lst[index - 1]))
+
+
+def fill_constant_pressure(mould: Mould1D, pressure: float, viscosity: Viscosity, t_lst) -> FlowFrontResult:
+    """
+    Infusion at a constant inlet pressure difference `pressure` (Pa).
+
+    `viscosity` (Pa.s) is a constant, its values at `t_lst` (e.g. from
+    simulate_cure_viscosity) or a function of time; its fluidity 1 / eta is
+    integrated over `t_lst`, which should resolve its changes.
+    """
+    t_lst = np.asarray(t_lst, dtype=float)
+    eta = _viscosity_at(viscosity, t_lst)
+    with np.errstate(divide='ignore'):
+        fluidity = np.where(np.isfinite(eta), 1.0 / eta, 0.0)
+    driving = pressure * (cumulative_integral(fluidity, t_lst) + t_lst[0] * fluidity[0])
+
+    front = np.interp(driving, mould.front_integral, mould.x)
+    resistance = np.interp(front, mould.x, mould.resistance)
+    filled = driving >= mould.front_integral[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        flow_rate = np.where(filled, 0.0, pressure * fluidity / resistance)
+    fill_time = _first_crossing(t_lst, driving, mould.front_integral[-1])
+    return FlowFrontResult(t_lst, front, flow_rate, np.full(t_lst.shape, float(pressure)), fill_time)
+
+
+def fill_constant_flow(mould: Mould1D, flow_rate: float, viscosity: Viscosity, t_lst) -> FlowFrontResult:
+    """
+    Infusion at a constant volumetric flow rate `flow_rate` (m^3/s); the
+    returned pressure is the inlet pressure it takes, inf for gelled resin.
+    """
+    t_lst = np.asarray(t_lst, dtype=float)
+    eta = _viscosity_at(viscosity, t_lst)
+    injected = flow_rate * t_lst
+
+    front = np.interp(injected, mould.pore_volume, mould.x)
+    filled = injected >= mould.pore_volume[-1]
+    pressure = np.where(filled, 0.0, flow_rate * eta * np.interp(front, mould.x, mould.resistance))
+    fill_time = mould.pore_volume[-1] / flow_rate
+    return FlowFrontResult(t_lst, front, np.where(filled, 0.0, flow_rate), pressure, fill_time)
+
+
+if __name__ == "__main__":
+    import timeit
+    import matplotlib.pyplot as plt
+
+    from cure_kinetics.dataset import default_study
+    from cure_kinetics.simulation import TemperatureProgram
+    from rheokinetics.cure_viscosity import simulate_cure_viscosity
+    from rheokinetics.permeability import fibre_volume_fraction
+
+    # 1 m long, 0.25 m wide mould in three thickness regions, 5 plies of 0.4 kg/m^2, filled at 120 °C
+    x = np.linspace(0.0, 1.0, 3001)
+    thickness = np.select([x < 1 / 3, x < 2 / 3], [2.30e-3, 2.02e-3], 1.76e-3)
+    mould = Mould1D.from_fibre_volume_fraction(x, fibre_volume_fraction(0.4, 5, 1800, thickness), 0.25 * thickness)
+
+    t_lst = np.linspace(0, 3 * 3600, 2000)
+    history = simulate_cure_viscosity(default_study().kinetic_parameters, TemperatureProgram(120).hold(180), t_lst)
+
+    print(f"gel time {history.gel_time / 60:.1f} min")
+    for bar in (10, 20, 50, 100):
+        fill_time = fill_constant_pressure(mould, bar * 1e5, history.viscosity, t_lst).fill_time
+        print(f"fill time at {bar:>3} bar: {fill_time / 60:.1f} min")
+    elapsed = min(timeit.repeat(lambda: fill_constant_pressure(mould, 1e7, history.viscosity, t_lst),
+                                number=100, repeat=3)) / 100
+    print(f"{elapsed * 1e3:.2f} ms per fill")
+
+    pressure = fill_constant_pressure(mould, 1e7, history.viscosity, t_lst)
+    flow = fill_constant_flow(mould, mould.pore_volume[-1] / (20 * 60), history.viscosity, t_lst)
+    print(f"constant flow, 20 min fill: peak inlet pressure {np.max(flow.pressure) / 1e5:.1f} bar")
+
+    fig, (ax_front, ax_pressure) = plt.subplots(1, 2, figsize=(11, 4))
+    ax_front.plot(t_lst / 60, pressure.front)
+    ax_front.set_xlabel('Time (min)')
+    ax_front.set_ylabel('Flow front (m)')
+    ax_front.set_title('Constant pressure, 100 bar')
+    ax_pressure.plot(t_lst / 60, flow.pressure / 1e5)
+    ax_pressure.set_xlabel('Time (min)')
+    ax_pressure.set_ylabel('Inlet pressure (bar)')
+    ax_pressure.set_title('Constant flow rate')
+    plt.tight_layout()
+    plt.show()
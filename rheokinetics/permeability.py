@@ -0,0 +1,20 @@
+import numpy as np
+
+from rheokinetics.resources.constants import FIBRE_RADIUS, KOZENY_CONSTANT
+
+
+def kozeny_carman(Vf, R: float = FIBRE_RADIUS, k: float = KOZENY_CONSTANT):
+    """
+    Kozeny-Carman permeability (m^2) of a fibre bed with fibre volume
+    fraction `Vf` and fibre radius `R` (m).
+    """
+    Vf = np.asarray(Vf, dtype=float)
+    return (R**2 / (4*k)) * ((1 - Vf)**3 / Vf**2)
+
+
+def fibre_volume_fraction(areal_weight: float, n_layers: int, fibre_density: float, thickness):
+    """
+    Vf = AW * n / (rho_f * t) of `n_layers` plies of areal weight `areal_weight`
+    (kg/m^2) compacted to `thickness` (m).
+    """
+    return areal_weight * n_layers / (fibre_density * np.asarray(thickness, dtype=float))
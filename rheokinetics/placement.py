@@ -0,0 +1,401 @@
+"""
+Inlet and vent placement on a MouldGrid: the layout of `n_inlets` inlets,
+out of a set of candidate cells, that fills the part fastest at the
+pressure ceiling before the resin gels.
+
+Layouts are screened with a surrogate of the Darcy fill model. In a
+uniform part filled along a line the front reaches distance L after
+
+    t = phi eta L^2 / (2 K dP),   i.e.   dP int_0^t dt' / eta = d^2 / 2,   d = int sqrt(phi / K) ds
+
+so every cell gets a "fill distance" d, the shortest path from the nearest
+inlet weighted by sqrt(phi / K). The distances from every candidate are
+computed once (Dijkstra on the 8-neighbour cell graph); a layout's field
+is then the minimum over its inlets. Its local maxima are the last cells
+of their region to fill: the largest gives the fill time, the vents go to
+the largest ones, and further ones are likely dry spots.
+
+The surrogate only ranks layouts: fronts from point inlets spread
+radially and slow down faster than a straight front, so its fill times
+are optimistic. Fill times and dry spots of the best layouts come from
+the full model, run until the resin gels (or its viscosity table ends).
+By default a layout has to fill the part without dry spots in the full
+model, a ValueError is raised when none of the refined layouts does.
+
+The search samples random layouts and then moves inlets to neighbouring
+candidates from the best ones, evaluating batches across a process pool;
+layouts met again are looked up, not re-evaluated. The best few are
+refined with the full model, simulate_filling: once without vents to find
+the last cells to fill, where the vents go, and once with them.
+
+    python -m rheokinetics.placement
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import ndimage, sparse
+from scipy.sparse.csgraph import dijkstra
+
+from cure_kinetics.integration import cumulative_integral
+from rheokinetics.flow_front import Viscosity
+from rheokinetics.mould_filling import FillResult, MouldGrid, simulate_filling
+
+N_RANDOM = 2000
+N_ROUNDS = 10
+N_PARENTS = 20
+N_NEIGHBOURS = 6
+N_REFINE = 3
+CHUNK_SIZE = 200
+PEAK_FOOTPRINT = 7
+
+Position = Tuple[int, int]
+
+
+class LayoutScore(NamedTuple):
+    """
+    Surrogate evaluation of a layout: fill time (s, inf if the resin gels
+    first), the largest fill distance, vent cells (flat indices) at the
+    highest local maxima of the fill distance, and the number of further
+    local maxima (likely dry spots).
+    """
+    fill_time: float
+    distance: float
+    vents: Tuple[int, ...]
+    extra_maxima: int
+
+
+class Layout(NamedTuple):
+    """
+    Inlet and vent positions (row, column) of a refined layout, its
+    surrogate fill time (s) and extra local maxima, and the full model
+    result with vents at the last cells to fill.
+    """
+    inlets: Tuple[Position, ...]
+    vents: Tuple[Position, ...]
+    surrogate_fill_time: float
+    extra_maxima: int
+    fill: FillResult
+
+
+class PlacementResult(NamedTuple):
+    """
+    Refined layouts, best first, and the search statistics: layouts the
+    search asked for, how many were distinct (and so evaluated) and the
+    surrogate evaluation rate (layouts / s).
+    """
+    layouts: List[Layout]
+    n_requested: int
+    n_evaluated: int
+    layouts_per_second: float
+
+
+def fill_distance_graph(grid: MouldGrid) -> sparse.csr_matrix:
+    """
+    Symmetric 8-neighbour graph of the part's cells, edge lengths the
+    distance between the cell centres weighted by the mean sqrt(phi / K)
+    of both cells (s^0.5 Pa^0.5 / Pa.s^0.5 units: d^2 / 2 is dP int dt / eta).
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slowness = np.where(grid.mask, np.sqrt(grid.porosity / grid.permeability), np.nan)
+    index = np.arange(slowness.size).reshape(grid.shape)
+    rows, cols, lengths = [], [], []
+    n_rows, n_cols = grid.shape
+    for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        first = (slice(0, n_rows - di), slice(max(0, -dj), n_cols - max(0, dj)))
+        second = (slice(di, n_rows), slice(max(0, dj), n_cols - max(0, -dj)))
+        length = 0.5 * (slowness[first] + slowness[second]) * np.hypot(di * grid.dy, dj * grid.dx)
+        keep = np.isfinite(length)
+        rows += [index[first][keep], index[second][keep]]
+        cols += [index[second][keep], index[first][keep]]
+        lengths += [length[keep], length[keep]]
+    n = slowness.size
+    return sparse.csr_matrix((np.concatenate(lengths), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n))
+
+
+def _distance_chunk(graph: sparse.csr_matrix, sources: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    return dijkstra(graph, indices=sources)[:, cells].astype(np.float32)
+
+
+def candidate_cells(grid: MouldGrid, spacing: int) -> List[Position]:
+    """Cells of the part on a lattice of `spacing` cells, including the last row and column."""
+    rows = np.unique(np.r_[np.arange(0, grid.shape[0], spacing), grid.shape[0] - 1])
+    cols = np.unique(np.r_[np.arange(0, grid.shape[1], spacing), grid.shape[1] - 1])
+    return [(int(i), int(j)) for i in rows for j in cols if grid.mask[i, j]]
+
+
+# Worker state of the surrogate evaluations, set once per process
+_surrogate = None
+
+
+def _set_surrogate(surrogate: 'PlacementSurrogate') -> None:
+    global _surrogate
+    _surrogate = surrogate
+
+
+def _score_chunk(layouts: np.ndarray) -> List[LayoutScore]:
+    return [_surrogate.score(layout) for layout in layouts]
+
+
+class PlacementSurrogate:
+    """
+    Fill distance fields of every candidate inlet of `grid` and the
+    driving integral dP int dt / eta of the resin at the pressure ceiling,
+    to score layouts (tuples of candidate indices).
+    """
+    def __init__(self, grid: MouldGrid, candidates: Sequence[Position], pressure: float, viscosity: Viscosity,
+                 t_lst, n_vents: int = 1, max_workers: Optional[int] = None):
+        self.shape = grid.shape
+        self.candidates = [tuple(int(v) for v in c) for c in candidates]
+        self.n_vents = n_vents
+        self.cells = np.flatnonzero(grid.mask)
+        sources = np.ravel_multi_index(np.array(self.candidates).T, grid.shape)
+        if not np.all(grid.mask.ravel()[sources]):
+            raise ValueError("Candidate inlet outside the part.")
+
+        graph = fill_distance_graph(grid)
+        max_workers = max_workers or os.cpu_count() or 1
+        chunks = np.array_split(sources, min(max_workers, len(sources)))
+        if max_workers == 1 or len(chunks) == 1:
+            fields = [_distance_chunk(graph, chunk, self.cells) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+                fields = list(pool.map(_distance_chunk, repeat(graph), chunks, repeat(self.cells)))
+        self.fields = np.vstack(fields)
+
+        self.t_lst = np.asarray(t_lst, dtype=float)
+        eta = viscosity(self.t_lst) if callable(viscosity) else viscosity
+        eta = np.broadcast_to(np.asarray(eta, dtype=float), self.t_lst.shape)
+        with np.errstate(divide='ignore'):
+            fluidity = np.where(np.isfinite(eta), 1.0 / eta, 0.0)
+        self.driving = pressure * (cumulative_integral(fluidity, self.t_lst) + self.t_lst[0] * fluidity[0])
+        # the resin flows until it gels, or as far as its viscosity is known
+        gelled = ~np.isfinite(eta)
+        self.end_time = float(self.t_lst[np.argmax(gelled)] if gelled.any() else self.t_lst[-1])
+
+    def fill_time(self, distance) -> np.ndarray:
+        """Time (s) a straight front takes to a fill distance `distance`, inf if the resin gels before."""
+        driving = 0.5 * np.asarray(distance, dtype=float) ** 2
+        return np.where(driving <= self.driving[-1], np.interp(driving, self.driving, self.t_lst), np.inf)
+
+    def distance(self, layout: Sequence[int]) -> np.ndarray:
+        """Fill distance of every cell of the grid (nan outside the part) with inlets at `layout`."""
+        field = np.full(self.shape[0] * self.shape[1], np.nan)
+        field[self.cells] = self.fields[list(layout)].min(axis=0)
+        return field.reshape(self.shape)
+
+    def score(self, layout: Sequence[int]) -> LayoutScore:
+        peaks, heights = _local_maxima(self.distance(layout))
+        return LayoutScore(float(self.fill_time(heights[0])), float(heights[0]),
+                           tuple(int(k) for k in peaks[:self.n_vents]), max(0, len(peaks) - self.n_vents))
+
+
+def _local_maxima(field: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flat index of the highest cell of every group of local maxima of
+    `field` (nan outside the part) and its value, highest first. Maxima
+    over `PEAK_FOOTPRINT` cells, so the many small ones along the line
+    where two fronts meet do not count separately.
+    """
+    part = np.isfinite(field)
+    field = np.where(part, field, -np.inf)
+    largest = ndimage.maximum_filter(field, size=PEAK_FOOTPRINT, mode='constant', cval=-np.inf)
+    maxima = part & (field >= largest)
+    labels, n_maxima = ndimage.label(maxima, structure=np.ones((3, 3)))
+    positions = np.array(ndimage.maximum_position(field, labels, np.arange(1, n_maxima + 1)), dtype=int)
+    peaks = np.ravel_multi_index(positions.reshape(-1, 2).T, field.shape)
+    heights = field.ravel()[peaks]
+    order = np.argsort(-heights)
+    return peaks[order], heights[order]
+
+
+def _neighbour_candidates(candidates: Sequence[Position], n_neighbours: int) -> np.ndarray:
+    positions = np.array(candidates, dtype=float)
+    distances = np.hypot(*(positions[:, np.newaxis, :] - positions[np.newaxis, :, :]).transpose(2, 0, 1))
+    return np.argsort(distances, axis=1)[:, 1:n_neighbours + 1]
+
+
+def _rank(score: LayoutScore) -> Tuple[bool, float, int, float]:
+    """
+    Layouts that fill before the resin gels first, then by fill time, extra
+    maxima and, among those that gel first, distance.
+    """
+    return not np.isfinite(score.fill_time), score.fill_time, score.extra_maxima, score.distance
+
+def optimize_placement(grid: MouldGrid, candidates: Sequence[Position], n_inlets: int, pressure: float,
+                       viscosity: Viscosity, t_lst, n_vents: int = 1, n_random: int = N_RANDOM,
+                       n_rounds: int = N_ROUNDS, n_parents: int = N_PARENTS, n_refine: int = N_REFINE,
+                       allow_dry_spots: bool = False, max_workers: Optional[int] = None,
+                       seed: Optional[int] = 0) -> PlacementResult:
+    """
+    Best placement of `n_inlets` inlets out of the `candidates` cells and of
+    `n_vents` vents, injecting at the ceiling `pressure` (Pa) a resin of
+    `viscosity` (Pa.s: constant, values at `t_lst` (s), e.g. from
+    simulate_cure_viscosity, or a function of time; inf once gelled).
+
+    `n_random` random layouts are scored with the surrogate, then for
+    `n_rounds` rounds every inlet of the `n_parents` best layouts is moved
+    to each of its nearest candidates. The `n_refine` best layouts are
+    simulated with simulate_filling until the resin gels (or `t_lst` ends),
+    with vents placed by the full model (see _refine), and returned by full
+    model fill time. Unless `allow_dry_spots`, only the layouts that fill
+    the part without dry spots are returned, and a ValueError is raised when
+    there are none; otherwise those without dry spots come first. Batches
+    are spread across `max_workers` processes.
+    """
+    if not 0 < n_inlets <= len(candidates):
+        raise ValueError(f"Cannot place {n_inlets} inlets on {len(candidates)} candidates.")
+    max_workers = max_workers or os.cpu_count() or 1
+    surrogate = PlacementSurrogate(grid, candidates, pressure, viscosity, t_lst, n_vents, max_workers)
+    neighbours = _neighbour_candidates(candidates, N_NEIGHBOURS)
+    rng = np.random.default_rng(seed)
+    scores: Dict[Tuple[int, ...], LayoutScore] = {}
+    n_requested = 0
+    elapsed = 0.0
+
+    pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_set_surrogate, initargs=(surrogate,)) \
+        if max_workers > 1 else None
+    _set_surrogate(surrogate)
+
+    def evaluate(layouts: List[Tuple[int, ...]]) -> None:
+        nonlocal n_requested, elapsed
+        n_requested += len(layouts)
+        new = list(dict.fromkeys(layout for layout in layouts if layout not in scores))
+        if not new:
+            return
+        start = time.perf_counter()
+        chunks = [np.array(new[i:i + CHUNK_SIZE]) for i in range(0, len(new), CHUNK_SIZE)]
+        if pool is None or len(chunks) == 1:
+            results = [_score_chunk(chunk) for chunk in chunks]
+        else:
+            results = list(pool.map(_score_chunk, chunks))
+        elapsed += time.perf_counter() - start
+        for layout, score in zip(new, (score for chunk in results for score in chunk)):
+            scores[layout] = score
+
+    try:
+        evaluate([tuple(sorted(int(i) for i in rng.choice(len(candidates), n_inlets, replace=False)))
+                  for _ in range(n_random)])
+        for _ in range(n_rounds):
+            parents = sorted(scores, key=lambda layout: _rank(scores[layout]))[:n_parents]
+            children = []
+            for parent in parents:
+                for k, inlet in enumerate(parent):
+                    for moved in neighbours[inlet]:
+                        if moved not in parent:
+                            children.append(tuple(sorted(parent[:k] + (int(moved),) + parent[k + 1:])))
+            evaluate(children)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    best = sorted(scores, key=lambda layout: _rank(scores[layout]))[:n_refine]
+    inlets = [grid.cells([candidates[i] for i in layout]) for layout in best]
+    full_viscosity = _full_model_viscosity(viscosity, surrogate.t_lst)
+    refine_args = (pressure, full_viscosity, n_vents, surrogate.end_time)
+    if max_workers == 1 or len(best) <= 1:
+        refined = [_refine(grid, cells, *refine_args) for cells in inlets]
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(best))) as pool:
+            futures = [pool.submit(_refine, grid, cells, *refine_args) for cells in inlets]
+            refined = [future.result() for future in futures]
+
+    layouts = [Layout(tuple(tuple(candidates[i]) for i in layout), vents, scores[layout].fill_time,
+                      scores[layout].extra_maxima, fill)
+               for layout, (vents, fill) in zip(best, refined)]
+    layouts.sort(key=lambda layout: (layout.fill.dry_spots.any(), layout.fill.fill_time))
+    if not allow_dry_spots:
+        complete = [layout for layout in layouts if np.isfinite(layout.fill.fill_time)
+                    and not layout.fill.dry_spots.any()]
+        if not complete:
+            outcomes = ", ".join(f"{layout.fill.dry_spots.sum()} dry cells" if np.isfinite(layout.fill.fill_time)
+                                 else "gelled first" for layout in layouts)
+            raise ValueError(f"None of the {len(layouts)} refined layouts fills the part without dry spots "
+                             f"({outcomes}): allow more vents or inlets, or pass allow_dry_spots=True.")
+        layouts = complete
+    rate = len(scores) / elapsed if elapsed > 0 else np.inf
+    return PlacementResult(layouts, n_requested, len(scores), rate)
+
+
+def _refine(grid: MouldGrid, inlets: np.ndarray, pressure: float, viscosity, n_vents: int, max_time: float
+            ) -> Tuple[Tuple[Position, ...], FillResult]:
+    """
+    Full model fill with up to `n_vents` vents: the first at the last cell
+    to fill of an evacuated fill, every further one at the last cell to
+    fill of the largest dry spot left by the vents so far. The fills stop
+    at `max_time` (s), when the resin gels: a step started before would
+    otherwise carry on at the viscosity it started with.
+    """
+    evacuated = simulate_filling(grid, inlets, pressure, viscosity, max_time=max_time)
+    last = np.where(np.isfinite(evacuated.cell_fill_time), evacuated.cell_fill_time, -np.inf)
+    vents = [np.unravel_index(np.argmax(last), grid.shape)]
+    fill = simulate_filling(grid, inlets, pressure, viscosity, vents=grid.cells(vents), max_time=max_time)
+    while len(vents) < n_vents and fill.dry_spots.any():
+        labels, n_spots = ndimage.label(fill.dry_spots)
+        largest = 1 + np.argmax(np.bincount(labels.ravel())[1:])
+        vents.append(np.unravel_index(np.argmax(np.where(labels == largest, last, -np.inf)), grid.shape))
+        fill = simulate_filling(grid, inlets, pressure, viscosity, vents=grid.cells(vents), max_time=max_time)
+    return tuple(tuple(int(v) for v in vent) for vent in vents), fill
+
+
+class _TabulatedViscosity:
+    """Viscosity at time t interpolated in a table, inf from the first inf (gelled) entry on."""
+    def __init__(self, t_lst: np.ndarray, eta: np.ndarray):
+        gelled = ~np.isfinite(eta)
+        self.gel_time = t_lst[np.argmax(gelled)] if gelled.any() else np.inf
+        self.t_lst = t_lst[~gelled]
+        self.eta = eta[~gelled]
+
+    def __call__(self, t: float) -> float:
+        return np.inf if t >= self.gel_time else float(np.interp(t, self.t_lst, self.eta))
+
+
+def _full_model_viscosity(viscosity: Viscosity, t_lst: np.ndarray):
+    """simulate_filling takes a constant or a function of time, tabulated values become the latter."""
+    if callable(viscosity) or np.ndim(viscosity) == 0:
+        return viscosity
+    return _TabulatedViscosity(t_lst, np.asarray(viscosity, dtype=float))
+
+
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    from cure_kinetics.dataset import default_study
+    from cure_kinetics.simulation import TemperatureProgram
+    from rheokinetics.cure_viscosity import simulate_cure_viscosity
+
+    # the 1 m x 0.5 m panel of mould_filling.py at a coarser grid: 3 point inlets, 10 bar ceiling,
+    # resin at 95 °C, and up to 6 vents, as the fronts also meet around the hole and in the corners
+    n_rows, n_cols = 50, 100
+    thickness = np.full((n_rows, n_cols), 2.02e-3)
+    thickness[:, n_cols // 3:] = 2.30e-3
+    thickness[:, 2 * n_cols // 3:] = 1.76e-3
+    rows, cols = np.mgrid[:n_rows, :n_cols]
+    thickness[np.hypot(rows - n_rows / 2, cols - n_cols / 2) < n_rows / 6] = np.nan
+    grid = MouldGrid.from_laminate(thickness, 1.0 / n_cols, areal_weight=0.4, n_layers=5, fibre_density=1800)
+
+    t_lst = np.linspace(0, 6 * 3600, 3000)
+    history = simulate_cure_viscosity(default_study().kinetic_parameters, TemperatureProgram(95).hold(360), t_lst)
+    print(f"gel time {history.gel_time / 60:.1f} min")
+
+    candidates = candidate_cells(grid, 5)
+    start = time.perf_counter()
+    result = optimize_placement(grid, candidates, n_inlets=3, pressure=1e6, viscosity=history.viscosity,
+                                t_lst=t_lst, n_vents=6)
+    print(f"{len(candidates)} candidates, {result.n_requested} layouts requested, {result.n_evaluated} evaluated "
+          f"at {result.layouts_per_second:.0f} layouts/s, {time.perf_counter() - start:.1f} s in total")
+    for layout in result.layouts:
+        print(f"inlets {layout.inlets} vents {layout.vents}: surrogate {layout.surrogate_fill_time / 60:.1f} min, "
+              f"full model {layout.fill.fill_time / 60:.1f} min, {layout.fill.dry_spots.sum()} dry cells")
+
+    best = result.layouts[0]
+    plt.imshow(best.fill.cell_fill_time / 60, origin='lower', extent=(0, 1, 0, 0.5))
+    plt.colorbar(label='Fill time (min)')
+    plt.plot(*(np.array([(j + 0.5, i + 0.5) for i, j in best.inlets]) / n_cols).T, 'w^', label='inlets')
+    plt.plot(*(np.array([(j + 0.5, i + 0.5) for i, j in best.vents]) / n_cols).T, 'rx', label='vents')
+    plt.legend()
+    plt.title('Best inlet and vent placement')
+    plt.show()
@@ -1,12 +1,17 @@
 import enum
-import re
+import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 
 import numpy as np
 from matplotlib import pyplot as plt
 from scipy.signal import butter, filtfilt
 
+# Also runnable from this directory, as before: the packages are imported from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from common.table_io import read_sheet_to_dict
+
 class headers(enum.Enum):
     TEMP = "Temp."
     FREQ = "Freq."
@@ -25,33 +30,7 @@ class headers(enum.Enum):
     DERIVATIVE_2_LOG_LOSS_MODULUS = 'd2logE"_dT2'
 
 
-def read_sheet_to_dict(path: Path) -> Dict[str, List[float]]:
-    """
-    Read a whitespace/tab-separated table from `path` and return a dict
-    mapping header -> list of column values. Decimal commas (`,`) are
-    accepted and converted to dots for numeric parsing.
-    """
-    text = path.read_text(encoding="utf-8")
-    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-    if not lines:
-        return {}
-    # split header on any whitespace
-    header = re.split(r'\s+', lines[0])
-    rows: List[List[str]] = []
-    for ln in lines[1:]:
-        parts = re.split(r'\s+', ln)
-        rows.append(parts)
-
-    result: Dict[str, List[float]] = {h: [] for h in header}
-    for row in rows:
-        # if a row is shorter/longer, zip will clip to header length
-        for h, cell in zip(header, row):
-            s = cell.replace(',', '.')
-            value = float(s)
-            result[h].append(value)
-    return result
-
-def filter_dict_by_value(data: Dict[str, List[float]], key: str, upper_limit: float, lower_limit: float) -> Dict[str, List[float]]:
+def filter_dict_by_value(data: Dict[str, np.ndarray], key: str, upper_limit: float, lower_limit: float) -> Dict[str, np.ndarray]:
     """
     Filter the input dictionary `data` to only include rows where the value
     in the column `key` is between upper and lower limit.
@@ -59,14 +38,10 @@ def filter_dict_by_value(data: Dict[str, List[float]], key: str, upper_limit: fl
     if key not in data:
         raise KeyError(f"Key '{key}' not found in data.")
 
-    filtered_indices = [i for i, value in enumerate(data[key]) if upper_limit >= value >= lower_limit]
-
-    filtered_data: Dict[str, List[float]] = {k: [] for k in data.keys()}
-    for i in filtered_indices:
-        for k in data.keys():
-            filtered_data[k].append(data[k][i])
+    column = np.asarray(data[key])
+    mask = (column <= upper_limit) & (column >= lower_limit)
 
-    return filtered_data
+    return {k: np.asarray(v)[mask] for k, v in data.items()}
 
 def apply_lowpass_filter(data: list[float], time: list[float], cutoff_freq: float) -> np.ndarray:
     t = np.array(time)
@@ -93,14 +68,14 @@ DMA_results = read_sheet_to_dict(path_to_sheet)
 #---------------------------------------------------------------------------------------
 # Remove 'appendix' of data where temperature goes back down:
 #---------------------------------------------------------------------------------------
-max_temp_index = DMA_results["Temp."].index(max(DMA_results["Temp."]))
+max_temp_index = int(np.argmax(DMA_results["Temp."]))
 for key in DMA_results.keys():
     DMA_results[key] = DMA_results[key][:max_temp_index + 1]
 
 #---------------------------------------------------------------------------------------
 # Organize data by frequency:
 #---------------------------------------------------------------------------------------
-DMA_results_by_freq: Dict[float, Dict[str, List[float]]] = {
+DMA_results_by_freq: Dict[float, Dict[str, np.ndarray]] = {
     20.0: filter_dict_by_value(DMA_results, key="Freq.", upper_limit=20.0, lower_limit=20.0),
     10.0: filter_dict_by_value(DMA_results, key="Freq.", upper_limit=10.0, lower_limit=10.0),
     5.0: filter_dict_by_value(DMA_results, key="Freq.", upper_limit=5.0, lower_limit=5.0),
@@ -1,7 +1,15 @@
+import sys
+from pathlib import Path
+
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import FuncFormatter
 
+# Also runnable from this directory, as before: the packages are imported from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from rheokinetics.permeability import kozeny_carman
+
 # ----------------------------
 # Given parameters
 # ----------------------------
@@ -21,13 +29,7 @@ Vf_regions = AW * n_layers / (rho_f * t_values)
 # Fibre volume fractions for nominal curve
 Vf = np.arange(0.35, 0.66, 0.05)
 
-# ----------------------------
-# Permeability calculation
-# ----------------------------
-def kozeny_carman(Vf, R=R, k=k):
-    return (R**2 / (4*k)) * ((1 - Vf)**3 / Vf**2)
-
-K_nom = kozeny_carman(Vf)
+K_nom = kozeny_carman(Vf, R=R, k=k)
 
 # ----------------------------
 # Plotting
@@ -1,6 +1,14 @@
+import sys
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import numpy as np
 
+# Also runnable from this directory, as before: the packages are imported from the repository root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from rheokinetics.permeability import kozeny_carman
+
 # ----------------------------
 # Given parameters
 # ----------------------------
@@ -23,13 +31,7 @@ Vf_regions = AW * n_layers / (rho_f * t_values)
 # Fibre volume fractions for nominal curve
 Vf = np.arange(0.35, 0.66, 0.05)
 
-# ----------------------------
-# Permeability function
-# ----------------------------
-def kozeny_carman(Vf, R=R, k=k):
-    return (R** 2 / (4*k)) * ((1 - Vf)** 3 / Vf **2)
-
-K_nom = kozeny_carman(Vf)
+K_nom = kozeny_carman(Vf, R=R, k=k)
 
 # Required pressure: ΔP = (L^2 * η) / (K * t)
 deltaP_nom = (L**2 * eta) / (K_nom * t_infusion)  # in Pa
@@ -45,7 +47,7 @@ ax.plot(Vf, deltaP_nom/1e5, marker='o', linestyle='-', color='blue', label='ΔP
 # Indicate the three Vf points for the mould cavity
 colors = ['red', 'green', 'orange']
 for Vf_r, t_r, color in zip(Vf_regions, thickness_mm, colors):
-    K_r = kozeny_carman(Vf_r)
+    K_r = kozeny_carman(Vf_r, R=R, k=k)
     deltaP_r = (L**2 * eta) / (K_r * t_infusion) / 1e5  # convert to bar
     ax.plot(Vf_r, deltaP_r, marker='x', markersize=10, color=color)
     ax.text(Vf_r + 0.002, deltaP_r*1.05, f'{t_r} mm', color=color, fontsize=10)
@@ -1 +1,3 @@
-LOG_DATA_CUTOFF_FREQ = 0.1  # 1/min
\ No newline at end of file
+LOG_DATA_CUTOFF_FREQ = 0.1  # 1/min
+FIBRE_RADIUS = 7e-6  # m
+KOZENY_CONSTANT = 5
@@ -0,0 +1,58 @@
+from typing import Optional
+
+import numpy as np
+
+
+class CastroMacosko:
+    """
+    Castro-Macosko chemorheological model:
+    eta = A * exp(T_b / T) * (alpha_g / (alpha_g - alpha))^(c1 + c2 * alpha), T in Kelvin.
+
+    Alpha and temperature broadcast against each other, so a whole
+    alpha x temperature grid (or a field of mesh nodes) is one call, e.g.
+    visc(alpha[np.newaxis, :], temperatures[:, np.newaxis]).
+
+    At and beyond the gel point (alpha >= alpha_g) the viscosity is
+    infinite, unless it is clamped with `max_viscosity`.
+    """
+    def __init__(self, alpha_g: float, c1: float, c2: float, T_b: float, A: float):
+        self.alpha_g = alpha_g
+        self.c1 = c1
+        self.c2 = c2
+        self.T_b = T_b
+        self.A = A
+
+    def __repr__(self):
+        return (f"CastroMacosko(alpha_g={self.alpha_g}, c1={self.c1}, c2={self.c2}, "
+                f"T_b={self.T_b}, A={self.A})")
+
+    def gelled(self, alpha) -> np.ndarray:
+        return np.asarray(alpha) >= self.alpha_g
+
+    def log_visc(self, alpha, temperature, max_viscosity: Optional[float] = None) -> np.ndarray:
+        """
+        Natural log of the viscosity (Pa.s). Evaluated in log space,
+        ln(alpha_g / (alpha_g - alpha)) = -log1p(-alpha / alpha_g), so it
+        stays accurate up to the gel point, where it becomes +inf.
+        """
+        alpha = np.asarray(alpha, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            divergence = -np.log1p(-np.minimum(alpha, self.alpha_g) / self.alpha_g)
+        divergence *= self.c1 + self.c2 * alpha
+        log_eta = np.log(self.A) + self.T_b / np.asarray(temperature, dtype=float) + divergence
+        if max_viscosity is not None:
+            log_eta = np.minimum(log_eta, np.log(max_viscosity))
+        return log_eta
+
+    def visc(self, alpha, temperature, max_viscosity: Optional[float] = None) -> np.ndarray:
+        """Viscosity (Pa.s), inf from the gel point on unless clamped to `max_viscosity`."""
+        return np.exp(self.log_visc(alpha, temperature, max_viscosity))
+
+
+AROCY_L_10 = CastroMacosko(
+    alpha_g=0.64,
+    c1=2.32,
+    c2=1.4,
+    T_b=5160.39,
+    A=3.32e-8
+)
@@ -0,0 +1,181 @@
+"""
+Fit the Castro-Macosko parameters (alpha_g, c1, c2, T_b, A) to isothermal
+rheometer measurements of viscosity against time.
+
+Time is turned into degree of cure with the isothermal cure model, the fit
+is a least squares problem in ln(eta) over all points of all temperatures:
+
+    ln eta = ln A + T_b / T + (c1 + c2 alpha) * L(alpha, alpha_g),
+    L = ln(alpha_g / (alpha_g - alpha))
+
+For a fixed alpha_g the model is linear in (ln A, T_b, c1, c2), so the
+starting point comes from linear solves over a scan of alpha_g; all five
+parameters are then refined together with an analytic Jacobian.
+
+    python -m rheokinetics.viscosity_fit
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy.optimize import least_squares
+
+from common.cache_dir import CACHE_DIR
+from common.result_store import ResultStore, fingerprint
+from cure_kinetics.kinetics import KineticParameters
+from cure_kinetics.simulation import solve_isothermal
+from rheokinetics.viscosity import CastroMacosko
+
+N_ALPHA_G_SCAN = 60
+SOLVER_SETTINGS = dict(method="trf", ftol=1e-12, xtol=1e-12, gtol=1e-12, max_nfev=2000)
+
+# Part of the key of stored fits, bump when the stored record changes.
+FIT_RECORD_VERSION = 2
+
+
+class ViscosityData:
+    """
+    All measurements of a fit as flat arrays: degree of cure, 1/T (1/K) and
+    ln(eta) of every point.
+    """
+    def __init__(self, measurements: Dict[float, Tuple[np.ndarray, np.ndarray]], kinetic_parameters: KineticParameters):
+        alpha, inv_T, log_eta = [], [], []
+        for T_C, (time, viscosity) in measurements.items():
+            time = np.asarray(time, dtype=float)
+            alpha.append(solve_isothermal(kinetic_parameters, T_C).alpha(time))
+            inv_T.append(np.full(len(time), 1.0 / (T_C + 273.15)))
+            log_eta.append(np.log(np.asarray(viscosity, dtype=float)))
+        self.alpha = np.concatenate(alpha)
+        self.inv_T = np.concatenate(inv_T)
+        self.log_eta = np.concatenate(log_eta)
+
+    def divergence(self, alpha_g: float) -> np.ndarray:
+        """L = ln(alpha_g / (alpha_g - alpha)) at every point."""
+        return -np.log1p(-self.alpha / alpha_g)
+
+    def residuals(self, x) -> np.ndarray:
+        log_A, T_b, alpha_g, c1, c2 = x
+        return log_A + T_b * self.inv_T + (c1 + c2 * self.alpha) * self.divergence(alpha_g) - self.log_eta
+
+    def jacobian(self, x) -> np.ndarray:
+        log_A, T_b, alpha_g, c1, c2 = x
+        L = self.divergence(alpha_g)
+        dL_dalpha_g = -self.alpha / (alpha_g * (alpha_g - self.alpha))
+        return np.column_stack([
+            np.ones_like(self.alpha),                       # d/d ln A
+            self.inv_T,                                     # d/d T_b
+            (c1 + c2 * self.alpha) * dL_dalpha_g,           # d/d alpha_g
+            L,                                              # d/d c1
+            self.alpha * L,                                 # d/d c2
+        ])
+
+    def linear_fit(self, alpha_g: float) -> Tuple[np.ndarray, float]:
+        """(ln A, T_b, c1, c2) minimizing the residuals at fixed alpha_g, and the residual sum of squares."""
+        L = self.divergence(alpha_g)
+        design = np.column_stack([np.ones_like(self.alpha), self.inv_T, L, self.alpha * L])
+        coefficients, *_ = np.linalg.lstsq(design, self.log_eta, rcond=None)
+        return coefficients, float(np.sum((design @ coefficients - self.log_eta) ** 2))
+
+
+class CastroMacoskoFit(NamedTuple):
+    """
+    A fitted model with the diagnostics of its fit: root mean square of the
+    ln(eta) residuals over the `n_points` measurements, and the final cost,
+    number of evaluations, status and message of least_squares.
+    """
+    model: CastroMacosko
+    rms: float
+    n_points: int
+    cost: float
+    nfev: int
+    status: int
+    message: str
+
+    def to_record(self) -> dict:
+        model = self.model
+        return dict(self._asdict(), model=dict(alpha_g=model.alpha_g, c1=model.c1, c2=model.c2, T_b=model.T_b,
+                                               A=model.A))
+
+    @classmethod
+    def from_record(cls, record: dict) -> 'CastroMacoskoFit':
+        return cls(**dict(record, model=CastroMacosko(**record["model"])))
+
+
+def fit_castro_macosko(measurements: Dict[float, Tuple[np.ndarray, np.ndarray]],
+                       kinetic_parameters: KineticParameters, store: Optional[ResultStore] = None,
+                       **solver_settings) -> CastroMacoskoFit:
+    """
+    Fit a CastroMacosko model to `measurements`, temperature (°C) ->
+    (time (s), viscosity (Pa.s)) of isothermal runs starting from uncured
+    resin, with `kinetic_parameters` linking time to degree of cure.
+
+    alpha_g is kept above the largest measured degree of cure. With a
+    `store`, the fit and its diagnostics are kept under the fingerprint of
+    the measurements, kinetic parameters and solver settings.
+    """
+    if store is None:
+        return _fit(measurements, kinetic_parameters, solver_settings)
+    key = fingerprint("castro_macosko", FIT_RECORD_VERSION,
+                      {float(T): [np.asarray(t, dtype=float), np.asarray(v, dtype=float)]
+                       for T, (t, v) in measurements.items()},
+                      [float(v) for v in kinetic_parameters], SOLVER_SETTINGS, solver_settings)
+    record = store.get_or_compute(key, lambda: _fit(measurements, kinetic_parameters, solver_settings).to_record())
+    return CastroMacoskoFit.from_record(record)
+
+
+def _fit(measurements: Dict[float, Tuple[np.ndarray, np.ndarray]], kinetic_parameters: KineticParameters,
+         solver_settings: dict) -> CastroMacoskoFit:
+    data = ViscosityData(measurements, kinetic_parameters)
+    alpha_max = float(np.max(data.alpha))
+    lower_alpha_g = alpha_max + 1e-6 * (1.0 - alpha_max)
+
+    # start from the best alpha_g of a scan, with the exact linear solution for the other parameters
+    scan = lower_alpha_g + (1.0 - lower_alpha_g) * np.geomspace(1e-4, 1.0, N_ALPHA_G_SCAN)
+    fits = [data.linear_fit(alpha_g) for alpha_g in scan]
+    best = int(np.argmin([rss for _, rss in fits]))
+    log_A, T_b, c1, c2 = fits[best][0]
+    x0 = [log_A, T_b, scan[best], c1, c2]
+
+    lower = [-np.inf, -np.inf, lower_alpha_g, -np.inf, -np.inf]
+    upper = [np.inf, np.inf, 1.0, np.inf, np.inf]
+    result = least_squares(data.residuals, np.clip(x0, lower, upper), jac=data.jacobian, bounds=(lower, upper),
+                           x_scale=[1.0, 1e3, 0.1, 1.0, 1.0], **dict(SOLVER_SETTINGS, **solver_settings))
+
+    log_A, T_b, alpha_g, c1, c2 = (float(v) for v in result.x)
+    model = CastroMacosko(alpha_g=alpha_g, c1=c1, c2=c2, T_b=T_b, A=float(np.exp(log_A)))
+    n_points = len(data.log_eta)
+    return CastroMacoskoFit(model, float(np.sqrt(2.0 * result.cost / n_points)), n_points, float(result.cost),
+                            int(result.nfev), int(result.status), str(result.message))
+
+
+if __name__ == "__main__":
+    import time
+
+    from cure_kinetics.dataset import default_study
+    from rheokinetics.viscosity import AROCY_L_10
+
+    # no rheometer runs are shipped: synthetic measurements from AROCY_L_10 with 3 % noise,
+    # sampled until the viscosity reaches 1000 Pa.s
+    kinetic_parameters = default_study().kinetic_parameters
+    rng = np.random.default_rng(0)
+    measurements = {}
+    for T_C in (120, 150, 180):
+        solution = solve_isothermal(kinetic_parameters, T_C)
+        alpha = np.linspace(0.0, 0.6, 300)
+        t = solution.time_to(alpha)
+        eta = AROCY_L_10.visc(alpha, T_C + 273.15)
+        keep = eta < 1e3
+        measurements[T_C] = (t[keep], eta[keep] * np.exp(rng.normal(0.0, 0.03, keep.sum())))
+
+    start = time.perf_counter()
+    fit = fit_castro_macosko(measurements, kinetic_parameters)
+    print(f"fitted in {(time.perf_counter() - start) * 1e3:.0f} ms ({fit.nfev} evaluations), "
+          f"rms of ln(eta) {fit.rms:.4f}")
+    print(f"{'':>8} {'true':>12} {'fitted':>12}")
+    for name in ("alpha_g", "c1", "c2", "T_b", "A"):
+        print(f"{name:>8} {getattr(AROCY_L_10, name):>12.5g} {getattr(fit.model, name):>12.5g}")
+
+    store = ResultStore(CACHE_DIR / "castro_macosko")
+    fit_castro_macosko(measurements, kinetic_parameters, store=store)
+    start = time.perf_counter()
+    stored = fit_castro_macosko(measurements, kinetic_parameters, store=ResultStore(CACHE_DIR / "castro_macosko"))
+    print(f"cached fit loaded in {(time.perf_counter() - start) * 1e3:.1f} ms, rms of ln(eta) {stored.rms:.4f}")
@@ -0,0 +1,26 @@
+import pytest
+
+from cure_kinetics.batch import read_manifest, run_batch
+
+MANIFEST_HEADER = "file,temperature,sample_weight,start_time,end_time\n"
+
+
+def test_txt_run_without_sample_weight_names_the_row(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(MANIFEST_HEADER + "run_120.txt,120,13.7,4.0,\nrun_150.txt,150,,2.3,\n")
+    with pytest.raises(ValueError, match="line 3: run_150.txt"):
+        read_manifest(manifest)
+
+
+def test_manifest_rows_become_datasets(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(MANIFEST_HEADER + "run_120.txt,120,13.7,4.0,\n")
+    [dataset] = read_manifest(manifest)
+    assert (dataset.path, dataset.temperature, dataset.sample_weight) == (tmp_path / "run_120.txt", 120.0, 13.7)
+    assert (dataset.start_time, dataset.end_time) == (4.0, None)
+
+
+def test_empty_manifest_gives_no_rows(tmp_path):
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(MANIFEST_HEADER)
+    assert run_batch(read_manifest(manifest), max_workers=2) == []
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from common.cache_dir import CACHE_DIR
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def cache_dir_with(**environment) -> Path:
+    env = {name: value for name, value in os.environ.items() if name not in ("PCM_CACHE_DIR", "XDG_CACHE_HOME")}
+    env.update(environment)
+    output = subprocess.run([sys.executable, "-c", "from common.cache_dir import CACHE_DIR; print(CACHE_DIR)"],
+                            cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+    return Path(output.strip())
+
+
+def test_tests_use_their_own_cache():
+    assert CACHE_DIR == Path(os.environ["PCM_CACHE_DIR"])
+    assert ROOT not in CACHE_DIR.parents
+
+
+def test_cache_dir_is_configurable_and_outside_the_tree(tmp_path):
+    assert cache_dir_with(PCM_CACHE_DIR=str(tmp_path)) == tmp_path
+    assert cache_dir_with(XDG_CACHE_HOME=str(tmp_path)) == tmp_path / "pcm"
+    assert ROOT not in cache_dir_with().parents
@@ -0,0 +1,73 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from common import column_cache
+from common.column_cache import load_columns
+from common.table_io import read_sheet_to_dict
+
+SOURCE = Path(__file__).parent.parent / "cure_kinetics" / "resources" / "isothermal_150.txt"
+COLUMNS = ["Time", "Unsubtracted", "Baseline"]
+
+
+def _load_last_time(cache_dir):
+    return float(load_columns(SOURCE, columns=COLUMNS, cache_dir=cache_dir)["Time"][-1])
+
+
+def test_cached_columns_match_parsed(tmp_path):
+    parsed = read_sheet_to_dict(SOURCE, columns=COLUMNS)
+    for _ in range(2):  # cold, then from the cache
+        cached = load_columns(SOURCE, columns=COLUMNS, cache_dir=tmp_path)
+        for name in COLUMNS:
+            np.testing.assert_array_equal(cached[name], parsed[name])
+
+
+def test_concurrent_cold_loads(tmp_path):
+    # the access pattern of the batch and sweep worker pools
+    for i in range(3):
+        cache_dir = tmp_path / str(i)
+        with ProcessPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(_load_last_time, [cache_dir] * 8))
+        assert len(set(results)) == 1
+
+
+def test_changed_source_replaces_entry(tmp_path):
+    source = tmp_path / "run.txt"
+    lines = SOURCE.read_bytes().splitlines(keepends=True)
+    source.write_bytes(b"".join(lines[:1001]))
+    cache_dir = tmp_path / "cache"
+    assert len(load_columns(source, columns=COLUMNS, cache_dir=cache_dir)["Time"]) == 1000
+
+    source.write_bytes(b"".join(lines[:501]))
+    os.utime(source, ns=(0, 0))
+    assert len(load_columns(source, columns=COLUMNS, cache_dir=cache_dir)["Time"]) == 500
+
+
+def test_touched_source_replaces_meta_in_one_step(tmp_path, monkeypatch):
+    source = tmp_path / "run.txt"
+    source.write_bytes(SOURCE.read_bytes())
+    cache_dir = tmp_path / "cache"
+    load_columns(source, columns=COLUMNS, cache_dir=cache_dir)
+    (entry,) = cache_dir.iterdir()
+    files = sorted(p.name for p in entry.iterdir())
+
+    os.utime(source, ns=(0, 0))
+    replaced = []
+
+    def replace(src, dst):
+        replaced.append(Path(dst).name)
+        os.rename(src, dst)
+
+    monkeypatch.setattr(column_cache.os, "replace", replace)
+    load_columns(source, columns=COLUMNS, cache_dir=cache_dir)
+    assert replaced == ["meta.json"]
+    assert sorted(p.name for p in entry.iterdir()) == files
+    assert json.loads((entry / "meta.json").read_text())["mtime_ns"] == 0
+
+    # the refreshed entry is used without hashing the source again
+    monkeypatch.setattr(column_cache, "file_hash", None)
+    np.testing.assert_array_equal(load_columns(source, columns=COLUMNS, cache_dir=cache_dir)["Time"],
+                                  read_sheet_to_dict(SOURCE, columns=COLUMNS)["Time"])
@@ -0,0 +1,42 @@
+import numpy as np
+
+from cure_kinetics.kinetics import KineticParameters
+from cure_kinetics.simulation import TemperatureProgram, solve_isothermal
+from rheokinetics.cure_viscosity import gel_times, simulate_cure_viscosity
+from rheokinetics.viscosity import AROCY_L_10
+
+PARAMS = KineticParameters(A1=10 ** 5.2, E1=6.8e4, A2=10 ** 4.4, E2=5.6e4, m=1.06, n=1.97)
+T_LST = np.linspace(0, 4 * 3600, 2001)
+
+
+def test_gel_times_interpolate_between_samples():
+    time = np.linspace(0, 10, 11)
+    alpha = np.stack([0.1 * time, 0.05 * time, 0.01 * time])
+    np.testing.assert_allclose(gel_times(time, alpha, 0.64), [6.4, np.inf, np.inf])
+    np.testing.assert_allclose(gel_times(time, alpha, 0.45), [4.5, 9.0, np.inf])
+    # reached at the first sample
+    assert gel_times(time, np.full_like(time, 0.5), 0.45)[0] == 0.0
+
+
+def test_isothermal_gel_time_matches_the_solver():
+    history = simulate_cure_viscosity(PARAMS, TemperatureProgram(150).hold(240), T_LST)
+    assert history.alpha.shape == history.viscosity.shape == T_LST.shape
+    expected = solve_isothermal(PARAMS, 150).time_to(AROCY_L_10.alpha_g)
+    np.testing.assert_allclose(history.gel_time, expected, rtol=1e-3)
+    gelled = T_LST >= history.gel_time
+    assert np.all(np.isinf(history.viscosity[gelled]))
+    assert np.all(np.isfinite(history.viscosity[~gelled]))
+    assert np.all(np.diff(np.log(history.viscosity[~gelled])) > 0)
+
+
+def test_batch_matches_single_programs():
+    cycles = [TemperatureProgram(100).hold(10).ramp(T, 5).hold(240) for T in (140, 160, 180)]
+    batch = simulate_cure_viscosity(PARAMS, cycles, T_LST, max_viscosity=1e3)
+    assert batch.viscosity.shape == (3, len(T_LST))
+    assert np.all(batch.viscosity <= 1e3 * (1 + 1e-12))
+    assert np.all(np.diff(batch.gel_time) < 0)
+    # steps are placed for the whole batch, so rows agree to the integration accuracy
+    for i, cycle in enumerate(cycles):
+        single = simulate_cure_viscosity(PARAMS, cycle, T_LST, max_viscosity=1e3)
+        np.testing.assert_allclose(single.alpha, batch.alpha[i], rtol=1e-3, atol=1e-6)
+        np.testing.assert_allclose(single.gel_time, batch.gel_time[i], rtol=1e-3)
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from cure_kinetics.dsc_workbook import load_dsc_export, read_dsc_workbook, read_sample_weight
+
+HEADER = ("Time", "Unsubtracted", "Baseline", "Program Temperature")
+
+
+def write_workbook(path, weight_rows=(("Sample Weight:", "13.700 mg"),)):
+    """A small workbook laid out like the Pyris exports: metadata, two method steps, a calibration table."""
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Sheet1"
+    for row in weight_rows:
+        sheet.append(row)
+    sheet.append(["1) Hold for 1.0 min at 25.00°C"])
+    sheet.append([None, *HEADER])
+    for i in range(5):
+        sheet.append([None, 0.1 * i, -1.0, -1.1, 25.0])
+    sheet.append(["2) Sapphire DSC Isothermal"])
+    for i in range(10):
+        sheet.append([None, 1.0 + 0.1 * i, 2.0 + i, 0.5, 120.0])
+    sheet.append(["Calibration"])
+    sheet.append([None, 1.0, 2.0, 3.0, 4.0])
+    workbook.create_sheet("README").append(["not the data"])
+    workbook.save(path)
+    return path
+
+
+def test_last_method_step_is_read(tmp_path):
+    data = read_dsc_workbook(write_workbook(tmp_path / "run.xlsx"))
+    assert tuple(data) == HEADER
+    np.testing.assert_allclose(data["Time"], 1.0 + 0.1 * np.arange(10))
+    np.testing.assert_allclose(data["Unsubtracted"], 2.0 + np.arange(10))
+    assert read_dsc_workbook(tmp_path / "run.xlsx", columns=["Baseline"])["Baseline"].shape == (10,)
+    with pytest.raises(KeyError):
+        read_dsc_workbook(tmp_path / "run.xlsx", columns=["Heat Flow"])
+
+
+def test_sample_weight(tmp_path):
+    assert read_sample_weight(write_workbook(tmp_path / "text.xlsx")) == 13.7
+    display = (("Display Weight:", 12.5), ("Sample Weight:", "13.700 mg"))
+    assert read_sample_weight(write_workbook(tmp_path / "display.xlsx", display)) == 12.5
+    with pytest.raises(ValueError):
+        read_sample_weight(write_workbook(tmp_path / "none.xlsx", ()))
+
+
+def test_export_goes_through_the_column_cache(tmp_path, monkeypatch):
+    path = write_workbook(tmp_path / "run.xlsx")
+    first = load_dsc_export(path, columns=["Time", "Unsubtracted"])
+
+    def no_workbook(*args, **kwargs):
+        raise AssertionError("the workbook was read again")
+
+    monkeypatch.setattr("openpyxl.load_workbook", no_workbook)
+    second = load_dsc_export(path, columns=["Time", "Unsubtracted"])
+    assert tuple(second) == ("Time", "Unsubtracted")
+    np.testing.assert_array_equal(second["Unsubtracted"], first["Unsubtracted"])
+
+
+def test_shipped_workbook_matches_txt_export():
+    resources = Path(__file__).resolve().parent.parent / "cure_kinetics" / "resources"
+    columns = ["Time", "Unsubtracted", "Baseline"]
+    workbook = load_dsc_export(resources / "LME_0_13_120.xlsx", columns=columns)
+    export = load_dsc_export(resources / "isothermal_120.txt", columns=columns)
+    for column in columns:
+        np.testing.assert_allclose(workbook[column], export[column], rtol=1e-14, atol=0)
+    assert read_sample_weight(resources / "LME_0_13_120.xlsx") > 0
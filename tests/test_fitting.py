@@ -0,0 +1,50 @@
+import numpy as np
+
+from cure_kinetics.fitting import StackedRateModel, fit_autocatalytic, fit_joint
+from cure_kinetics.kinetics import da_dt
+
+X = np.array([5.2, 6.8e4, 4.4, 5.6e4, 1.06, 1.97])  # log10(A1), E1, log10(A2), E2, m, n
+A1, E1 = 10 ** X[0], X[1]
+TEMPERATURES = (393.15, 423.15, 453.15)
+ALPHA = np.linspace(0.05, 0.95, 50)
+
+
+def rates(x, noise: float = 0.0):
+    rng = np.random.default_rng(0)
+    log_A1, E1, log_A2, E2, m, n = x
+    return {T: da_dt(10 ** log_A1, E1, 10 ** log_A2, E2, m, n, ALPHA, T) * (1 + noise * rng.normal(size=len(ALPHA)))
+            for T in TEMPERATURES}
+
+
+def test_autocatalytic_fit_recovers_parameters():
+    result = fit_autocatalytic(A1, E1, rates(X), ALPHA)
+    np.testing.assert_allclose(result.x, X[2:], rtol=1e-6)
+
+
+def test_analytic_jacobian_matches_finite_differences():
+    data = rates(X, noise=0.05)
+    analytic = fit_autocatalytic(A1, E1, data, ALPHA)
+    numeric = fit_autocatalytic(A1, E1, data, ALPHA, jac="2-point")
+    np.testing.assert_allclose(analytic.x, numeric.x, rtol=1e-5)
+    np.testing.assert_allclose(analytic.jac, numeric.jac, rtol=1e-4, atol=1e-6 * np.abs(analytic.jac).max())
+
+
+def test_stacked_residuals_vanish_at_true_parameters():
+    np.testing.assert_allclose(StackedRateModel(rates(X), ALPHA).residuals(X), 0.0, atol=1e-15)
+
+
+def test_stacked_jacobian_matches_central_differences():
+    model = StackedRateModel(rates(X, noise=0.05), ALPHA)
+    x = X * 1.01
+    step = 1e-6 * np.maximum(np.abs(x), 1.0)
+    numeric = np.column_stack([(model.residuals(x + dx) - model.residuals(x - dx)) / (2 * dx[i])
+                               for i, dx in enumerate(np.diag(step))])
+    np.testing.assert_allclose(model.jacobian(x), numeric, rtol=1e-6, atol=1e-12 * np.abs(numeric).max())
+
+
+def test_joint_multistart_finds_parameters_without_a_start_guess():
+    result = fit_joint(rates(X), ALPHA, n_starts=8, max_workers=1)
+    assert result.starts.shape == (8,)
+    np.testing.assert_allclose(result.x, X, rtol=1e-5)
+    # with the true parameters as an extra start, it is screened too
+    assert fit_joint(rates(X), ALPHA, x0=X, n_starts=2, max_workers=1).starts.shape == (3,)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from rheokinetics.flow_front import Mould1D, fill_constant_flow, fill_constant_pressure
+
+K, PHI, AREA, LENGTH = 3e-12, 0.5, 5e-4, 1.0   # m^2, -, m^2, m
+ETA, PRESSURE = 0.1, 5e5                      # Pa.s, Pa
+MOULD = Mould1D(np.linspace(0.0, LENGTH, 2001), K, PHI, AREA)
+FILL_TIME = PHI * ETA * LENGTH ** 2 / (2 * K * PRESSURE)
+
+
+def test_constant_pressure_closed_form():
+    t_lst = np.linspace(0.0, 1.5 * FILL_TIME, 3001)
+    result = fill_constant_pressure(MOULD, PRESSURE, ETA, t_lst)
+    front = np.minimum(np.sqrt(2 * K * PRESSURE * t_lst / (PHI * ETA)), LENGTH)
+    # linear interpolation between nodes 0.5 mm apart
+    np.testing.assert_allclose(result.front, front, rtol=1e-6, atol=2e-6)
+    np.testing.assert_allclose(result.fill_time, FILL_TIME, rtol=1e-6)
+    filling = (t_lst > 0) & (t_lst < FILL_TIME)
+    flow_rate = PRESSURE * K * AREA / (ETA * result.front[filling])
+    np.testing.assert_allclose(result.flow_rate[filling], flow_rate, rtol=1e-9)
+
+
+def test_viscosity_rising_in_time():
+    # eta = ETA (1 + t / tau) gives int dt / eta = tau / ETA ln(1 + t / tau)
+    tau = FILL_TIME
+    t_lst = np.linspace(0.0, 2 * FILL_TIME, 20001)
+    result = fill_constant_pressure(MOULD, PRESSURE, lambda t: ETA * (1 + t / tau), t_lst)
+    front = np.sqrt(2 * K * PRESSURE * tau * np.log1p(t_lst / tau) / (PHI * ETA))
+    np.testing.assert_allclose(result.front, np.minimum(front, LENGTH), rtol=1e-5, atol=2e-6)
+    expected_fill = tau * np.expm1(LENGTH ** 2 * PHI * ETA / (2 * K * PRESSURE * tau))
+    np.testing.assert_allclose(result.fill_time, expected_fill, rtol=1e-4)
+
+
+def test_gelled_resin_stops_the_front():
+    t_lst = np.linspace(0.0, 2 * FILL_TIME, 2001)
+    gel_time = 0.25 * FILL_TIME
+    eta = np.where(t_lst < gel_time, ETA, np.inf)
+    result = fill_constant_pressure(MOULD, PRESSURE, eta, t_lst)
+    assert result.fill_time == np.inf
+    # the trapezoid rule averages the fluidity across the gel point, half a time step short
+    np.testing.assert_allclose(result.front[-1], 0.5 * LENGTH, rtol=2e-3)
+    assert np.all(result.flow_rate[t_lst > gel_time] == 0.0)
+
+
+def test_constant_flow_closed_form():
+    flow_rate = PHI * AREA * LENGTH / FILL_TIME
+    t_lst = np.linspace(0.0, 1.2 * FILL_TIME, 1001)
+    result = fill_constant_flow(MOULD, flow_rate, ETA, t_lst)
+    front = np.minimum(flow_rate * t_lst / (PHI * AREA), LENGTH)
+    np.testing.assert_allclose(result.front, front, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(result.fill_time, FILL_TIME, rtol=1e-9)
+    filling = t_lst < FILL_TIME
+    np.testing.assert_allclose(result.pressure[filling], flow_rate * ETA * front[filling] / (AREA * K), rtol=1e-9)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from cure_kinetics.integration import cumulative_integral, integrate_heat_flow_rate
+
+
+def loop_trapezoid(heat_flow_rate, time):
+    """The original per-sample loop."""
+    total_heat_released = [0.0]
+    for i in range(1, len(time)):
+        dt = (time[i] - time[i - 1])
+        avg_heat_flow = (heat_flow_rate[i] + heat_flow_rate[i - 1]) / 2
+        total_heat_released.append(total_heat_released[-1] + avg_heat_flow * dt)
+    return total_heat_released
+
+
+def test_trapezoid_matches_loop_on_uneven_grid():
+    rng = np.random.default_rng(0)
+    time = np.cumsum(rng.uniform(0.5, 1.5, 2000))
+    heat_flow = np.exp(-((time - 800.0) / 200.0) ** 2) + 0.01 * rng.normal(size=len(time))
+    np.testing.assert_allclose(integrate_heat_flow_rate(heat_flow, time), loop_trapezoid(heat_flow, time),
+                               rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("method, rtol", [("trapezoid", 1e-5), ("simpson", 1e-9)])
+def test_closed_form(method, rtol):
+    x = np.linspace(0.0, np.pi, 1001)
+    np.testing.assert_allclose(cumulative_integral(np.sin(x), x, method=method), 1.0 - np.cos(x), rtol=rtol, atol=rtol)
+
+
+def test_stacked_runs_along_axis():
+    x = np.linspace(0.0, 2.0, 201)
+    y = np.stack([x, x ** 2, np.exp(x)], axis=0)
+    stacked = cumulative_integral(y.T, x, axis=0)
+    for row, column in zip(y, stacked.T):
+        np.testing.assert_allclose(column, cumulative_integral(row, x), rtol=1e-15)
+    np.testing.assert_allclose(cumulative_integral(y, dx=0.01), cumulative_integral(y, x), rtol=1e-12)
+
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        cumulative_integral(np.ones(3), method="midpoint")
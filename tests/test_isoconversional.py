@@ -0,0 +1,38 @@
+import numpy as np
+
+from cure_kinetics.isoconversional import friedman, runs_on_alpha_grid, study_runs, vyazovkin
+from cure_kinetics.dataset import default_study
+from cure_kinetics.resources.constants import R
+
+E = 65e3  # J/mol
+A = 1e6  # 1/s
+
+
+def single_step_runs(temperatures_C=(120, 150, 180), alpha_vals=np.linspace(0.05, 0.95, 91)):
+    """First-order isothermal runs, a = 1 - exp(-k t), with one known activation energy."""
+    fracs, rates, times = [], [], []
+    for T_C in temperatures_C:
+        k = A * np.exp(-E / (R * (T_C + 273.15)))
+        t = np.linspace(0.0, 8.0 / k, 20001)
+        alpha = 1.0 - np.exp(-k * t)
+        fracs.append(alpha)
+        rates.append(k * (1.0 - alpha))
+        times.append(t)
+    return runs_on_alpha_grid(fracs, rates, times, np.array(temperatures_C) + 273.15, alpha_vals)
+
+
+def test_friedman_recovers_single_step_energy():
+    E_friedman, _ = friedman(single_step_runs())
+    np.testing.assert_allclose(E_friedman, E, rtol=1e-3)
+
+
+def test_vyazovkin_recovers_single_step_energy_including_first_step():
+    E_vyazovkin = vyazovkin(single_step_runs())
+    np.testing.assert_allclose(E_vyazovkin, E, rtol=1e-3)
+
+
+def test_study_runs_start_at_time_zero():
+    runs = study_runs(default_study())
+    E_vyazovkin = vyazovkin(runs)
+    # the first step is timed from each run's own start, not from the start of the export
+    assert abs(E_vyazovkin[0] - E_vyazovkin[1]) < 0.2 * E_vyazovkin[1]
@@ -0,0 +1,34 @@
+import numpy as np
+
+from cure_kinetics.kinetics import KineticParameters
+from cure_kinetics.lookup import CureLookupTable, accuracy_report, lookup_table
+from cure_kinetics.simulation import solve_isothermal
+
+PARAMS = KineticParameters(A1=8.13e4, E1=67.9e3, A2=2.66e4, E2=56.3e3, m=1.06, n=1.97)
+
+
+def test_lookups_match_isothermal_solver():
+    report = accuracy_report(CureLookupTable.build(PARAMS), n_temperatures=10)
+    assert report["max_alpha_error"] < 1e-4
+    assert report["max_relative_time_error"] < 1e-4
+
+
+def test_broadcasting_and_edges():
+    table = CureLookupTable.build(PARAMS)
+    T_C = np.array([[100.0], [150.0]])
+    alpha = table.alpha(T_C, np.array([0.0, 1000.0, 1e9]))
+    assert alpha.shape == (2, 3)
+    np.testing.assert_allclose(alpha[:, 0], 0.0)
+    np.testing.assert_allclose(alpha[:, 2], 1.0, atol=1e-3)
+    np.testing.assert_allclose(alpha[1, 1], solve_isothermal(PARAMS, 150.0).alpha(1000.0), atol=1e-4)
+    np.testing.assert_array_equal(table.time_to(150.0, [0.0, 1.0]), [0.0, np.inf])
+    assert np.isnan(table.alpha(250.0, 100.0)) and np.isnan(table.time_to(50.0, 0.5))
+
+
+def test_stored_table_is_reused(tmp_path):
+    built = lookup_table(PARAMS, tmp_path, n_temperatures=21)
+    assert len(list(tmp_path.glob("*.npz"))) == 1
+    loaded = lookup_table(PARAMS, tmp_path, n_temperatures=21)
+    np.testing.assert_array_equal(loaded.ln_time, built.ln_time)
+    assert loaded.params == built.params
+    assert lookup_table(PARAMS, tmp_path, n_temperatures=31).ln_time.shape[0] == 31
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+from rheokinetics.mould_filling import GROWTH, MouldGrid, _PressureSolver, simulate_filling
+
+K, PHI, ETA, PRESSURE = 3e-12, 0.5, 0.03, 1e6   # m^2, -, Pa.s, Pa
+N_COLS = 200
+
+
+def strip():
+    grid = MouldGrid(np.full((10, N_COLS), 2e-3), 1.0 / N_COLS, permeability=K, porosity=PHI)
+    inlets = np.zeros(grid.shape, dtype=bool)
+    inlets[:, 0] = True
+    return grid, inlets
+
+
+def exact_fill_time(x):
+    """1-D fill time of a straight front at x (m) from the centre of the inlet cells."""
+    return PHI * ETA * x ** 2 / (2 * K * PRESSURE)
+
+
+@pytest.mark.parametrize("growth, rtol", [(0.0, 1e-3), (GROWTH, 2e-2)])
+def test_strip_matches_1d_darcy(growth, rtol):
+    grid, inlets = strip()
+    result = simulate_filling(grid, inlets, PRESSURE, ETA, growth=growth)
+    np.testing.assert_allclose(result.fill_time, exact_fill_time(1.0 - 0.5 / N_COLS), rtol=rtol)
+    # a cell is filled when the front reaches its far side
+    x = (np.arange(N_COLS // 4, N_COLS) + 1.0) / N_COLS - 0.5 / N_COLS
+    np.testing.assert_allclose(result.cell_fill_time[5, N_COLS // 4:], exact_fill_time(x), rtol=5 * rtol)
+    assert not result.dry_spots.any()
+
+
+def test_corners_without_vent_become_dry_spots():
+    grid = MouldGrid(np.full((41, 41), 2e-3), 0.01, permeability=K, porosity=PHI)
+    inlets = grid.cells([(20, 20)])
+    vents = grid.cells([(0, 0)])
+    result = simulate_filling(grid, inlets, PRESSURE, ETA, vents=vents)
+    dry = result.dry_spots
+    assert dry[40, 40] and dry[0, 40] and dry[40, 0] and not dry[0, 0]
+    assert np.isfinite(result.cell_fill_time[0, 0]) and np.isfinite(result.fill_time)
+    assert np.all(np.isinf(result.cell_fill_time[dry]))
+
+
+def test_gelled_resin_stops_the_fill():
+    grid, inlets = strip()
+    gel_time = 0.25 * exact_fill_time(1.0)
+    result = simulate_filling(grid, inlets, PRESSURE, lambda t: ETA if t < gel_time else np.inf)
+    assert result.fill_time == np.inf
+    filled = np.isfinite(result.cell_fill_time[5])
+    # the front stops near half way, where it is at a quarter of the fill time
+    assert 0.4 < filled.mean() < 0.6
+
+
+def test_pressure_of_the_filled_cells_matches_a_direct_solve():
+    rng = np.random.default_rng(0)
+    thickness = np.full((60, 90), 2e-3)
+    thickness[20:35, 40:55] = np.nan
+    grid = MouldGrid(thickness, 0.01, permeability=K * rng.uniform(0.5, 2.0, thickness.shape), porosity=PHI)
+    W = grid.transmissibility
+    rows, cols = np.indices(grid.shape)
+    inlet = (cols == 0).ravel() & grid.mask.ravel()
+    full = (np.hypot(rows - 30, cols) < 70).ravel() & grid.mask.ravel()
+    front = ~full & (W @ full.astype(float) > 0)
+    unknown = full & ~inlet
+    dirichlet_pressure = np.where(inlet, PRESSURE, 0.0)
+    diagonal = W @ (full | front).astype(float)
+
+    pressure = _PressureSolver(grid, rtol=1e-10).solve(unknown, dirichlet_pressure, diagonal, np.zeros(W.shape[0]))
+    cells = np.flatnonzero(unknown)
+    A = sparse.diags(diagonal[cells]) - W[cells][:, cells]
+    exact = spsolve(A.tocsc(), (W @ dirichlet_pressure)[cells])
+    np.testing.assert_allclose(pressure[cells], exact, rtol=1e-8)
+    assert np.all(pressure[~unknown] == 0.0)
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from scipy.stats import spearmanr
+
+from rheokinetics.mould_filling import MouldGrid, simulate_filling
+from rheokinetics.placement import LayoutScore, PlacementSurrogate, _rank, candidate_cells, optimize_placement
+
+K, PHI, ETA, PRESSURE = 3e-12, 0.5, 0.1, 1e6   # m^2, -, Pa.s, Pa
+T_LST = np.linspace(0.0, 20 * 3600, 200)
+
+
+def test_rank_prefers_complete_fill_then_fill_time():
+    quick_with_maxima = LayoutScore(600.0, 0.4, (1,), 3)
+    slow_without_maxima = LayoutScore(900.0, 0.5, (2,), 0)
+    gelled = LayoutScore(np.inf, 0.3, (3,), 0)
+    gelled_further = LayoutScore(np.inf, 0.6, (4,), 0)
+    ranked = sorted([gelled_further, slow_without_maxima, gelled, quick_with_maxima], key=_rank)
+    assert ranked == [quick_with_maxima, slow_without_maxima, gelled, gelled_further]
+
+
+def test_surrogate_ranks_layouts_like_the_full_model():
+    n_rows, n_cols = 20, 40
+    thickness = np.full((n_rows, n_cols), 2e-3)
+    thickness[:, n_cols // 2:] = 2.4e-3
+    rows, cols = np.mgrid[:n_rows, :n_cols]
+    thickness[np.hypot(rows - n_rows / 2, cols - n_cols / 2) < 4] = np.nan
+    grid = MouldGrid.from_laminate(thickness, 0.5 / n_cols, areal_weight=0.4, n_layers=5, fibre_density=1800)
+    candidates = candidate_cells(grid, 4)
+    surrogate = PlacementSurrogate(grid, candidates, PRESSURE, ETA, T_LST, max_workers=1)
+
+    rng = np.random.default_rng(0)
+    layouts = [rng.choice(len(candidates), 2, replace=False) for _ in range(20)]
+    estimated = [surrogate.score(layout).fill_time for layout in layouts]
+    simulated = [simulate_filling(grid, grid.cells([candidates[i] for i in layout]), PRESSURE, ETA).fill_time
+                 for layout in layouts]
+    assert spearmanr(estimated, simulated).statistic > 0.6
+
+
+def test_layouts_with_dry_spots_are_rejected_unless_allowed():
+    # a centre inlet with a single vent leaves the other corners dry, with one in each they fill
+    grid = MouldGrid(np.full((21, 21), 2e-3), 0.01, permeability=K, porosity=PHI)
+    settings = dict(n_inlets=1, pressure=PRESSURE, viscosity=ETA, t_lst=T_LST, n_random=1, n_rounds=0,
+                    max_workers=1)
+    with pytest.raises(ValueError, match="without dry spots"):
+        optimize_placement(grid, [(10, 10)], n_vents=1, **settings)
+
+    (layout,) = optimize_placement(grid, [(10, 10)], n_vents=1, allow_dry_spots=True, **settings).layouts
+    assert layout.fill.dry_spots.any()
+
+    (layout,) = optimize_placement(grid, [(10, 10)], n_vents=4, **settings).layouts
+    assert len(layout.vents) == 4 and not layout.fill.dry_spots.any() and np.isfinite(layout.fill.fill_time)
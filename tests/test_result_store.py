@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from common.result_store import ResultStore, fingerprint
+from cure_kinetics.dataset import CureDataset, CureStudy
+from cure_kinetics.resources.constants import END_TIME_120, SAMPLE_WEIGHT_120, SAMPLE_WEIGHT_150, \
+    SAMPLE_WEIGHT_180, START_TIME_120, START_TIME_150
+
+RESOURCES = Path(__file__).resolve().parent.parent / "cure_kinetics" / "resources"
+
+
+def test_fingerprint_is_stable_and_type_aware():
+    assert fingerprint(1.0, "a", [1, 2], {"b": np.arange(3)}) == fingerprint(1.0, "a", [1, 2], {"b": np.arange(3)})
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    distinct = [fingerprint(1), fingerprint(1.0), fingerprint("1"), fingerprint([1]), fingerprint((1,)),
+                fingerprint(np.arange(3)), fingerprint(np.arange(3.0)), fingerprint(np.arange(3).reshape(3, 1)),
+                fingerprint(1, 2), fingerprint([1, 2])]
+    assert len(set(distinct)) == len(distinct)
+    with pytest.raises(TypeError):
+        fingerprint(object())
+
+
+def test_records_persist_across_stores(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"x": [1.0, 2.0]}
+
+    assert ResultStore(tmp_path).get_or_compute("key", compute) == {"x": [1.0, 2.0]}
+    assert ResultStore(tmp_path).get_or_compute("key", compute) == {"x": [1.0, 2.0]}
+    assert len(calls) == 1
+    assert ResultStore(tmp_path).get("other") is None
+    (tmp_path / "broken.json").write_text("{")
+    assert ResultStore(tmp_path).get("broken") is None
+
+
+def study(store, cutoff_freq=0.3):
+    return CureStudy([
+        CureDataset(RESOURCES / "isothermal_120.txt", 120, SAMPLE_WEIGHT_120, start_time=START_TIME_120,
+                    end_time=END_TIME_120, cutoff_freq=cutoff_freq),
+        CureDataset(RESOURCES / "isothermal_150.txt", 150, SAMPLE_WEIGHT_150, start_time=START_TIME_150,
+                    cutoff_freq=cutoff_freq),
+        CureDataset(RESOURCES / "isothermal_180.txt", 180, SAMPLE_WEIGHT_180, cutoff_freq=cutoff_freq),
+    ], parameter_store=store)
+
+
+def test_stored_parameters_are_reused_until_an_input_changes(tmp_path, monkeypatch):
+    fitted = study(ResultStore(tmp_path)).kinetic_parameters
+
+    def no_fit(self):
+        raise AssertionError("refitted")
+
+    monkeypatch.setattr(CureStudy, "_fit_kinetic_parameters", no_fit)
+    assert study(ResultStore(tmp_path)).kinetic_parameters == fitted
+    with pytest.raises(AssertionError, match="refitted"):
+        study(ResultStore(tmp_path), cutoff_freq=0.25).kinetic_parameters
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from cure_kinetics.kinetics import KineticParameters, da_dt
+from cure_kinetics.simulation import (TemperatureProgram, reference_solution, simulate_cure, simulate_cure_ensemble,
+                                      simulate_cure_programs)
+
+PARAMS = KineticParameters(A1=8.13e4, E1=67.9e3, A2=2.66e4, E2=56.3e3, m=1.06, n=1.97)
+# m, n < 1: a^m is not smooth at the start and (1 - a)^n reaches 1 in finite time
+ROUGH_PARAMS = KineticParameters(A1=8.13e4, E1=67.9e3, A2=2.66e4, E2=56.3e3, m=0.6, n=0.8)
+T_LST = np.linspace(0.0, 20000.0, 801)
+
+
+def test_isothermal_dense_output_matches_radau():
+    # the quadrature converges more slowly where a^m is not smooth (m < 1)
+    for params, atol in ((PARAMS, 1e-6), (ROUGH_PARAMS, 2e-5)):
+        for T_C in (120, 180):
+            alpha, _ = simulate_cure(*params, T_C, T_LST)
+            np.testing.assert_allclose(alpha, reference_solution(params, T_C, T_LST), atol=atol)
+
+
+def test_ensemble_matches_single_runs():
+    T_C = np.array([110.0, 130.0, 150.0, 170.0])
+    ensemble = simulate_cure_ensemble(PARAMS, T_C, T_LST)
+    for row, T in zip(ensemble, T_C):
+        np.testing.assert_allclose(row, simulate_cure(*PARAMS, T, T_LST)[0], atol=1e-9)
+
+
+def test_ensemble_unsorted_and_scalar_times():
+    t = np.array([3000.0, 100.0, 20000.0])
+    expected = simulate_cure(*PARAMS, 120, np.sort(t))[0][[1, 0, 2]]
+    np.testing.assert_allclose(simulate_cure_ensemble(PARAMS, 120, t)[0], expected, atol=1e-12)
+    np.testing.assert_allclose(simulate_cure_ensemble(PARAMS, 120, 3000.0), [[expected[0]]], atol=1e-12)
+
+
+def test_constant_temperature_programs_match_radau():
+    for params in (PARAMS, ROUGH_PARAMS):
+        programs = [TemperatureProgram(T_C) for T_C in (120, 180)]
+        alpha, _ = simulate_cure_programs(params, programs, T_LST)
+        for row, T_C in zip(alpha, (120, 180)):
+            np.testing.assert_allclose(row, reference_solution(params, T_C, T_LST), atol=3e-5)
+
+
+def test_cure_cycle_matches_radau():
+    t_lst = np.linspace(0.0, 30000.0, 301)
+    for params, atol in ((PARAMS, 1e-5), (ROUGH_PARAMS, 1e-4)):
+        cycle = TemperatureProgram(20).ramp(120, 2).hold(60).ramp(160, 2).hold(120).ramp(20, 5)
+        expected = solve_ivp(lambda t, y: da_dt(*params, np.clip(y, 0, 1), cycle.temperature(t) + 273.15),
+                             (0, t_lst[-1]), [0.0], method="Radau", t_eval=t_lst,
+                             rtol=1e-10, atol=1e-12, max_step=60).y[0]
+        np.testing.assert_allclose(simulate_cure_programs(params, cycle, t_lst)[0], expected, atol=atol)
+
+
+def test_programs_unsorted_and_scalar_times():
+    cycle = TemperatureProgram(20).ramp(150, 2).hold(120)
+    t = np.array([9000.0, 100.0, 4000.0])
+    expected = simulate_cure_programs(PARAMS, cycle, np.sort(t))[0][[2, 0, 1]]
+    np.testing.assert_allclose(simulate_cure_programs(PARAMS, cycle, t)[0], expected, atol=1e-12)
+    np.testing.assert_allclose(simulate_cure_programs(PARAMS, cycle, 4000.0)[0], [expected[2]], atol=1e-12)
+
+
+def test_alpha_target_truncates_both_paths_alike():
+    alpha, rate = simulate_cure(*PARAMS, 150, T_LST, alpha_target=0.5)
+    program_alpha, program_rate = simulate_cure(*PARAMS, TemperatureProgram(150), T_LST, alpha_target=0.5)
+    assert len(alpha) == len(program_alpha) < len(T_LST)
+    assert alpha[-1] <= 0.5 < simulate_cure(*PARAMS, 150, T_LST)[0][len(alpha)]
+    np.testing.assert_allclose(program_alpha, alpha, atol=1e-6)
+    np.testing.assert_allclose(program_rate, rate, rtol=1e-5)
+
+    for alpha_target in (0.0, 1.0, 1.5, -0.1):
+        for T_C in (150, TemperatureProgram(150)):
+            with pytest.raises(ValueError, match="alpha_target"):
+                simulate_cure(*PARAMS, T_C, T_LST, alpha_target=alpha_target)
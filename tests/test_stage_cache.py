@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from common.stage_cache import StageCache
+
+
+def test_least_recently_used_is_dropped():
+    cache = StageCache(max_entries=2)
+    computed = []
+
+    def compute(key):
+        computed.append(key)
+        return key * 10
+
+    assert cache.get_or_compute(1, lambda: compute(1)) == 10
+    assert cache.get_or_compute(2, lambda: compute(2)) == 20
+    assert cache.get_or_compute(1, lambda: compute(1)) == 10   # 1 is now the most recent
+    cache.get_or_compute(3, lambda: compute(3))                 # drops 2
+    assert len(cache) == 2
+    cache.get_or_compute(1, lambda: compute(1))
+    cache.get_or_compute(2, lambda: compute(2))
+    assert computed == [1, 2, 3, 2]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    cache.clear()
+    assert len(cache) == 0 and (cache.hits, cache.misses) == (0, 0)
+
+
+def test_cached_arrays_are_read_only():
+    cache = StageCache()
+    array = cache.get_or_compute("array", lambda: np.zeros(3))
+    stage = cache.get_or_compute("dict", lambda: {"a": np.ones(2), "nested": {"b": np.ones(2)}, "n": 3})
+    for value in (array, stage["a"], stage["nested"]["b"]):
+        with pytest.raises(ValueError):
+            value[0] = 1.0
+    assert cache.get_or_compute("array", lambda: np.ones(3)) is array
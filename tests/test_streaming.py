@@ -0,0 +1,45 @@
+import numpy as np
+
+from cure_kinetics.dataset import default_study
+from cure_kinetics.streaming import ExportTail, StreamingCure, _running_mean
+
+
+def _analyse(dataset, delta_H_ref, chunk_sizes):
+    rows = ExportTail(dataset.path).read()
+    analysis = StreamingCure(dataset.sample_weight, delta_H_ref, dataset.start_time, dataset.end_time)
+    times, start = [], 0
+    for size in chunk_sizes:
+        times.append(analysis.update({c: column[start:start + size] for c, column in rows.items()}).time)
+        start += size
+    times.append(analysis.update({c: column[start:] for c, column in rows.items()}).time)
+    return analysis, np.concatenate(times)
+
+
+def test_running_mean_matches_recurrence():
+    rng = np.random.default_rng(0)
+    weights = np.r_[1.0, 1.0, rng.uniform(0.0, 1.0, 50), 1.0, rng.uniform(0.0, 0.02, 5000), 0.0]
+    x = rng.normal(size=len(weights))
+    expected, level = np.empty(len(x)), 0.3
+    for k, (w, value) in enumerate(zip(weights, x)):
+        level += (value - level) * w
+        expected[k] = level
+    np.testing.assert_allclose(_running_mean(0.3, weights, x), expected, rtol=1e-9, atol=1e-12)
+
+
+def test_row_by_row_updates_match_one_update():
+    study = default_study()
+    dataset = study[120.0]
+    whole, whole_time = _analyse(dataset, study.delta_H_max, [])
+    # single rows around the start of the window, while the sampling rate is not known yet
+    rows, rows_time = _analyse(dataset, study.delta_H_max, [1] * 300 + [997] * 20)
+    np.testing.assert_array_equal(rows_time, whole_time)
+    assert rows.settled == whole.settled
+    # the filter is designed from the sampling rate of the first update, which differs slightly
+    np.testing.assert_allclose(rows.heat_released, whole.heat_released, rtol=1e-6)
+
+
+def test_heat_released_close_to_batch_pipeline():
+    study = default_study()
+    dataset = study[120.0]
+    analysis, _ = _analyse(dataset, study.delta_H_max, [3600] * 30)
+    np.testing.assert_allclose(analysis.heat_released, dataset.total_heat, rtol=0.01)
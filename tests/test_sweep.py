@@ -0,0 +1,52 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import cure_kinetics.sweep as sweep_module
+from common.result_store import ResultStore
+from cure_kinetics.dataset import default_study
+from cure_kinetics.sweep import SweepResult, sweep
+
+GRID = {"a": (1.0, 2.0, 4.0), "b": (0.5, 1.0, 2.0, 4.0)}
+
+
+def synthetic_result() -> SweepResult:
+    settings = np.array(list(itertools.product(*GRID.values())))
+    a, b = settings.T
+    outputs = np.column_stack([a, a + b, a ** 2 * b])
+    return SweepResult(GRID, {"a": 2.0, "b": 1.0}, settings, outputs, ("only_a", "additive", "power"))
+
+
+def test_main_effects_of_a_factorial_grid():
+    effects = synthetic_result().main_effects()
+    np.testing.assert_allclose(effects[:, 0], [1.0, 0.0], atol=1e-12)
+    # no interaction, the shares add up to 1
+    np.testing.assert_allclose(effects[:, 1].sum(), 1.0)
+    assert effects[0, 2] + effects[1, 2] < 1.0
+
+
+def test_elasticities_and_ranges():
+    result = synthetic_result()
+    np.testing.assert_allclose(result.elasticities()[:, 2], [2.0, 1.0])
+    np.testing.assert_allclose(result.ranges()[1], [1.5, 8.0])
+    assert len(result.rows()) == len(result) == 12
+
+
+def test_sweep_reuses_stored_chunks(tmp_path, monkeypatch):
+    study = default_study()
+    grid = {"cutoff_freq": (0.2, 0.3), "baseline_fraction": (0.04, 0.06)}
+    result = sweep(grid, study, max_workers=1, store=ResultStore(tmp_path))
+    assert result.outputs.shape == (4, len(result.output_names))
+    assert np.all(np.isfinite(result.outputs))
+    assert result.nominal == {"cutoff_freq": study[study.temperatures[0]].cutoff_freq,
+                              "baseline_fraction": study[study.temperatures[0]].baseline_fraction}
+
+    def fail(*args):
+        raise AssertionError("a stored chunk was recomputed")
+
+    monkeypatch.setattr(sweep_module, "_evaluate_chunk", fail)
+    again = sweep(grid, study, max_workers=1, store=ResultStore(tmp_path))
+    np.testing.assert_array_equal(again.outputs, result.outputs)
+    with pytest.raises(AssertionError):
+        sweep(dict(grid, cutoff_freq=(0.25,)), study, max_workers=1, store=ResultStore(tmp_path))
@@ -0,0 +1,57 @@
+import numpy as np
+
+import cure_kinetics.uncertainty as uncertainty
+from common.result_store import ResultStore
+from cure_kinetics.kinetics import da_dt
+from cure_kinetics.uncertainty import block_resample, bootstrap_fit
+
+X = np.array([5.2, 6.8e4, 4.4, 5.6e4, 1.06, 1.97])  # log10(A1), E1, log10(A2), E2, m, n
+ALPHA = np.linspace(0.05, 0.95, 60)
+TEMPERATURES = (393.15, 423.15, 453.15)
+
+
+def noisy_rates(noise: float = 0.02):
+    rng = np.random.default_rng(1)
+    log_A1, E1, log_A2, E2, m, n = X
+    return {T: da_dt(10 ** log_A1, E1, 10 ** log_A2, E2, m, n, ALPHA, T) * (1 + noise * rng.normal(size=len(ALPHA)))
+            for T in TEMPERATURES}
+
+
+def test_block_resample_keeps_rows_and_blocks():
+    residuals = 1000.0 * np.arange(3)[:, np.newaxis] + np.arange(50)
+    resampled = block_resample(residuals, 8, np.random.default_rng(0))
+    assert resampled.shape == residuals.shape
+    np.testing.assert_array_equal(resampled // 1000, residuals // 1000)
+    # whole blocks of neighbouring points, the last one cut short
+    steps = np.diff(resampled.reshape(3, -1), axis=1)[:, :48]
+    within = np.ones(48, dtype=bool)
+    within[7::8] = False
+    assert np.all(steps[:, within] == 1)
+    assert block_resample(residuals, 100, np.random.default_rng(0)).shape == residuals.shape
+
+
+def test_bootstrap_is_reproducible_and_covers_the_truth():
+    first = bootstrap_fit(noisy_rates(), ALPHA, X, n_boot=40, max_workers=1, chunk_size=20)
+    second = bootstrap_fit(noisy_rates(), ALPHA, X, n_boot=40, max_workers=1, chunk_size=20)
+    assert len(first) == 40
+    np.testing.assert_array_equal(first.samples, second.samples)
+    assert np.all(first.standard_errors > 0)
+    low, high = np.percentile(first.samples, [0.5, 99.5], axis=0)
+    assert np.all((low < X) & (X < high))
+
+
+def test_stored_chunks_are_not_refitted(tmp_path, monkeypatch):
+    store = ResultStore(tmp_path)
+    first = bootstrap_fit(noisy_rates(), ALPHA, X, n_boot=20, max_workers=1, chunk_size=10, store=store)
+    refitted = []
+    refit_chunk = uncertainty._refit_chunk
+
+    def counting_refit(*args):
+        refitted.append(args[-2])
+        return refit_chunk(*args)
+
+    monkeypatch.setattr(uncertainty, "_refit_chunk", counting_refit)
+    enlarged = bootstrap_fit(noisy_rates(), ALPHA, X, n_boot=30, max_workers=1, chunk_size=10,
+                             store=ResultStore(tmp_path))
+    assert refitted == [list(range(20, 30))]
+    np.testing.assert_array_equal(enlarged.samples[:20], first.samples)
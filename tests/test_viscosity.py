@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from rheokinetics.viscosity import AROCY_L_10
+
+
+def closed_form(alpha, temperature, model=AROCY_L_10):
+    """The direct Castro-Macosko formula, as in the original q1 script."""
+    return model.A * np.exp(model.T_b / temperature) * \
+        (model.alpha_g / (model.alpha_g - alpha)) ** (model.c1 + model.c2 * alpha)
+
+
+def test_matches_closed_form_before_gel_point():
+    alpha = np.linspace(0.0, 0.63, 200)
+    temperature = np.array([393.15, 423.15, 453.15])[:, np.newaxis]
+    np.testing.assert_allclose(AROCY_L_10.visc(alpha, temperature), closed_form(alpha, temperature), rtol=1e-11)
+
+
+def test_scalar_input():
+    assert AROCY_L_10.visc(0.3, 400.0) == pytest.approx(closed_form(0.3, 400.0), rel=1e-12)
+    assert AROCY_L_10.visc(0.3, 400.0, max_viscosity=1e-3) == pytest.approx(1e-3)
+    assert AROCY_L_10.visc(0.3, 400.0, max_viscosity=1e3) == pytest.approx(closed_form(0.3, 400.0), rel=1e-12)
+
+
+def test_gel_point():
+    alpha = np.array([0.5, AROCY_L_10.alpha_g, 0.9])
+    assert np.isposinf(AROCY_L_10.visc(alpha, 400.0)[1:]).all()
+    np.testing.assert_allclose(AROCY_L_10.visc(alpha, 400.0, max_viscosity=1e4)[1:], 1e4, rtol=1e-12)
+    np.testing.assert_array_equal(AROCY_L_10.gelled(alpha), [False, True, True])
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import rheokinetics.viscosity_fit as viscosity_fit
+from common.result_store import ResultStore
+from cure_kinetics.kinetics import KineticParameters
+from cure_kinetics.simulation import solve_isothermal
+from rheokinetics.viscosity import AROCY_L_10
+from rheokinetics.viscosity_fit import CastroMacoskoFit, fit_castro_macosko
+
+PARAMS = KineticParameters(A1=8.13e4, E1=67.9e3, A2=2.66e4, E2=56.3e3, m=1.06, n=1.97)
+NAMES = ("alpha_g", "c1", "c2", "T_b", "A")
+
+
+def measurements(noise: float = 0.0, params: KineticParameters = PARAMS):
+    """Viscosity of AROCY_L_10 at three temperatures up to 1000 Pa.s."""
+    rng = np.random.default_rng(0)
+    runs = {}
+    alpha = np.linspace(0.0, 0.6, 200)
+    for T_C in (120, 150, 180):
+        eta = AROCY_L_10.visc(alpha, T_C + 273.15)
+        keep = eta < 1e3
+        runs[T_C] = (solve_isothermal(params, T_C).time_to(alpha[keep]),
+                     eta[keep] * np.exp(rng.normal(0.0, noise, keep.sum())))
+    return runs
+
+
+def test_recovers_known_parameters():
+    fit = fit_castro_macosko(measurements(), PARAMS)
+    for name in NAMES:
+        assert getattr(fit.model, name) == pytest.approx(getattr(AROCY_L_10, name), rel=1e-5)
+    assert fit.rms < 1e-6
+    assert fit.n_points == sum(len(t) for t, _ in measurements().values())
+
+    noisy = fit_castro_macosko(measurements(noise=0.03), PARAMS)
+    assert noisy.rms == pytest.approx(0.03, rel=0.15)
+    assert noisy.model.alpha_g == pytest.approx(AROCY_L_10.alpha_g, rel=0.01)
+
+
+def test_stored_fit_comes_back_with_its_diagnostics(tmp_path, monkeypatch):
+    fitted = fit_castro_macosko(measurements(noise=0.03), PARAMS, store=ResultStore(tmp_path))
+    assert fitted == fit_castro_macosko(measurements(noise=0.03), PARAMS)._replace(model=fitted.model)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("a stored fit was refitted")
+
+    monkeypatch.setattr(viscosity_fit, "least_squares", fail)
+    stored = fit_castro_macosko(measurements(noise=0.03), PARAMS, store=ResultStore(tmp_path))
+    assert isinstance(stored, CastroMacoskoFit)
+    assert stored._replace(model=None) == fitted._replace(model=None)
+    assert [getattr(stored.model, name) for name in NAMES] == [getattr(fitted.model, name) for name in NAMES]
+
+    # other kinetic parameters give other degrees of cure, the fit is not reused
+    with pytest.raises(AssertionError, match="refitted"):
+        fit_castro_macosko(measurements(noise=0.03), PARAMS._replace(A2=3e4), store=ResultStore(tmp_path))